@@ -1,11 +1,14 @@
 #!/usr/bin/env python
 """expire old snapshots"""
 
+# version 2026.10.18
+
 # usage: ./expireOldSnapshots.py -v mycluster -u admin [ -d local ] -k 30 [ -e ] [ -r ]
 
 # import pyhesity wrapper module
 from pyhesity import *
 from datetime import datetime
+import threading
 
 # command line arguments
 import argparse
@@ -27,6 +30,10 @@ parser.add_argument('-a', '--confirmarchive', action='store_true')     # (option
 parser.add_argument('-at', '--archivetarget', type=str, default=None)  # (optional) archive target to confirm
 parser.add_argument('-n', '--numruns', type=int, default=1000)      # (optional) page size per API call
 parser.add_argument('-s', '--skipmonthlies', action='store_true')   # skip snapshots that land on the first of the month
+parser.add_argument('-t', '--threads', type=int, default=4)         # (optional) expirations in flight at once
+parser.add_argument('-rl', '--ratelimit', type=float, default=None)  # (optional) maximum expirations per second
+parser.add_argument('-cp', '--checkpoint', type=str, default=None)  # (optional) checkpoint file to resume an interrupted run
+parser.add_argument('-pf', '--planfile', type=str, default=None)    # (optional) save planned expirations (without -e)
 args = parser.parse_args()
 
 vip = args.vip
@@ -46,6 +53,10 @@ numruns = args.numruns
 skipmonthlies = args.skipmonthlies
 activeconfirmation = args.activeconfirmation
 activeonly = args.activeonly
+threads = args.threads
+ratelimit = args.ratelimit
+checkpoint = args.checkpoint
+planfile = args.planfile
 
 if activeconfirmation is True:
     confirmreplication = True
@@ -91,6 +102,7 @@ finishedStates = ['kSuccess', 'kFailure', 'kWarning']
 
 contexts = {}
 jobLists = {}
+plan = []
 
 for job in sorted(jobs, key=lambda job: job['name'].lower()):
 
@@ -179,7 +191,7 @@ for job in sorted(jobs, key=lambda job: job['name'].lower()):
                         skip = True
                         print("    Skipping %s (monthly)" % startdate)
                     if skip is False:
-                        if expire:
+                        if expire or planfile is not None:
                             exactRun = api('get', '/backupjobruns?exactMatchStartTimeUsecs=%s&id=%s' % (startdateusecs, job['id']))
                             jobUid = exactRun[0]['backupJobRuns']['protectionRuns'][0]['backupRun']['base']['jobUid']
                             expireRun = {
@@ -202,7 +214,29 @@ for job in sorted(jobs, key=lambda job: job['name'].lower()):
                                         }
                                     ]
                             }
-                            print("    Expiring %s" % startdate)
-                            api('put', 'protectionRuns', expireRun)
+                            if expire:
+                                print("    Will expire %s" % startdate)
+                            else:
+                                print("    %s" % startdate)
+                            plan.append({'method': 'put', 'uri': 'protectionRuns', 'data': expireRun, 'description': '%s: %s' % (job['name'], startdate)})
                         else:
                             print("    %s" % startdate)
+
+# apply expirations
+if len(plan) > 0:
+    if expire:
+        printLock = threading.Lock()
+
+        def expireProgress(mutation, result, error):
+            with printLock:
+                if error is None:
+                    print('    Expired %s' % mutation['description'])
+                else:
+                    print('    Failed to expire %s (%s)' % (mutation['description'], error))
+
+        print('\nExpiring %s snapshots...\n' % len(plan))
+        result = apiBulk(plan, checkpointFile=checkpoint, maxConcurrent=threads, rate=ratelimit, progress=expireProgress)
+        print('\nExpired %s snapshots (%s previously expired, %s failed)' % (result['applied'], result['skipped'], result['failed']))
+    else:
+        apiBulk(plan, dryRun=True, planFile=planfile)
+        print('\nPlan saved to %s' % planfile)
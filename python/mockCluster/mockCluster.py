@@ -0,0 +1,600 @@
+#!/usr/bin/env python
+"""Mock Cohesity REST API Server for offline testing and benchmarking of pyhesity and scripts - 2026.10.18"""
+
+# version 2026.10.18
+
+# usage: ./mockCluster.py -p 8443 -j 200 -o 20 -r 30 -l 50 -e 0.01
+#        then: apiauth('localhost:8443', 'admin', password='admin')
+
+from datetime import datetime
+import gzip
+import json
+import os
+import random
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+import zlib
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlparse, parse_qs
+except ImportError:
+    print('mockCluster requires python 3')
+    exit(1)
+
+# command line arguments
+import argparse
+parser = argparse.ArgumentParser()
+parser.add_argument('-b', '--bindaddress', type=str, default='127.0.0.1')
+parser.add_argument('-p', '--port', type=int, default=8443)
+parser.add_argument('-cert', '--certfile', type=str, default=None)
+parser.add_argument('-key', '--keyfile', type=str, default=None)
+parser.add_argument('-n', '--clustername', type=str, default='mockcluster')
+parser.add_argument('-c', '--clusters', type=int, default=3)  # number of helios connected clusters
+parser.add_argument('-j', '--jobs', type=int, default=50)  # protection groups per cluster
+parser.add_argument('-o', '--objects', type=int, default=10)  # objects per protection group
+parser.add_argument('-r', '--runs', type=int, default=30)  # runs per protection group
+parser.add_argument('-i', '--runinterval', type=int, default=24)  # hours between runs
+parser.add_argument('-x', '--expiredruns', type=int, default=0)  # oldest runs per group with local snapshots deleted
+parser.add_argument('-nr', '--newruns', type=int, default=0)  # newest runs per group held back (restart without to add them)
+parser.add_argument('-g', '--sizechange', type=float, default=0)  # +/- fraction object logical size changes between runs
+parser.add_argument('-v', '--vaults', type=int, default=0)  # external targets (archived to by every protection group)
+parser.add_argument('-ps', '--pagesize', type=int, default=1000)  # server side maximum page size
+parser.add_argument('-d', '--direntries', type=int, default=20)  # entries per directory (directoryList)
+parser.add_argument('-l', '--latency', type=float, default=0)  # milliseconds added to each response
+parser.add_argument('-lj', '--latencyjitter', type=float, default=0.2)  # +/- fraction of latency
+parser.add_argument('-e', '--errorrate', type=float, default=0)  # fraction of requests that fail with 503
+parser.add_argument('-t', '--throttlerate', type=float, default=0)  # fraction of requests that fail with 429
+parser.add_argument('-ra', '--retryafter', type=int, default=1)  # Retry-After seconds for injected errors
+parser.add_argument('-s', '--seed', type=int, default=1)
+parser.add_argument('-z', '--nocompress', action='store_true')  # ignore Accept-Encoding: gzip
+parser.add_argument('-q', '--quiet', action='store_true')
+args = parser.parse_args()
+
+USECS = 1000000
+HOUR = 3600 * USECS
+NOW = int(time.time() / 3600) * HOUR  # runs line up with the hour, stable for the life of the server
+ENVIRONMENTS = ['kVMware', 'kPhysical', 'kVMware', 'kGenericNas', 'kSQL', 'kPhysical']
+
+REQUESTCOUNTS = {}
+REQUESTLOCK = threading.Lock()
+
+
+def num(*parts):
+    """deterministic pseudo random number from the given parts"""
+    return zlib.crc32(('%s-%s' % (args.seed, '-'.join([str(p) for p in parts]))).encode('utf-8'))
+
+
+### synthetic fleet ######################################################
+
+def clusterInfo(clusterIndex):
+    clusterId = 1000000 + clusterIndex
+    name = args.clustername if clusterIndex == 0 else '%s-%s' % (args.clustername, clusterIndex)
+    return {'clusterId': clusterId, 'clusterIncarnationId': 1, 'name': name}
+
+
+def clusterIndexFromHeader(headers):
+    accessClusterId = headers.get('accessClusterId', None)
+    if accessClusterId is not None:
+        try:
+            return int(accessClusterId) - 1000000
+        except ValueError:
+            return 0
+    return 0
+
+
+def job(clusterIndex, jobIndex):
+    environment = ENVIRONMENTS[(jobIndex + clusterIndex) % len(ENVIRONMENTS)]
+    v1Id = 10 + jobIndex
+    thisJob = {
+        'id': '%s:1:%s' % (clusterInfo(clusterIndex)['clusterId'], v1Id),
+        'v1Id': v1Id,
+        'name': 'Job-%04d-%s' % (jobIndex, environment[1:]),
+        'environment': environment,
+        'isActive': True,
+        'storageDomainId': 5 + (jobIndex % 2),
+        'policyId': '%s:1:%s' % (clusterInfo(clusterIndex)['clusterId'], 100 + (jobIndex % 3)),
+        'durationUsecs': (60 + num(clusterIndex, jobIndex) % 3600) * USECS,
+        'offsetUsecs': (jobIndex % 3600) * USECS
+    }
+    if environment == 'kPhysical':
+        thisJob['physicalParams'] = {'protectionType': 'kVolume' if jobIndex % 2 == 0 else 'kFile'}
+    return thisJob
+
+
+def jobs(clusterIndex):
+    return [job(clusterIndex, j) for j in range(args.jobs)]
+
+
+def jobIndexFromId(jobId):
+    v1Id = int(str(jobId).split(':')[-1])
+    return v1Id - 10
+
+
+def objectInfo(clusterIndex, jobIndex, objectIndex):
+    thisJob = job(clusterIndex, jobIndex)
+    objType = {'kVMware': 'kVirtualMachine', 'kPhysical': 'kHost', 'kGenericNas': 'kHost', 'kSQL': 'kDatabase'}[thisJob['environment']]
+    return {
+        'id': 100000 + jobIndex * 1000 + objectIndex,
+        'name': '%s-obj-%04d-%03d' % (thisJob['environment'][1:].lower(), jobIndex, objectIndex),
+        'environment': thisJob['environment'],
+        'objectType': objType,
+        'sourceId': 1 + (jobIndex % 4),
+        'logicalSizeBytes': (10 + num(clusterIndex, jobIndex, objectIndex) % 500) * 1024 * 1024 * 1024
+    }
+
+
+def runStartUsecs(thisJob, runIndex):
+    return NOW - runIndex * args.runinterval * HOUR - thisJob['offsetUsecs']
+
+
+def runIndexes(thisJob, endTimeUsecs=None, startTimeUsecs=None, numRuns=None):
+    """run indexes (newest first) with end time <= endTimeUsecs, start time >= startTimeUsecs"""
+    indexes = []
+    for runIndex in range(args.newruns, args.runs):
+        start = runStartUsecs(thisJob, runIndex)
+        if endTimeUsecs is not None and start + thisJob['durationUsecs'] > endTimeUsecs:
+            continue
+        if startTimeUsecs is not None and start < startTimeUsecs:
+            break
+        indexes.append(runIndex)
+        if numRuns is not None and len(indexes) >= numRuns:
+            break
+    return indexes
+
+
+def snapshotStats(clusterIndex, jobIndex, objectIndex, runIndex):
+    obj = objectInfo(clusterIndex, jobIndex, objectIndex)
+    full = runIndex == args.runs - 1
+    bytesRead = obj['logicalSizeBytes'] if full else obj['logicalSizeBytes'] * (1 + num(clusterIndex, jobIndex, objectIndex, runIndex) % 50) // 1000
+    logicalSizeBytes = obj['logicalSizeBytes']
+    if args.sizechange > 0:
+        logicalSizeBytes = int(logicalSizeBytes * (1 + args.sizechange * (num(clusterIndex, jobIndex, objectIndex, runIndex, 'size') % 201 - 100) / 100.0))
+    return {'logicalSizeBytes': logicalSizeBytes, 'bytesRead': bytesRead, 'bytesWritten': bytesRead // 3}
+
+
+def v2Run(clusterIndex, jobIndex, runIndex, includeObjectDetails=False):
+    thisJob = job(clusterIndex, jobIndex)
+    start = runStartUsecs(thisJob, runIndex)
+    end = start + thisJob['durationUsecs']
+    runType = 'kFull' if runIndex == args.runs - 1 else 'kIncremental'
+    if thisJob['environment'] == 'kSQL' and runIndex % 4 == 1:
+        runType = 'kLog'
+    run = {
+        'id': '%s:%s' % (thisJob['v1Id'], start),
+        'protectionGroupInstanceId': 1000 + args.runs - runIndex,
+        'protectionGroupId': thisJob['id'],
+        'protectionGroupName': thisJob['name'],
+        'environment': thisJob['environment'],
+        'isReplicationRun': False,
+        'localBackupInfo': {
+            'runType': runType,
+            'startTimeUsecs': start,
+            'endTimeUsecs': end,
+            'status': 'Succeeded',
+            'successfulObjectsCount': args.objects,
+            'localSnapshotStats': {'logicalSizeBytes': 0, 'bytesWritten': 0, 'bytesRead': 0}
+        }
+    }
+    if runIndex >= args.runs - args.expiredruns:
+        run['isLocalSnapshotsDeleted'] = True
+    if includeObjectDetails is True:
+        run['objects'] = []
+        for objectIndex in range(args.objects):
+            obj = objectInfo(clusterIndex, jobIndex, objectIndex)
+            stats = snapshotStats(clusterIndex, jobIndex, objectIndex, runIndex)
+            run['objects'].append({
+                'object': {'id': obj['id'], 'name': obj['name'], 'environment': obj['environment'],
+                           'objectType': obj['objectType'], 'sourceId': obj['sourceId']},
+                'localSnapshotInfo': {
+                    'snapshotInfo': {
+                        'snapshotId': '%s:%s:%s' % (thisJob['v1Id'], obj['id'], start),
+                        'status': 'kSuccessful',
+                        'startTimeUsecs': start,
+                        'endTimeUsecs': end,
+                        'stats': stats
+                    }
+                }
+            })
+            run['localBackupInfo']['localSnapshotStats']['bytesRead'] += stats['bytesRead']
+            run['localBackupInfo']['localSnapshotStats']['bytesWritten'] += stats['bytesWritten']
+    return run
+
+
+def v1Run(clusterIndex, jobIndex, runIndex, excludeTasks=False):
+    thisJob = job(clusterIndex, jobIndex)
+    start = runStartUsecs(thisJob, runIndex)
+    end = start + thisJob['durationUsecs']
+    run = {
+        'jobId': thisJob['v1Id'],
+        'jobName': thisJob['name'],
+        'jobUid': {'clusterId': clusterInfo(clusterIndex)['clusterId'], 'clusterIncarnationId': 1, 'id': thisJob['v1Id']},
+        'backupRun': {
+            'jobRunId': 1000 + args.runs - runIndex,
+            'runType': 'kRegular' if runIndex < args.runs - 1 else 'kFull',
+            'status': 'kSuccess',
+            'snapshotsDeleted': runIndex >= args.runs - args.expiredruns,
+            'stats': {'startTimeUsecs': start, 'endTimeUsecs': end, 'totalBytesReadFromSource': 0}
+        },
+        'copyRun': [{
+            'runStartTimeUsecs': start,
+            'status': 'kSuccess',
+            'target': {'type': 'kLocal'},
+            'expiryTimeUsecs': start + 30 * 24 * HOUR
+        }]
+    }
+    if excludeTasks is not True:
+        run['backupRun']['sourceBackupStatus'] = []
+        for objectIndex in range(args.objects):
+            obj = objectInfo(clusterIndex, jobIndex, objectIndex)
+            stats = snapshotStats(clusterIndex, jobIndex, objectIndex, runIndex)
+            run['backupRun']['sourceBackupStatus'].append({
+                'source': {'id': obj['id'], 'name': obj['name'], 'environment': obj['environment']},
+                'status': 'kSuccess',
+                'stats': {'startTimeUsecs': start, 'endTimeUsecs': end, 'totalBytesReadFromSource': stats['bytesRead'],
+                          'totalLogicalBackupSizeBytes': stats['logicalSizeBytes']}
+            })
+            run['backupRun']['stats']['totalBytesReadFromSource'] += stats['bytesRead']
+    return run
+
+
+def vmDocument(clusterIndex, jobIndex, objectIndex):
+    thisJob = job(clusterIndex, jobIndex)
+    obj = objectInfo(clusterIndex, jobIndex, objectIndex)
+    entity = {'id': obj['id'], 'displayName': obj['name'], 'type': 1,
+              'vmwareEntity': {'frontEndSizeInfo': {'sizeBytes': obj['logicalSizeBytes']}},
+              'sizeInfo': [{'value': {'sourceDataSizeBytes': obj['logicalSizeBytes']}}]}
+    return {
+        'vmDocument': {
+            'objectName': obj['name'],
+            'jobName': thisJob['name'],
+            'objectId': {'jobId': thisJob['v1Id'], 'entity': entity,
+                         'jobUid': {'clusterId': clusterInfo(clusterIndex)['clusterId'], 'clusterIncarnationId': 1, 'objectId': thisJob['v1Id']}},
+            'registeredSource': {'type': 1, 'displayName': 'vcenter-%s' % obj['sourceId']},
+            'attributeMap': [{'xKey': 'VMware_tag', 'xValue': 'tier%s' % (objectIndex % 3)}],
+            'versions': [{'instanceId': {'jobInstanceId': 1000 + args.runs - r, 'jobStartTimeUsecs': runStartUsecs(thisJob, r)},
+                          'snapshotTimestampUsecs': runStartUsecs(thisJob, r)} for r in range(args.runs)]
+        }
+    }
+
+
+REPORTCOMPONENT = 700
+REPORTATTRIBUTES = [
+    {'attributeName': 'runStartTimeUsecs', 'customLabel': 'Start Time', 'format': 'timestamp'},
+    {'attributeName': 'system', 'customLabel': 'Cluster'},
+    {'attributeName': 'groupName', 'customLabel': 'Protection Group'},
+    {'attributeName': 'objectName', 'customLabel': 'Object'},
+    {'attributeName': 'environment', 'customLabel': 'Environment'},
+    {'attributeName': 'status', 'customLabel': 'Status'},
+    {'attributeName': 'dataReadBytes', 'customLabel': 'Data Read Bytes'},
+    {'attributeName': 'logicalSizeBytes', 'customLabel': 'Logical Size Bytes'}
+]
+
+
+def reportRows(params):
+    """helios Protection Runs report rows (one per object per run, newest first) for the filters in params"""
+    lowerBound = 0
+    upperBound = NOW
+    clusterIndexes = range(args.clusters)
+    for reportFilter in params.get('filters', []):
+        if reportFilter.get('filterType') == 'TimeRange':
+            lowerBound = reportFilter['timeRangeFilterParams']['lowerBound']
+            upperBound = reportFilter['timeRangeFilterParams']['upperBound']
+        if reportFilter.get('filterType') == 'Systems':
+            clusterIndexes = [int(str(s).split(':')[0]) - 1000000 for s in reportFilter['systemsFilterParams']['systemIds']]
+    limit = (params.get('limit') or {}).get('size', 10000)
+    rows = []
+    for clusterIndex in [c for c in clusterIndexes if 0 <= c < args.clusters]:
+        for jobIndex in range(args.jobs):
+            thisJob = job(clusterIndex, jobIndex)
+            for runIndex in range(args.newruns, args.runs):
+                start = runStartUsecs(thisJob, runIndex)
+                if start < lowerBound or start > upperBound:
+                    continue
+                for objectIndex in range(args.objects):
+                    obj = objectInfo(clusterIndex, jobIndex, objectIndex)
+                    stats = snapshotStats(clusterIndex, jobIndex, objectIndex, runIndex)
+                    rows.append({'runStartTimeUsecs': start, 'system': clusterInfo(clusterIndex)['name'], 'groupName': thisJob['name'],
+                                 'objectName': obj['name'], 'environment': thisJob['environment'], 'status': 'Succeeded',
+                                 'dataReadBytes': stats['bytesRead'], 'logicalSizeBytes': stats['logicalSizeBytes']})
+    rows.sort(key=lambda r: (-r['runStartTimeUsecs'], r['groupName'], r['objectName']))
+    return rows[:limit]
+
+
+### request handler ######################################################
+
+def intParam(query, name, default=None):
+    try:
+        return int(query[name][0])
+    except (KeyError, ValueError, IndexError):
+        return default
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, fmt, *logargs):
+        if args.quiet is False:
+            BaseHTTPRequestHandler.log_message(self, fmt, *logargs)
+
+    def sendJson(self, status, body, headers=None):
+        payload = json.dumps(body).encode('utf-8') if status != 204 else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if args.nocompress is False and 'gzip' in self.headers.get('Accept-Encoding', '') and payload:
+            payload = gzip.compress(payload, 6)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(payload)))
+        for (k, v) in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def readBody(self):
+        length = int(self.headers.get('Content-Length', 0) or 0)
+        if length > 0:
+            body = self.rfile.read(length)
+            try:
+                return json.loads(body.decode('utf-8'))
+            except Exception:
+                return None
+        return None
+
+    def injectFailure(self):
+        """simulate latency and overload (503) or throttling (429)"""
+        if args.latency > 0:
+            time.sleep(args.latency / 1000.0 * random.uniform(1 - args.latencyjitter, 1 + args.latencyjitter))
+        roll = random.random()
+        if roll < args.errorrate:
+            self.sendJson(503, {'errorCode': 'KServiceUnavailable', 'message': 'injected failure'}, {'Retry-After': str(args.retryafter)})
+            return True
+        if roll < args.errorrate + args.throttlerate:
+            self.sendJson(429, {'errorCode': 'KTooManyRequests', 'message': 'injected throttling'}, {'Retry-After': str(args.retryafter)})
+            return True
+        return False
+
+    def route(self, method):
+        parsed = urlparse(self.path)
+        path = parsed.path
+        query = parse_qs(parsed.query, keep_blank_values=True)
+        with REQUESTLOCK:
+            REQUESTCOUNTS['%s %s' % (method, path)] = REQUESTCOUNTS.get('%s %s' % (method, path), 0) + 1
+        if path == '/mock/stats':
+            return self.sendJson(200, REQUESTCOUNTS)
+        body = self.readBody() if method in ['POST', 'PUT', 'DELETE'] else None
+        if self.injectFailure() is True:
+            return
+        clusterIndex = clusterIndexFromHeader(self.headers)
+        for prefix in ['/irisservices/api/v1/public/', '/irisservices/api/v1/', '/heliosreporting/api/v1/public/', '/v2/mcm/', '/mcm/', '/v2/']:
+            if path.startswith(prefix):
+                handler = getattr(self, 'api_%s_%s' % (method.lower(), prefix.strip('/').replace('/', '_')), None)
+                if handler is not None:
+                    result = handler(path[len(prefix):].strip('/'), query, body, clusterIndex)
+                    if result is not None:
+                        return self.sendJson(*result)
+                break
+        if method == 'POST' and path == '/login':
+            return self.sendJson(200, {'user': {'username': 'admin', 'domain': 'LOCAL', 'roles': ['COHESITY_ADMIN']}},
+                                 {'Set-Cookie': 'sessionId=mock-session; Path=/; Secure; HttpOnly'})
+        return self.sendJson(404, {'errorCode': 'KNotFound', 'message': 'not found'})
+
+    def do_GET(self):
+        self.route('GET')
+
+    def do_POST(self):
+        self.route('POST')
+
+    def do_PUT(self):
+        self.route('PUT')
+
+    def do_DELETE(self):
+        self.route('DELETE')
+
+    ### v1 public
+    def api_get_irisservices_api_v1_public(self, endpoint, query, body, clusterIndex):
+        if endpoint == 'sessionUser/preferences':
+            return (200, {'preferences': {}})
+        if endpoint == 'cluster':
+            info = clusterInfo(clusterIndex)
+            totalLogical = sum([objectInfo(clusterIndex, j, o)['logicalSizeBytes'] for j in range(args.jobs) for o in range(args.objects)])
+            return (200, {'id': info['clusterId'], 'incarnationId': 1, 'name': info['name'],
+                          'clusterSoftwareVersion': '7.1.2_u1_release-20260101_00000000', 'createdTimeMsecs': int((NOW - 365 * 24 * HOUR) / 1000),
+                          'stats': {'usagePerfStats': {'dataInBytes': totalLogical, 'dataInBytesAfterReduction': totalLogical // 4,
+                                                       'totalPhysicalUsageBytes': totalLogical // 2, 'physicalCapacityBytes': totalLogical * 2}}})
+        if endpoint == 'protectionJobs':
+            return (200, [{'id': j['v1Id'], 'name': j['name'], 'environment': j['environment'], 'policyId': j['policyId'],
+                           'viewBoxId': j['storageDomainId'], 'isActive': True, 'isDeleted': False} for j in jobs(clusterIndex)])
+        if endpoint == 'protectionRuns':
+            jobIndexes = range(args.jobs)
+            if 'jobId' in query:
+                jobIndexes = [jobIndexFromId(query['jobId'][0])]
+            numRuns = min(intParam(query, 'numRuns', 1000), args.pagesize)
+            runs = []
+            for jobIndex in jobIndexes:
+                if jobIndex < 0 or jobIndex >= args.jobs:
+                    continue
+                thisJob = job(clusterIndex, jobIndex)
+                for runIndex in runIndexes(thisJob, intParam(query, 'endTimeUsecs'), intParam(query, 'startTimeUsecs'), numRuns):
+                    runs.append(v1Run(clusterIndex, jobIndex, runIndex, query.get('excludeTasks', ['false'])[0] == 'true'))
+            return (200, runs)
+        if endpoint == 'stats/consumers':
+            start = intParam(query, 'cookie', 0) or 0
+            statsList = []
+            for thisJob in jobs(clusterIndex)[start:start + args.pagesize]:
+                written = sum([snapshotStats(clusterIndex, jobIndexFromId(thisJob['id']), o, r)['bytesWritten'] for o in range(args.objects) for r in range(args.runs)])
+                statsList.append({'id': thisJob['v1Id'], 'name': thisJob['name'], 'stats': {
+                    'dataInBytes': written * 4, 'dataInBytesAfterDedup': written * 2, 'dataWrittenBytes': written,
+                    'storageConsumedBytes': written * 2, 'storageConsumedBytesPrev': written * 2 - written // 10,
+                    'dataWrittenBytesTimestampUsec': NOW - HOUR}})
+            result = {'statsList': statsList}
+            if start + args.pagesize < args.jobs:
+                result['cookie'] = str(start + args.pagesize)
+            return (200, result)
+        if endpoint == 'statistics/timeSeriesStats':
+            startMsecs = intParam(query, 'startTimeMsecs', int(NOW / 1000) - 86400000)
+            endMsecs = intParam(query, 'endTimeMsecs', int(NOW / 1000))
+            interval = max(intParam(query, 'rollupIntervalSecs', 3600), 60) * 1000
+            points = []
+            for (i, t) in enumerate(range(startMsecs, min(endMsecs, int(time.time() * 1000)), interval)):
+                points.append({'timestampMsecs': t, 'data': {'int64Value': 1024 * 1024 * 1024 * (100 + num(clusterIndex, query.get('metricName', [''])[0], i) % 50)}})
+                if len(points) >= 10000:
+                    break
+            return (200, {'dataPointVec': points, 'entityId': query.get('entityId', [''])[0], 'metricName': query.get('metricName', [''])[0]})
+        if endpoint == 'viewBoxes':
+            return (200, [{'id': 5, 'name': 'DefaultStorageDomain', 'storagePolicy': {'numFailuresTolerated': 1}},
+                          {'id': 6, 'name': 'ECStorageDomain', 'storagePolicy': {'numFailuresTolerated': 1, 'erasureCodingInfo': {'numDataStripes': 4, 'numCodedStripes': 2}}}])
+        if endpoint == 'vaults':
+            return (200, [{'id': 200 + v, 'name': 'vault-%s' % v} for v in range(args.vaults)])
+        if endpoint == 'reports/dataTransferToVaults':
+            vaultIds = [int(v) for v in query.get('vaultIds', [])]
+            return (200, {'dataTransferSummary': [{'vaultName': 'vault-%s' % (v - 200), 'dataTransferPerProtectionJob': [
+                {'protectionJobName': j['name'], 'storageConsumed': 1024 * 1024 * 1024 * (num(clusterIndex, v, j['v1Id']) % 200)}
+                for j in jobs(clusterIndex)]} for v in vaultIds if 0 <= v - 200 < args.vaults]})
+        if endpoint == 'protectionPolicies':
+            return (200, [{'id': '%s:1:%s' % (clusterInfo(clusterIndex)['clusterId'], 100 + p), 'name': 'Policy-%s' % p} for p in range(3)])
+        if endpoint == 'protectionSources':
+            sourceId = intParam(query, 'id', 1)
+            name = 'vcenter-%s' % sourceId if sourceId < 100000 else 'object-%s' % sourceId
+            return (200, [{'protectionSource': {'id': sourceId, 'name': name}, 'protectedSourcesSummary': [{'totalLogicalSize': 1024 * 1024 * 1024 * (1 + sourceId % 100)}]}])
+        if endpoint.startswith('protectionSources/objects/'):
+            objectId = int(endpoint.split('/')[-1])
+            return (200, {'id': objectId, 'name': 'object-%s' % objectId, 'parentId': 1 + objectId % 4, 'environment': 'kVMware'})
+        return None
+
+    def api_post_irisservices_api_v1_public(self, endpoint, query, body, clusterIndex):
+        if endpoint == 'accessTokens':
+            return (201, {'accessToken': 'mock-token-%s' % int(time.time()), 'tokenType': 'Bearer'})
+        return None
+
+    def api_put_irisservices_api_v1_public(self, endpoint, query, body, clusterIndex):
+        if endpoint.startswith('protectionRuns'):
+            return (204, {})
+        return None
+
+    ### v1 private
+    def api_get_irisservices_api_v1(self, endpoint, query, body, clusterIndex):
+        if endpoint == 'backupjobruns':
+            jobIndex = jobIndexFromId(query.get('id', ['0'])[0])
+            if jobIndex < 0 or jobIndex >= args.jobs:
+                return (200, [])
+            jobUid = {'clusterId': clusterInfo(clusterIndex)['clusterId'], 'clusterIncarnationId': 1, 'objectId': job(clusterIndex, jobIndex)['v1Id']}
+            return (200, [{'backupJobRuns': {'jobDescription': {'name': job(clusterIndex, jobIndex)['name']},
+                                             'protectionRuns': [{'backupRun': {'base': {'jobUid': jobUid,
+                                                                                        'startTimeUsecs': intParam(query, 'exactMatchStartTimeUsecs', 0)}}}]}}])
+        if endpoint == 'searchvms':
+            jobIndexes = range(args.jobs)
+            if 'jobIds' in query:
+                jobIndexes = [jobIndexFromId(j) for j in query['jobIds'][0].split(',')]
+            docs = [(j, o) for j in jobIndexes if 0 <= j < args.jobs for o in range(args.objects)]
+            if 'vmName' in query:
+                docs = [(j, o) for (j, o) in docs if query['vmName'][0].lower() in objectInfo(clusterIndex, j, o)['name'].lower()]
+            start = intParam(query, 'from', 0)
+            size = min(intParam(query, 'size', args.pagesize), args.pagesize)
+            return (200, {'vms': [vmDocument(clusterIndex, j, o) for (j, o) in docs[start:start + size]], 'count': len(docs)})
+        if endpoint == 'vm/directoryList':
+            dirPath = query.get('dirPath', ['/'])[0].rstrip('/') or ''
+            depth = len([p for p in dirPath.split('/') if p != ''])
+            start = intParam(query, 'cookie', 0) or 0
+            entries = []
+            for e in range(start, min(start + args.pagesize, args.direntries)):
+                isDir = depth < 4 and e % 2 == 0
+                name = 'dir%03d' % e if isDir else 'file%03d.dat' % e
+                entry = {'name': name, 'fullPath': '%s/%s' % (dirPath, name), 'type': 'kDirectory' if isDir else 'kFile'}
+                if query.get('statFileEntries', ['false'])[0] == 'true':
+                    entry['fstatInfo'] = {'size': 0 if isDir else 4096 * (1 + num(dirPath, e) % 1000), 'mtimeUsecs': NOW - (num(dirPath, e) % 1000) * HOUR}
+                entries.append(entry)
+            result = {'entries': entries}
+            if start + args.pagesize < args.direntries:
+                result['cookie'] = str(start + args.pagesize)
+            return (200, result)
+        return None
+
+    ### v2
+    def api_get_v2(self, endpoint, query, body, clusterIndex):
+        if endpoint == 'data-protect/protection-groups':
+            groups = []
+            for thisJob in jobs(clusterIndex):
+                group = dict([(k, v) for (k, v) in thisJob.items() if k not in ['v1Id', 'durationUsecs', 'offsetUsecs']])
+                group['isDeleted'] = False
+                group['permissions'] = []
+                groups.append(group)
+            return (200, {'protectionGroups': groups})
+        if endpoint.startswith('data-protect/protection-groups/') and endpoint.endswith('/runs'):
+            jobIndex = jobIndexFromId(endpoint.split('/')[2])
+            if jobIndex < 0 or jobIndex >= args.jobs:
+                return (404, {'errorCode': 'KNotFound', 'message': 'protection group not found'})
+            thisJob = job(clusterIndex, jobIndex)
+            numRuns = min(intParam(query, 'numRuns', 100), args.pagesize)
+            includeObjectDetails = query.get('includeObjectDetails', ['false'])[0] == 'true'
+            indexes = runIndexes(thisJob, intParam(query, 'endTimeUsecs'), intParam(query, 'startTimeUsecs'), numRuns)
+            return (200, {'runs': [v2Run(clusterIndex, jobIndex, r, includeObjectDetails) for r in indexes], 'totalRuns': len(indexes)})
+        if endpoint == 'file-services/views':
+            return (200, {'views': []})
+        return None
+
+    def api_post_v2(self, endpoint, query, body, clusterIndex):
+        if endpoint == 'users/sessions':
+            return (201, {'sessionId': 'mock-session-%s' % int(time.time())})
+        return None
+
+    ### helios / mcm
+    def api_get_mcm(self, endpoint, query, body, clusterIndex):
+        if endpoint == 'clusters/connectionStatus':
+            return (200, [{'clusterId': clusterInfo(c)['clusterId'], 'clusterIncarnationId': 1, 'name': clusterInfo(c)['name'], 'connectedToCluster': True,
+                           'softwareVersion': '7.1.2_u1_release-20260101_00000000'} for c in range(args.clusters)])
+        return None
+
+    def api_get_v2_mcm(self, endpoint, query, body, clusterIndex):
+        if endpoint == 'dms/regions':
+            return (200, {'regions': []})
+        return None
+
+    ### helios reporting
+    def api_get_heliosreporting_api_v1_public(self, endpoint, query, body, clusterIndex):
+        if endpoint == 'reports':
+            return (200, {'reports': [{'id': 'protection-runs', 'title': 'Protection Runs', 'componentIds': [REPORTCOMPONENT]}]})
+        return None
+
+    def api_post_heliosreporting_api_v1_public(self, endpoint, query, body, clusterIndex):
+        if endpoint == 'components/%s/preview' % REPORTCOMPONENT:
+            return (200, {'component': {'id': REPORTCOMPONENT, 'data': reportRows(body or {}),
+                                        'config': {'xlsxParams': {'attributeConfig': REPORTATTRIBUTES}}}})
+        return None
+
+
+class ThreadingServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def sslContext():
+    certfile = args.certfile
+    keyfile = args.keyfile
+    if certfile is None:
+        # generate a throwaway self signed certificate
+        certdir = tempfile.mkdtemp(prefix='mockCluster-')
+        certfile = os.path.join(certdir, 'cert.pem')
+        keyfile = os.path.join(certdir, 'key.pem')
+        try:
+            subprocess.check_call(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-keyout', keyfile, '-out', certfile,
+                                   '-days', '30', '-subj', '/CN=%s' % args.bindaddress], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except Exception as e:
+            print('unable to create a self signed certificate (%s), please specify -cert and -key' % e)
+            exit(1)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(certfile, keyfile)
+    return context
+
+
+random.seed(args.seed)
+server = ThreadingServer((args.bindaddress, args.port), MockHandler)
+server.socket = sslContext().wrap_socket(server.socket, server_side=True)
+print('%s: mock cluster %s listening on https://%s:%s (%s clusters, %s jobs x %s objects x %s runs)' % (
+    datetime.now().strftime('%Y-%m-%d %H:%M:%S'), args.clustername, args.bindaddress, args.port, args.clusters, args.jobs, args.objects, args.runs))
+try:
+    server.serve_forever()
+except KeyboardInterrupt:
+    pass
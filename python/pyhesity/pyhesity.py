@@ -1,5 +1,5 @@
 #!/usr/bin/env python
-"""Cohesity Python REST API Wrapper Module - 2024.08.10"""
+"""Cohesity Python REST API Wrapper Module - 2026.10.18"""
 
 ##########################################################################################
 # Change Log
@@ -35,6 +35,26 @@
 # 2024.03.31 - fixed empty return
 # 2024.06.07 - added support for Entra ID (Open ID) authentication
 # 2024.08.10 - added text output mode
+# 2026.10.18 - added CohesityClient (per-client session, headers and cluster context)
+# 2026.10.18 - added aapi and aapiauth (asyncio) with per-cluster concurrency limit
+# 2026.10.18 - added cookiePager, offsetPager and timePager (streaming pagination with prefetch)
+# 2026.10.18 - added opt-in on-disk GET response cache (enableApiCache, clearApiCache, nocache)
+# 2026.10.18 - added retries with backoff (429/502/503/504, connection errors) and per-node circuit breaker
+# 2026.10.18 - added opt-in session cache (reuse tokens/cookies across runs) and re-authentication on 401
+# 2026.10.18 - added api call telemetry (per-endpoint latency histogram, bytes, retries, JSON/Prometheus export)
+# 2026.10.18 - debug log is now written as JSON lines by a background thread, repeats are counted (no more sleep)
+# 2026.10.18 - added heliosClusterMap (run a function against many helios clusters concurrently)
+# 2026.10.18 - added mapInOrder (run a function over many items concurrently, results in the original order)
+# 2026.10.18 - added opt-in in-process memoization and coalescing of identical GETs (enableApiMemo)
+# 2026.10.18 - added record/replay of api calls to a compressed cassette file (startCassette, stopCassette)
+# 2026.10.18 - fileDownload uses parallel byte ranges when supported, resumes interrupted downloads, optional size/checksum check
+# 2026.10.18 - fileUpload streams the multipart body from the file (constant memory) with progress callback
+# 2026.10.18 - added apiStream and jsonStream (incremental JSON decoding of large responses)
+# 2026.10.18 - use orjson/ujson when installed (setJsonCodec, apiCodec), explicit gzip/deflate(/br) negotiation
+# 2026.10.18 - sized connection pools with TCP keep-alive (setApiPool) and pool statistics (apiPoolStats)
+# 2026.10.18 - added waitForTasks, waitForRestoreTasks, waitForRuns and waitForProgress (adaptive polling with deadline)
+# 2026.10.18 - added apiBulk (rate limited, concurrent, checkpointed mutations with dry-run plan files)
+# 2026.10.18 - stored passwords moved to one indexed, locked credential store (setpwd still writes the shared PWFILE, which is checked first)
 #
 ##########################################################################################
 # Install Notes
@@ -55,8 +75,42 @@ import getpass
 import base64
 import os
 import urllib3
-import traceback
+import sys
+import threading
+import hashlib
+import random
+import socket
+import re
+import atexit
+import copy
+import codecs
+import zipfile
+from collections import OrderedDict, deque
+from email.utils import parsedate_tz, mktime_tz
 from os.path import expanduser
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+### asyncio api calls (python 3 only)
+try:
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    asyncio = None
 
 ### ignore unsigned certificates
 import requests.packages.urllib3
@@ -85,28 +139,60 @@ __all__ = ['api_version',
            'testProp',
            'showProps',
            'storePasswordFromInput',
+           'migrateCredentials',
            'heliosCluster',
            'heliosClusters',
            'getContext',
            'setContext',
            'getDate',
            'impersonate',
-           'switchback']
-
-api_version = '2024.08.10'
-
-COHESITY_API = {
-    'APIROOT': '',
-    'APIROOTv2': '',
-    'HEADER': {},
-    'AUTHENTICATED': False,
-    'LAST_ERROR': 'OK',
-    'SESSION': requests.Session()
-}
-
-COHESITY_API['SESSION'].headers.update({'User-Agent': 'pyhesity/%s' % api_version})
+           'switchback',
+           'CohesityClient',
+           'defaultClient',
+           'aapi',
+           'aapiauth',
+           'setAsyncLimit',
+           'cookiePager',
+           'offsetPager',
+           'timePager',
+           'enableApiCache',
+           'clearApiCache',
+           'setApiRetry',
+           'enableSessionCache',
+           'clearSessionCache',
+           'enableApiStats',
+           'apiStats',
+           'printApiStats',
+           'exportApiStats',
+           'heliosClusterMap',
+           'mapInOrder',
+           'heliosClusterContext',
+           'enableApiMemo',
+           'clearApiMemo',
+           'startCassette',
+           'stopCassette',
+           'setFileDownload',
+           'jsonStream',
+           'apiStream',
+           'setJsonCodec',
+           'apiCodec',
+           'setApiPool',
+           'apiPoolStats',
+           'waitForTasks',
+           'waitForRestoreTasks',
+           'waitForRuns',
+           'waitForProgress',
+           'apiBulk']
+
+api_version = '2026.10.18'
 
 APIMETHODS = ['get', 'post', 'put', 'delete']
+ACCEPTENCODING = 'gzip, deflate'
+try:
+    import brotli  # noqa: F401 (urllib3 decodes br responses when brotli is installed)
+    ACCEPTENCODING = 'gzip, deflate, br'
+except ImportError:
+    pass
 CONFIGDIR = expanduser("~") + '/.pyhesity'
 SCRIPTDIR = os.path.dirname(os.path.realpath(__file__))
 PWFILE = os.path.join(SCRIPTDIR, 'YWRtaW4')
@@ -114,39 +200,213 @@ LOGFILE = os.path.join(SCRIPTDIR, 'pyhesity-debug.log')
 HELIOSENDPOINTS = ['helios.cohesity.com', 'helios.gov-cohesity.com']
 
 
+### json codec - use a faster json library when one is installed
+JSONCODEC = {
+    'NAME': 'json',
+    'LOADS': json.loads,
+    'DUMPS': json.dumps
+}
+
+
+def setJsonCodec(name=None):
+    """use json library name ('orjson', 'ujson', 'simplejson' or 'json'), default is the fastest one installed"""
+    for codecName in ([name] if name is not None else ['orjson', 'ujson', 'json']):
+        if codecName == 'json':
+            (loads, dumps) = (json.loads, json.dumps)
+        else:
+            try:
+                module = __import__(codecName)
+            except ImportError:
+                continue
+            loads = module.loads
+            if codecName == 'orjson':
+                dumps = lambda obj, module=module: module.dumps(obj, option=module.OPT_NON_STR_KEYS)
+            elif codecName == 'ujson':
+                dumps = lambda obj, module=module: module.dumps(obj, escape_forward_slashes=False)
+            else:
+                dumps = module.dumps
+        JSONCODEC.update({'NAME': codecName, 'LOADS': loads, 'DUMPS': dumps})
+        return codecName
+    print('json codec %s is not installed' % name)
+    return JSONCODEC['NAME']
+
+
+def apiCodec():
+    """active json codec and accepted response encodings"""
+    return {'json': JSONCODEC['NAME'], 'acceptEncoding': ACCEPTENCODING}
+
+
+def __jsonLoads(response):
+    try:
+        return JSONCODEC['LOADS'](response.content)
+    except Exception:
+        if JSONCODEC['NAME'] == 'json':
+            raise
+        return response.json()  # e.g. integers beyond 64 bits
+
+
+def __jsonDumps(data):
+    try:
+        return JSONCODEC['DUMPS'](data)
+    except Exception:
+        if JSONCODEC['NAME'] == 'json':
+            raise
+        return json.dumps(data)
+
+
+setJsonCodec()
+
+
+### connection pools - one pool of kept-alive connections per host, sized for concurrent callers
+APIPOOL = {
+    'MAXCONNECTIONS': 32,
+    'MAXHOSTS': 16,
+    'KEEPALIVE': True,
+    'KEEPIDLE': 60
+}
+
+
+class __PoolAdapter(requests.adapters.HTTPAdapter):
+    """HTTPAdapter that enables TCP keep-alive on pooled connections"""
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if APIPOOL['KEEPALIVE'] is True:
+            socketOptions = list(urllib3.connection.HTTPConnection.default_socket_options) + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+            for (option, value) in (('TCP_KEEPIDLE', APIPOOL['KEEPIDLE']), ('TCP_KEEPINTVL', 15), ('TCP_KEEPCNT', 4)):
+                if hasattr(socket, option):
+                    socketOptions.append((socket.IPPROTO_TCP, getattr(socket, option), value))
+            pool_kwargs['socket_options'] = socketOptions
+        requests.adapters.HTTPAdapter.init_poolmanager(self, connections, maxsize, block=block, **pool_kwargs)
+
+
+def __mountPool(session):
+    adapter = __PoolAdapter(pool_connections=APIPOOL['MAXHOSTS'], pool_maxsize=APIPOOL['MAXCONNECTIONS'])
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+
+def setApiPool(maxConnections=None, maxHosts=None, keepAlive=None, keepIdle=None, context=None):
+    """set connections kept per host, hosts kept in the pool and TCP keep-alive, for new contexts and the current one"""
+    for (key, value) in [('MAXCONNECTIONS', maxConnections), ('MAXHOSTS', maxHosts), ('KEEPALIVE', keepAlive), ('KEEPIDLE', keepIdle)]:
+        if value is not None:
+            APIPOOL[key] = value
+    __mountPool(__currentContext(context)['SESSION'])
+
+
+def apiPoolStats(context=None):
+    """per host connection pool statistics (connections opened, requests sent, idle connections)"""
+    context = __currentContext(context)
+    stats = []
+    adapter = context['SESSION'].get_adapter('https://')
+    for key in list(adapter.poolmanager.pools.keys()):
+        pool = adapter.poolmanager.pools.get(key)
+        if pool is None:
+            continue
+        stats.append({
+            'host': '%s:%s' % (pool.host, pool.port),
+            'connectionsOpened': pool.num_connections,
+            'requests': pool.num_requests,
+            'idle': len([conn for conn in list(pool.pool.queue) if conn is not None]) if pool.pool is not None else 0,
+            'maxConnections': pool.pool.maxsize if pool.pool is not None else 0
+        })
+    return stats
+
+
+def __newSession():
+    session = requests.Session()
+    session.headers.update({'User-Agent': 'pyhesity/%s' % api_version, 'Accept-Encoding': ACCEPTENCODING})
+    __mountPool(session)
+    return session
+
+
+### create a new api context (connection state for one cluster or helios)
+def newContext():
+    context = {
+        'APIROOT': '',
+        'APIROOTv2': '',
+        'HEADER': {},
+        'AUTHENTICATED': False,
+        'LAST_ERROR': 'OK',
+        'SESSION': __newSession(),
+        'HELIOSCLUSTERS': [],
+        'CONNECTEDHELIOSCLUSTERS': []
+    }
+    return context
+
+
+COHESITY_API = newContext()
+THREADCONTEXT = threading.local()
+
+
+### context to use when none is specified (the thread's cluster context in heliosClusterMap, else the default)
+def __currentContext(context=None):
+    if context is not None:
+        return context
+    threadContext = getattr(THREADCONTEXT, 'context', None)
+    if threadContext is not None:
+        return threadContext
+    return COHESITY_API
+
+
 ### get last error
-def LAST_API_ERROR():
-    return COHESITY_API['LAST_ERROR']
+def LAST_API_ERROR(context=None):
+    context = __currentContext(context)
+    return context['LAST_ERROR']
 
 
 ### report auth error
-def reportAuthError(e, quiet=None):
-    COHESITY_API['AUTHENTICATED'] = False
-    COHESITY_API['LAST_ERROR'] = e
+def reportAuthError(e, quiet=None, context=None):
+    context = __currentContext(context)
+    context['AUTHENTICATED'] = False
+    context['LAST_ERROR'] = e
     __writelog(e)
     if quiet is None:
         print(e)
-    apidrop()
+    apidrop(context=context)
 
 
 ### authentication
 def apiauth(vip='helios.cohesity.com', username='helios', domain='local', password=None, newPassword=None,
             updatepw=None, prompt=None, quiet=None, helios=False, useApiKey=False, tenantId=None, timeout=300,
             noretry=False, regionid=None, mfaType='Totp', mfaCode=None, emailMfaCode=False, 
-            entraId=False, directoryId=None, clientId=None, scope='openid profile'):
+            entraId=False, directoryId=None, clientId=None, scope='openid profile', context=None):
     """authentication function"""
-    global COHESITY_API
-    global HELIOSCLUSTERS
-    global CONNECTEDHELIOSCLUSTERS
+    context = __currentContext(context)
 
-    COHESITY_API['APIROOTMCM'] = 'https://%s/mcm/' % vip
-    COHESITY_API['APIROOTMCMv2'] = 'https://%s/v2/mcm/' % vip
-    COHESITY_API['APIROOTREPORTINGv2'] = 'https://%s/heliosreporting/api/v1/public/' % vip
+    context['APIROOTMCM'] = 'https://%s/mcm/' % vip
+    context['APIROOTMCMv2'] = 'https://%s/v2/mcm/' % vip
+    context['APIROOTREPORTINGv2'] = 'https://%s/heliosreporting/api/v1/public/' % vip
 
     if '\\' in username:
         (domain, username) = username.split('\\')
     if '/' in username:
         (domain, username) = username.split('/')
+    context['USERNAME'] = '%s/%s' % (domain, username)
+    context['AUTHARGS'] = {'vip': vip, 'username': username, 'domain': domain, 'helios': helios, 'useApiKey': useApiKey,
+                           'tenantId': tenantId, 'timeout': timeout, 'regionid': regionid, 'entraId': entraId,
+                           'directoryId': directoryId, 'clientId': clientId, 'scope': scope}
+
+    context['AUTHKEY'] = '%s:%s:%s:%s:%s:%s' % (vip.lower(), domain.lower(), username.lower(), useApiKey, helios, tenantId)
+
+    # replay recorded session (no network)
+    if APICASSETTE['MODE'] == 'replay':
+        if __cassetteLoadSession(context) is True:
+            if quiet is None:
+                print("Connected!")
+        else:
+            reportAuthError('no recorded session for %s/%s at %s' % (domain, username, vip), quiet=quiet, context=context)
+        return None
+
+    # reuse cached session
+    sessionKey = None
+    if SESSIONCACHE['ENABLED'] is True and updatepw is None and newPassword is None and emailMfaCode is False:
+        sessionKey = context['AUTHKEY']
+        context['SESSIONKEY'] = sessionKey
+        if __sessionCacheLoad(context, sessionKey) is True:
+            __cassetteSaveSession(context)
+            if quiet is None:
+                print("Connected!")
+            return None
 
     pwd = password
     setpasswd = None
@@ -155,11 +415,11 @@ def apiauth(vip='helios.cohesity.com', username='helios', domain='local', passwo
     else:
         pwd = __getpassword(vip=vip, username=username, password=password, domain=domain, useApiKey=useApiKey, helios=helios, updatepw=updatepw, prompt=prompt)
     if pwd is None:
-        reportAuthError('no password provided for %s/%s at %s' % (domain, username, vip), quiet=quiet)
+        reportAuthError('no password provided for %s/%s at %s' % (domain, username, vip), quiet=quiet, context=context)
         return None
-    COHESITY_API['HEADER'] = {'accept': 'application/json', 'content-type': 'application/json', 'User-Agent': 'pyhesity/%s' % api_version}
-    COHESITY_API['APIROOT'] = 'https://' + vip + '/irisservices/api/v1'
-    COHESITY_API['APIROOTv2'] = 'https://' + vip + '/v2/'
+    context['HEADER'] = {'accept': 'application/json', 'content-type': 'application/json', 'User-Agent': 'pyhesity/%s' % api_version}
+    context['APIROOT'] = 'https://' + vip + '/irisservices/api/v1'
+    context['APIROOTv2'] = 'https://' + vip + '/v2/'
     if entraId is True and vip.lower() in HELIOSENDPOINTS:
         # entraId authentication
         if directoryId is None:
@@ -167,104 +427,104 @@ def apiauth(vip='helios.cohesity.com', username='helios', domain='local', passwo
         if clientId is None:
             clientId = __getpassword(vip=vip, username=username, password=password, domain=domain, useApiKey=useApiKey, helios=helios, updatepw=updatepw, prompt=prompt, clientId=True)
         if clientId is not None and directoryId is not None and scope is not None:
-            token = ProcessOidcToken(username=username, password=pwd, client_id=clientId, tenant_id=directoryId, scope=scope)
+            token = ProcessOidcToken(username=username, password=pwd, client_id=clientId, tenant_id=directoryId, scope=scope, context=context)
             if token is not None:
-                COHESITY_API['HEADER'] = {'accept': 'application/json', 'content-type': 'application/json', 'X-OPEN-ID-AUTHZ-TOKEN': token, 'User-Agent': 'pyhesity/%s' % api_version}
+                context['HEADER'] = {'accept': 'application/json', 'content-type': 'application/json', 'X-OPEN-ID-AUTHZ-TOKEN': token, 'User-Agent': 'pyhesity/%s' % api_version}
             else:
-                reportAuthError('Entra ID authentication failed', quiet=quiet)
+                reportAuthError('Entra ID authentication failed', quiet=quiet, context=context)
                 return None
         else:
-            reportAuthError('Entra ID authentication failed', quiet=quiet)
+            reportAuthError('Entra ID authentication failed', quiet=quiet, context=context)
             return None
-        URL = COHESITY_API['APIROOTMCM'] + 'clusters/connectionStatus'
-        HELIOSCLUSTERS = (COHESITY_API['SESSION'].get(URL, headers=COHESITY_API['HEADER'], verify=False, timeout=timeout)).json()
-        if HELIOSCLUSTERS is not None and 'message' in HELIOSCLUSTERS:
-            print(HELIOSCLUSTERS['message'])
-            if 'Authentication failed' in HELIOSCLUSTERS['message'] and noretry is False and prompt is not False:
-                apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey, quiet=True)
+        URL = context['APIROOTMCM'] + 'clusters/connectionStatus'
+        context['HELIOSCLUSTERS'] = (context['SESSION'].get(URL, headers=context['HEADER'], verify=False, timeout=timeout)).json()
+        if context['HELIOSCLUSTERS'] is not None and 'message' in context['HELIOSCLUSTERS']:
+            print(context['HELIOSCLUSTERS']['message'])
+            if 'Authentication failed' in context['HELIOSCLUSTERS']['message'] and noretry is False and prompt is not False:
+                apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey, quiet=True, context=context)
             else:
-                reportAuthError('Helios/MCM authentication failed', quiet=quiet)
+                reportAuthError('Helios/MCM authentication failed', quiet=quiet, context=context)
                 return None
-        if HELIOSCLUSTERS is not None and 'errorCode' not in HELIOSCLUSTERS:
-            CONNECTEDHELIOSCLUSTERS = [cluster for cluster in HELIOSCLUSTERS if cluster['connectedToCluster'] is True]
-            COHESITY_API['AUTHENTICATED'] = True
-            COHESITY_API['LAST_ERROR'] = 'OK'
+        if context['HELIOSCLUSTERS'] is not None and 'errorCode' not in context['HELIOSCLUSTERS']:
+            context['CONNECTEDHELIOSCLUSTERS'] = [cluster for cluster in context['HELIOSCLUSTERS'] if cluster['connectedToCluster'] is True]
+            context['AUTHENTICATED'] = True
+            context['LAST_ERROR'] = 'OK'
             if quiet is None:
                 print("Connected!")
     elif vip.lower() in HELIOSENDPOINTS or helios is not False:
         # Helios/MCM API Key authentication
-        COHESITY_API['HEADER'] = {'accept': 'application/json', 'content-type': 'application/json', 'apiKey': pwd, 'User-Agent': 'pyhesity/%s' % api_version}
+        context['HEADER'] = {'accept': 'application/json', 'content-type': 'application/json', 'apiKey': pwd, 'User-Agent': 'pyhesity/%s' % api_version}
         if regionid is not None:
-            COHESITY_API['HEADER']['regionid'] = regionid
-        URL = COHESITY_API['APIROOTMCM'] + 'clusters/connectionStatus'
+            context['HEADER']['regionid'] = regionid
+        URL = context['APIROOTMCM'] + 'clusters/connectionStatus'
         try:
-            HELIOSCLUSTERS = (COHESITY_API['SESSION'].get(URL, headers=COHESITY_API['HEADER'], verify=False, timeout=timeout)).json()
-            if HELIOSCLUSTERS is not None and 'message' in HELIOSCLUSTERS:
-                print(HELIOSCLUSTERS['message'])
-                if 'Authentication failed' in HELIOSCLUSTERS['message'] and noretry is False and prompt is not False:
-                    apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey, quiet=True)
+            context['HELIOSCLUSTERS'] = (context['SESSION'].get(URL, headers=context['HEADER'], verify=False, timeout=timeout)).json()
+            if context['HELIOSCLUSTERS'] is not None and 'message' in context['HELIOSCLUSTERS']:
+                print(context['HELIOSCLUSTERS']['message'])
+                if 'Authentication failed' in context['HELIOSCLUSTERS']['message'] and noretry is False and prompt is not False:
+                    apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey, quiet=True, context=context)
                 else:
-                    reportAuthError('Helios/MCM authentication failed', quiet=quiet)
+                    reportAuthError('Helios/MCM authentication failed', quiet=quiet, context=context)
                     return None
-            if HELIOSCLUSTERS is not None and 'errorCode' not in HELIOSCLUSTERS:
-                CONNECTEDHELIOSCLUSTERS = [cluster for cluster in HELIOSCLUSTERS if cluster['connectedToCluster'] is True]
-                COHESITY_API['AUTHENTICATED'] = True
-                COHESITY_API['LAST_ERROR'] = 'OK'
+            if context['HELIOSCLUSTERS'] is not None and 'errorCode' not in context['HELIOSCLUSTERS']:
+                context['CONNECTEDHELIOSCLUSTERS'] = [cluster for cluster in context['HELIOSCLUSTERS'] if cluster['connectedToCluster'] is True]
+                context['AUTHENTICATED'] = True
+                context['LAST_ERROR'] = 'OK'
                 if quiet is None:
                     print("Connected!")
             else:
-                URL = COHESITY_API['APIROOTMCMv2'] + 'dms/regions'
-                REGIONS = (COHESITY_API['SESSION'].get(URL, headers=COHESITY_API['HEADER'], verify=False, timeout=timeout)).json()
+                URL = context['APIROOTMCMv2'] + 'dms/regions'
+                REGIONS = (context['SESSION'].get(URL, headers=context['HEADER'], verify=False, timeout=timeout)).json()
                 if REGIONS is not None and 'message' in REGIONS:
-                    reportAuthError('DMaaS authentication failed', quiet=quiet)
+                    reportAuthError('DMaaS authentication failed', quiet=quiet, context=context)
                     return None
                 if REGIONS is not None and 'errorCode' not in REGIONS:
-                    COHESITY_API['AUTHENTICATED'] = True
-                    COHESITY_API['LAST_ERROR'] = 'OK'
+                    context['AUTHENTICATED'] = True
+                    context['LAST_ERROR'] = 'OK'
                     if quiet is None:
                         print("Connected!")
             if setpasswd is not None:
                 pwd = __getpassword(vip=vip, username=username, password=setpasswd, domain=domain, useApiKey=useApiKey, helios=helios, updatepw=updatepw, prompt=prompt)
-            COHESITY_API['COOKIES'] = COHESITY_API['SESSION'].cookies.get_dict()
+            context['COOKIES'] = context['SESSION'].cookies.get_dict()
         except requests.exceptions.RequestException as e:
-            reportAuthError(e, quiet=quiet)
+            reportAuthError(e, quiet=quiet, context=context)
             if 'Authentication failed' in e and noretry is False and prompt is not False and setpasswd is None:
-                apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey)
+                apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey, context=context)
     elif useApiKey is True:
         # Cluster API key authentication
-        COHESITY_API['HEADER'] = {'accept': 'application/json', 'content-type': 'application/json', 'apiKey': pwd, 'User-Agent': 'pyhesity/%s' % api_version}
-        COHESITY_API['AUTHENTICATED'] = True
-        COHESITY_API['LAST_ERROR'] = 'OK'
-        URL = COHESITY_API['APIROOT'] + '/public/sessionUser/preferences'
-        cluster = (COHESITY_API['SESSION'].get(URL, headers=COHESITY_API['HEADER'], verify=False, timeout=timeout)).json()
+        context['HEADER'] = {'accept': 'application/json', 'content-type': 'application/json', 'apiKey': pwd, 'User-Agent': 'pyhesity/%s' % api_version}
+        context['AUTHENTICATED'] = True
+        context['LAST_ERROR'] = 'OK'
+        URL = context['APIROOT'] + '/public/sessionUser/preferences'
+        cluster = (context['SESSION'].get(URL, headers=context['HEADER'], verify=False, timeout=timeout)).json()
         if cluster is not None and 'preferences' in cluster:
             if setpasswd is not None:
                 pwd = __getpassword(vip=vip, username=username, password=setpasswd, domain=domain, useApiKey=useApiKey, helios=helios, updatepw=updatepw, prompt=prompt)
             if quiet is None:
                 print("Connected!")
-                COHESITY_API['COOKIES'] = COHESITY_API['SESSION'].cookies.get_dict()
+                context['COOKIES'] = context['SESSION'].cookies.get_dict()
             if tenantId is not None:
-                impersonate(tenantId)
+                impersonate(tenantId, context=context)
         else:
             if 'message' in cluster:
-                COHESITY_API['LAST_ERROR'] = cluster['message']
-            COHESITY_API['AUTHENTICATED'] = False
-            if 'API Key does not exist' in COHESITY_API['LAST_ERROR'] or 'StatusUnauthorized' in COHESITY_API['LAST_ERROR'] or 'invalid header value' in COHESITY_API['LAST_ERROR']:
-                COHESITY_API['LAST_ERROR'] = 'API key authentication failed'
+                context['LAST_ERROR'] = cluster['message']
+            context['AUTHENTICATED'] = False
+            if 'API Key does not exist' in context['LAST_ERROR'] or 'StatusUnauthorized' in context['LAST_ERROR'] or 'invalid header value' in context['LAST_ERROR']:
+                context['LAST_ERROR'] = 'API key authentication failed'
                 print('invalid API Key')
                 if prompt is not False and noretry is not True and setpasswd is None:
-                    apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey)
+                    apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey, context=context)
             else:
-                print('Connection failed: %s' % COHESITY_API['LAST_ERROR'])
+                print('Connection failed: %s' % context['LAST_ERROR'])
     else:
         # Username/password authentication
         creds = json.dumps({"domain": domain, "password": pwd, "username": username})
         url = 'https://' + vip + '/login'
         try:
-            response = COHESITY_API['SESSION'].post(url, data=creds, headers=COHESITY_API['HEADER'], verify=False, timeout=timeout)
+            response = context['SESSION'].post(url, data=creds, headers=context['HEADER'], verify=False, timeout=timeout)
             if response != '':
                 if response.status_code == 201 or response.status_code == 200:
-                    COHESITY_API['AUTHENTICATED'] = True
+                    context['AUTHENTICATED'] = True
                     # check force password change
                     try:
                         changePassword = False
@@ -285,7 +545,7 @@ def apiauth(vip='helios.cohesity.com', username='helios', domain='local', passwo
                                         print('Passwords do not match')
                                 changePassword = True
                             else:
-                                reportAuthError('password is expired', quiet=quiet)
+                                reportAuthError('password is expired', quiet=quiet, context=context)
                                 return None
                         else:
                             if newPassword is not None:
@@ -293,26 +553,26 @@ def apiauth(vip='helios.cohesity.com', username='helios', domain='local', passwo
                         if changePassword is True:
                             user['user']['currentPassword'] = pwd
                             user['user']['password'] = newPassword
-                            api('put', 'users', user['user'])
+                            api('put', 'users', user['user'], context=context)
                             creds = json.dumps({"domain": domain, "password": newPassword, "username": username})
-                            response = COHESITY_API['SESSION'].post(url, data=creds, headers=COHESITY_API['HEADER'], verify=False, timeout=timeout)
+                            response = context['SESSION'].post(url, data=creds, headers=context['HEADER'], verify=False, timeout=timeout)
                             if response != '':
                                 if response.status_code == 201 or response.status_code == 200:
-                                    COHESITY_API['AUTHENTICATED'] = True
+                                    context['AUTHENTICATED'] = True
                                     pwd = __getpassword(vip=vip, username=username, password=newPassword, domain=domain, useApiKey=useApiKey, helios=helios, updatepw=updatepw, prompt=prompt)
                                     setpasswd = None
                     except Exception as e:
-                        reportAuthError(e, quiet=quiet)
+                        reportAuthError(e, quiet=quiet, context=context)
                         return None
                     # mfa
                     if mfaCode is not None or emailMfaCode is True:
                         otpType = "Totp"
                         if emailMfaCode is True:
                             if user['user']['mfaInfo']['isEmailOtpSetupDone'] is False:
-                                reportAuthError('Email MFA is not enabled for user', quiet=quiet)
+                                reportAuthError('Email MFA is not enabled for user', quiet=quiet, context=context)
                                 return None
-                            url = COHESITY_API['APIROOTv2'] + 'send-email-otp'
-                            response = COHESITY_API['SESSION'].post(url, data=None, headers=COHESITY_API['HEADER'], verify=False, timeout=timeout)
+                            url = context['APIROOTv2'] + 'send-email-otp'
+                            response = context['SESSION'].post(url, data=None, headers=context['HEADER'], verify=False, timeout=timeout)
                             mfaCode = getpass.getpass("Enter MFA Code: ")
                             otpType = 'Email'
                         try:
@@ -320,129 +580,281 @@ def apiauth(vip='helios.cohesity.com', username='helios', domain='local', passwo
                                 "otpCode": mfaCode,
                                 "otpType": otpType
                             })
-                            url = COHESITY_API['APIROOT'] + '/public/verify-otp'
-                            response = COHESITY_API['SESSION'].post(url, data=mfaCheck, headers=COHESITY_API['HEADER'], verify=False, timeout=timeout)
+                            url = context['APIROOT'] + '/public/verify-otp'
+                            response = context['SESSION'].post(url, data=mfaCheck, headers=context['HEADER'], verify=False, timeout=timeout)
                             if 'errorCode' in response.json():
                                 if response.json()['errorCode'] == 'KValidationError':
-                                    reportAuthError('MFA verification failed', quiet=quiet)
+                                    reportAuthError('MFA verification failed', quiet=quiet, context=context)
                                     return None
                         except Exception as e:
-                            reportAuthError(e, quiet=quiet)
+                            reportAuthError(e, quiet=quiet, context=context)
                             return None
                     # impersonate tenant
                     if tenantId is not None:
-                        impersonate(tenantId)
-                    COHESITY_API['LAST_ERROR'] = 'OK'
+                        impersonate(tenantId, context=context)
+                    context['LAST_ERROR'] = 'OK'
                     if setpasswd is not None:
                         pwd = __getpassword(vip=vip, username=username, password=setpasswd, domain=domain, useApiKey=useApiKey, helios=helios, updatepw=updatepw, prompt=prompt)
                     if quiet is None:
                         print("Connected!")
-                    COHESITY_API['COOKIES'] = COHESITY_API['SESSION'].cookies.get_dict()
+                    context['COOKIES'] = context['SESSION'].cookies.get_dict()
                 else:
-                    COHESITY_API['AUTHENTICATED'] = False
+                    context['AUTHENTICATED'] = False
                     if response.status_code == 403 and 'user does not have the privilege to access ui' in response.json()['message'].lower():
                         # =============================================================================================================
                         creds = json.dumps({"domain": domain, "password": pwd, "username": username, "otpType": mfaType, "otpCode": mfaCode})
                         emailcreds = json.dumps({"domain": domain, "password": pwd, "username": username})
 
-                        url = COHESITY_API['APIROOT'] + '/public/accessTokens'
+                        url = context['APIROOT'] + '/public/accessTokens'
                         try:
                             if emailMfaCode is True:
                                 print('scripted MFA via email is disabled, please use -m xxxxxx')
-                                apidrop()
+                                apidrop(context=context)
                                 return None
 
-                            response = requests.post(url, data=creds, headers=COHESITY_API['HEADER'], verify=False, timeout=timeout)
+                            response = context['SESSION'].post(url, data=creds, headers=context['HEADER'], verify=False, timeout=timeout)
                             if response != '':
                                 if response.status_code == 201:
                                     accessToken = response.json()['accessToken']
                                     tokenType = response.json()['tokenType']
-                                    COHESITY_API['HEADER'] = {
+                                    context['HEADER'] = {
                                         'User-Agent': 'pyhesity/%s' % api_version,
                                         'accept': 'application/json',
                                         'content-type': 'application/json',
                                         'authorization': tokenType + ' ' + accessToken
                                     }
-                                    COHESITY_API['AUTHENTICATED'] = True
+                                    context['AUTHENTICATED'] = True
                                     if tenantId is not None:
-                                        impersonate(tenantId)
-                                    COHESITY_API['LAST_ERROR'] = 'OK'
+                                        impersonate(tenantId, context=context)
+                                    context['LAST_ERROR'] = 'OK'
                                     if quiet is None:
                                         print("Connected!")
                                 else:
                                     # try session auth
                                     if response.status_code == 400 and 'access denied' in response.json()['message'].lower():
                                         try:
-                                            url = COHESITY_API['APIROOTv2'] + 'users/sessions'
+                                            url = context['APIROOTv2'] + 'users/sessions'
                                             creds = json.dumps({"domain": domain, "password": pwd, "username": username, "otpType": mfaType.lower(), "otpCode": mfaCode})
                                             if emailMfaCode is True:
                                                 creds = json.dumps({"domain": domain, "password": pwd, "username": username, "otpType": 'email', "otpCode": mfaCode})
-                                            response = requests.post(url, data=creds, headers=COHESITY_API['HEADER'], verify=False, timeout=timeout)
+                                            response = context['SESSION'].post(url, data=creds, headers=context['HEADER'], verify=False, timeout=timeout)
                                             if response != '':
                                                 if response.status_code == 201:
                                                     sessionId = response.json()['sessionId']
-                                                    COHESITY_API['HEADER'] = {
+                                                    context['HEADER'] = {
                                                         'User-Agent': 'pyhesity/%s' % api_version,
                                                         'accept': 'application/json',
                                                         'content-type': 'application/json',
                                                         'session-id': sessionId
                                                     }
-                                                    COHESITY_API['AUTHENTICATED'] = True
+                                                    context['AUTHENTICATED'] = True
                                                     if tenantId is not None:
-                                                        impersonate(tenantId)
-                                                    COHESITY_API['LAST_ERROR'] = 'OK'
+                                                        impersonate(tenantId, context=context)
+                                                    context['LAST_ERROR'] = 'OK'
                                                     if quiet is None:
                                                         print("Connected!")
                                                 else:
-                                                    COHESITY_API['AUTHENTICATED'] = False
-                                                    COHESITY_API['LAST_ERROR'] = 'Error %s' % response.status_code
+                                                    context['AUTHENTICATED'] = False
+                                                    context['LAST_ERROR'] = 'Error %s' % response.status_code
                                                     __writelog('Error %s' % response.status_code)
                                                     if quiet is None:
                                                         print('Error %s' % response.status_code)
                                                     if response.status_code == 400 and 'invalid username' in response.json()['message'].lower():
                                                         if noretry is not True and prompt is not False:
-                                                            apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey)
+                                                            apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey, context=context)
                                         except requests.exceptions.RequestException as e2:
                                             __writelog(e2)
-                                            COHESITY_API['AUTHENTICATED'] = False
-                                            COHESITY_API['LAST_ERROR'] = e2
+                                            context['AUTHENTICATED'] = False
+                                            context['LAST_ERROR'] = e2
                                             if quiet is None:
                                                 print(e2)
                                     else:
-                                        COHESITY_API['AUTHENTICATED'] = False
+                                        context['AUTHENTICATED'] = False
                                         if response.status_code == 400:
-                                            COHESITY_API['LAST_ERROR'] = 'invalid username or password.'
+                                            context['LAST_ERROR'] = 'invalid username or password.'
                                         else:
-                                            COHESITY_API['LAST_ERROR'] = 'Error %s' % response.status_code
-                                        __writelog(COHESITY_API['LAST_ERROR'])
+                                            context['LAST_ERROR'] = 'Error %s' % response.status_code
+                                        __writelog(context['LAST_ERROR'])
                                         if quiet is None:
-                                            print(COHESITY_API['LAST_ERROR'])
+                                            print(context['LAST_ERROR'])
                                         if response.status_code == 400 and 'invalid username' in response.json()['message'].lower():
                                             if noretry is False and prompt is not False:
-                                                apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey)
+                                                apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey, context=context)
                         except requests.exceptions.RequestException as e:
                             __writelog(e)
-                            COHESITY_API['AUTHENTICATED'] = False
-                            COHESITY_API['LAST_ERROR'] = e
+                            context['AUTHENTICATED'] = False
+                            context['LAST_ERROR'] = e
                             if quiet is None:
                                 print(e)
                         # =============================================================================================================
+                        __sessionCacheSave(context, sessionKey)
+                        __cassetteSaveSession(context)
                         return None
                     if response.status_code == 400 or response.status_code == 401:
-                        COHESITY_API['LAST_ERROR'] = 'invalid username or password'
+                        context['LAST_ERROR'] = 'invalid username or password'
                     else:
-                        COHESITY_API['LAST_ERROR'] = 'Error %s' % response.status_code
-                    __writelog(COHESITY_API['LAST_ERROR'])
+                        context['LAST_ERROR'] = 'Error %s' % response.status_code
+                    __writelog(context['LAST_ERROR'])
                     if quiet is None:
-                        print(COHESITY_API['LAST_ERROR'])
+                        print(context['LAST_ERROR'])
                     if (response.status_code == 400 or response.status_code == 401) and 'invalid username' in response.json()['message'].lower():
                         if noretry is False and prompt is not False and setpasswd is None:
-                            apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey)
+                            apiauth(vip=vip, username=username, domain=domain, updatepw=True, prompt=prompt, helios=helios, useApiKey=useApiKey, context=context)
         except requests.exceptions.RequestException as e:
-            reportAuthError(e, quiet=quiet)
+            reportAuthError(e, quiet=quiet, context=context)
+    __sessionCacheSave(context, sessionKey)
+    __cassetteSaveSession(context)
+
+
+### session cache - reuse authenticated sessions (headers, cookies, helios cluster list) across runs
+SESSIONCACHE = {
+    'ENABLED': False,
+    'FILE': os.path.join(CONFIGDIR, 'sessions'),
+    'TTL': 4 * 3600,
+    'LOCK': threading.Lock(),
+    'REAUTHLOCK': threading.Lock()
+}
+
+
+def enableSessionCache(enabled=True, ttl=None, cacheFile=None):
+    """enable/disable reuse of authenticated sessions across script runs (ttl in seconds)"""
+    SESSIONCACHE['ENABLED'] = enabled
+    if ttl is not None:
+        SESSIONCACHE['TTL'] = ttl
+    if cacheFile is not None:
+        SESSIONCACHE['FILE'] = cacheFile
 
 
-def ProcessOidcToken(username, password, client_id, tenant_id, scope='openid profile'):
+def __lockFile(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    elif msvcrt is not None:
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def __unlockFile(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def __lockedJsonFile(fileName, lock, update=None, raiseOnError=False):
+    """read (and optionally update in place) a base64 encoded json dict file under an exclusive lock
+
+    errors are logged and ignored (best effort), unless raiseOnError is True
+    """
+    entries = {}
+    with lock:
+        try:
+            lockfile = open(fileName + '.lock', 'a')
+        except Exception as e:
+            __writelog('error opening %s.lock: %s' % (fileName, e))
+            if raiseOnError is True:
+                raise
+            return entries
+        tmpfile = None
+        try:
+            __lockFile(lockfile)
+            if os.path.exists(fileName):
+                f = open(fileName, 'r')
+                entries = json.loads(base64.b64decode(f.read().encode('utf-8')).decode('utf-8'))
+                f.close()
+            if update is not None:
+                update(entries)
+                tmpfile = '%s.%s.%s.tmp' % (fileName, os.getpid(), threading.current_thread().ident)
+                f = open(tmpfile, 'w')
+                f.write(base64.b64encode(json.dumps(entries).encode('utf-8')).decode('utf-8'))
+                f.close()
+                os.chmod(tmpfile, 0o600)
+                getattr(os, 'replace', os.rename)(tmpfile, fileName)
+                tmpfile = None
+        except Exception as e:
+            __writelog('error updating %s: %s' % (fileName, e))
+            if tmpfile is not None and os.path.exists(tmpfile):
+                os.remove(tmpfile)
+            if raiseOnError is True:
+                raise
+        finally:
+            __unlockFile(lockfile)
+            lockfile.close()
+    return entries
+
+
+def __sessionCacheUpdate(update=None):
+    """read (and optionally update) the session cache file under an exclusive lock"""
+    if update is None:
+        return __lockedJsonFile(SESSIONCACHE['FILE'], SESSIONCACHE['LOCK'])
+
+    def expireAndUpdate(sessions):
+        now = time.time()
+        for key in [k for (k, e) in sessions.items() if e['expires'] <= now]:
+            del sessions[key]
+        update(sessions)
+    return __lockedJsonFile(SESSIONCACHE['FILE'], SESSIONCACHE['LOCK'], expireAndUpdate)
+
+
+def __sessionCacheLoad(context, sessionKey):
+    entry = __sessionCacheUpdate().get(sessionKey, None)
+    if entry is None or entry['expires'] < time.time():
+        return False
+    for key in ['APIROOT', 'APIROOTv2', 'HEADER', 'HELIOSCLUSTERS', 'CONNECTEDHELIOSCLUSTERS']:
+        context[key] = entry[key]
+    context['SESSION'].cookies.update(entry['COOKIES'])
+    context['COOKIES'] = context['SESSION'].cookies.get_dict()
+    context['FROMSESSIONCACHE'] = True
+    context['AUTHENTICATED'] = True
+    context['LAST_ERROR'] = 'OK'
+    return True
+
+
+def __sessionCacheSave(context, sessionKey):
+    if sessionKey is None or context['AUTHENTICATED'] is not True:
+        return
+    entry = {
+        'expires': time.time() + SESSIONCACHE['TTL'],
+        'APIROOT': context['APIROOT'],
+        'APIROOTv2': context['APIROOTv2'],
+        'HEADER': context['HEADER'],
+        'COOKIES': context['SESSION'].cookies.get_dict(),
+        'HELIOSCLUSTERS': context.get('HELIOSCLUSTERS', []),
+        'CONNECTEDHELIOSCLUSTERS': context.get('CONNECTEDHELIOSCLUSTERS', [])
+    }
+    __sessionCacheUpdate(lambda sessions: sessions.update({sessionKey: entry}))
+
+
+def clearSessionCache(sessionKey=None):
+    """remove cached sessions (all, or one vip:domain:username:useApiKey:helios:tenantId key)"""
+    if sessionKey is None:
+        __sessionCacheUpdate(lambda sessions: sessions.clear())
+    else:
+        __sessionCacheUpdate(lambda sessions: sessions.pop(sessionKey, None))
+
+
+def __reauthenticate(context, header):
+    """log in again after a 401 (expired or revoked session), keeping the selected helios cluster"""
+    if 'AUTHARGS' not in context or context.get('REAUTHENTICATING', False) is True:
+        return False
+    with SESSIONCACHE['REAUTHLOCK']:
+        if context['HEADER'] is not header:
+            return context['AUTHENTICATED']  # another thread already re-authenticated
+        if context.get('SESSIONKEY', None) is not None:
+            clearSessionCache(context['SESSIONKEY'])
+        accessClusterId = header.get('accessClusterId', None)
+        __writelog('session expired, re-authenticating to %s' % context['AUTHARGS']['vip'])
+        context['REAUTHENTICATING'] = True
+        try:
+            apiauth(prompt=False, quiet=True, noretry=True, context=context, **context['AUTHARGS'])
+        finally:
+            context['REAUTHENTICATING'] = False
+        if accessClusterId is not None:
+            context['HEADER']['accessClusterId'] = accessClusterId
+        return context['AUTHENTICATED']
+
+
+def ProcessOidcToken(username, password, client_id, tenant_id, scope='openid profile', context=None):
+    context = __currentContext(context)
     callazure = None
     Azbody = {
         "grant_type": "password",
@@ -458,7 +870,7 @@ def ProcessOidcToken(username, password, client_id, tenant_id, scope='openid pro
     }
 
     # try:
-    callazure = COHESITY_API['SESSION'].post(AzureURL, data=Azbody, headers=AzureHeader, verify=False)
+    callazure = context['SESSION'].post(AzureURL, data=Azbody, headers=AzureHeader, verify=False)
     return callazure.json()['id_token']
     # except Exception:
     #     pass
@@ -466,68 +878,754 @@ def ProcessOidcToken(username, password, client_id, tenant_id, scope='openid pro
     return None
 
 
-def apiconnected():
-    return COHESITY_API['AUTHENTICATED']
+def apiconnected(context=None):
+    context = __currentContext(context)
+    return context['AUTHENTICATED']
 
 
-def apidrop():
-    global COHESITY_API
-    COHESITY_API['AUTHENTICATED'] = False
+def apidrop(context=None):
+    context = __currentContext(context)
+    context['AUTHENTICATED'] = False
 
 
-def impersonate(tenantId):
-    if COHESITY_API['AUTHENTICATED'] is True:
-        tenants = api('get', 'tenants')
+def impersonate(tenantId, context=None):
+    context = __currentContext(context)
+    if context['AUTHENTICATED'] is True:
+        tenants = api('get', 'tenants', context=context)
         if tenants is not None and len(tenants) > 0:
             thistenant = [t for t in tenants if t['name'].lower() == tenantId.lower()]
             if thistenant is not None and len(thistenant) > 0:
-                COHESITY_API['HEADER']['x-impersonate-tenant-id'] = thistenant[0]['tenantId']
+                context['HEADER']['x-impersonate-tenant-id'] = thistenant[0]['tenantId']
             else:
                 print('tenant %s not found' % tenantId)
         else:
             print('tenant %s not found' % tenantId)
 
 
-def switchback():
-    if 'x-impersonate-tenant-id' in COHESITY_API['HEADER']:
-        del COHESITY_API['HEADER']['x-impersonate-tenant-id']
+def switchback(context=None):
+    context = __currentContext(context)
+    if 'x-impersonate-tenant-id' in context['HEADER']:
+        del context['HEADER']['x-impersonate-tenant-id']
 
 
-def heliosCluster(clusterName=None, verbose=False):
-    global COHESITY_API
+def heliosCluster(clusterName=None, verbose=False, context=None):
+    context = __currentContext(context)
     if clusterName is not None:
         if isinstance(clusterName, dict) is True:
             clusterName = clusterName['name']
-        accessCluster = [cluster for cluster in CONNECTEDHELIOSCLUSTERS if cluster['name'].lower() == clusterName.lower()]
+        accessCluster = [cluster for cluster in context['CONNECTEDHELIOSCLUSTERS'] if cluster['name'].lower() == clusterName.lower()]
         if not accessCluster:
             print('Cluster %s not connected to Helios' % clusterName)
-            COHESITY_API['LAST_ERROR'] = 'Cluster %s not connected to Helios' % clusterName
+            context['LAST_ERROR'] = 'Cluster %s not connected to Helios' % clusterName
         else:
-            COHESITY_API['HEADER']['accessClusterId'] = str(accessCluster[0]['clusterId'])
-            COHESITY_API['LAST_ERROR'] = 'OK'
+            context['HEADER']['accessClusterId'] = str(accessCluster[0]['clusterId'])
+            context['LAST_ERROR'] = 'OK'
             if verbose is True:
                 print('Using %s' % clusterName)
     else:
         print("\n{0:<20}{1:<36}{2}".format('ClusterID', 'SoftwareVersion', "ClusterName"))
         print("{0:<20}{1:<36}{2}".format('---------', '---------------', "-----------"))
-        for cluster in sorted(CONNECTEDHELIOSCLUSTERS, key=lambda cluster: cluster['name'].lower()):
+        for cluster in sorted(context['CONNECTEDHELIOSCLUSTERS'], key=lambda cluster: cluster['name'].lower()):
             print("{0:<20}{1:<36}{2}".format(cluster['clusterId'], cluster['softwareVersion'], cluster['name']))
 
 
-def heliosClusters():
-    return sorted(CONNECTEDHELIOSCLUSTERS, key=lambda cluster: cluster['name'].lower())
+def heliosClusters(context=None):
+    context = __currentContext(context)
+    return sorted(context['CONNECTEDHELIOSCLUSTERS'], key=lambda cluster: cluster['name'].lower())
 
 
-### api call function
-def api(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reportingv2=None, context=None, timeout=300):
-    """api call function"""
+### copy of a helios context for one cluster (own header, so the shared accessClusterId is never changed)
+def heliosClusterContext(clusterName, context=None, shareSession=True):
+    context = __currentContext(context)
+    if isinstance(clusterName, dict) is True:
+        clusterName = clusterName['name']
+    accessCluster = [cluster for cluster in context['CONNECTEDHELIOSCLUSTERS'] if cluster['name'].lower() == clusterName.lower()]
+    if not accessCluster:
+        return None
+    clusterContext = context.copy()
+    clusterContext['HEADER'] = dict(context['HEADER'])
+    clusterContext['HEADER']['accessClusterId'] = str(accessCluster[0]['clusterId'])
+    clusterContext['LAST_ERROR'] = 'OK'
+    if shareSession is False:
+        clusterContext['SESSION'] = __newSession()
+        clusterContext['SESSION'].headers.update(context['SESSION'].headers)
+        clusterContext['SESSION'].cookies.update(context['SESSION'].cookies)
+    return clusterContext
+
+
+def heliosClusterMap(func, clusters=None, maxWorkers=8, context=None):
+    """run func(cluster) for each helios cluster concurrently (default is all connected clusters)
+
+    within func, api() and the other functions use that cluster (as if heliosCluster had been called),
+    returns {clusterName: {'result': return value of func, 'error': exception or None}}
+    """
+    context = __currentContext(context)
+    if clusters is None:
+        clusters = heliosClusters(context=context)
+    results = {}
+
+    def runCluster(cluster):
+        clusterName = cluster['name'] if isinstance(cluster, dict) else cluster
+        clusterContext = heliosClusterContext(clusterName, context=context)
+        if clusterContext is None:
+            results[clusterName] = {'result': None, 'error': 'Cluster %s not connected to Helios' % clusterName}
+            return
+        THREADCONTEXT.context = clusterContext
+        try:
+            results[clusterName] = {'result': func(cluster), 'error': None}
+        except Exception as e:
+            __writelog('heliosClusterMap %s: %s' % (clusterName, e))
+            results[clusterName] = {'result': None, 'error': e}
+        finally:
+            THREADCONTEXT.context = None
+
+    if asyncio is None or maxWorkers <= 1:
+        for cluster in clusters:
+            runCluster(cluster)
+    else:
+        with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+            list(executor.map(runCluster, clusters))
+    clusterNames = [cluster['name'] if isinstance(cluster, dict) else cluster for cluster in clusters]
+    return dict([(clusterName, results[clusterName]) for clusterName in clusterNames])
+
+
+def mapInOrder(func, items, maxWorkers=8):
+    """yield func(item) for each item, running up to maxWorkers at a time, in the original order
+
+    items are read as they are needed (no more than 2 x maxWorkers results are held at once),
+    an exception raised by func is raised when its result is reached
+    """
+    if asyncio is None or maxWorkers <= 1:
+        for item in items:
+            yield func(item)
+        return
+    executor = ThreadPoolExecutor(max_workers=maxWorkers)
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= maxWorkers * 2:
+                yield pending.popleft().result()
+        while len(pending) > 0:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown()
+
+
+### on-disk GET response cache (opt-in)
+APICACHE = {
+    'ENABLED': False,
+    'DIR': os.path.join(CONFIGDIR, 'cache'),
+    'MAXBYTES': 500 * 1024 * 1024,
+    'DEFAULTTTL': 0,
+    'TTLS': {
+        'protectionJobs': 3600,
+        'protectionPolicies': 3600,
+        'viewBoxes': 3600,
+        'vaults': 3600,
+        'protectionSources': 900,
+        'cluster': 300
+    },
+    'LOCK': threading.Lock()
+}
+
+
+def enableApiCache(enabled=True, ttls=None, defaultTtl=None, maxBytes=None, cacheDir=None):
+    """enable/disable the GET response cache, ttls is a dict of endpoint: seconds"""
+    APICACHE['ENABLED'] = enabled
+    if ttls is not None:
+        APICACHE['TTLS'].update(ttls)
+    if defaultTtl is not None:
+        APICACHE['DEFAULTTTL'] = defaultTtl
+    if maxBytes is not None:
+        APICACHE['MAXBYTES'] = maxBytes
+    if cacheDir is not None:
+        APICACHE['DIR'] = cacheDir
+
+
+def __cacheEndpoint(uri):
+    endpoint = uri.split('?')[0].strip('/')
+    if endpoint.startswith('public/'):
+        endpoint = endpoint[7:]
+    return endpoint
+
+
+def __cacheTtl(endpoint):
+    if endpoint in APICACHE['TTLS']:
+        return APICACHE['TTLS'][endpoint]
+    return APICACHE['TTLS'].get(endpoint.split('/')[0], APICACHE['DEFAULTTTL'])
+
+
+def __cacheCluster(context):
+    header = context['HEADER']
+    clusterKey = '%s:%s:%s:%s:%s' % (context.get('APIROOT', ''), context.get('USERNAME', ''), header.get('accessClusterId', ''),
+                                     header.get('x-impersonate-tenant-id', ''), header.get('regionid', ''))
+    return hashlib.sha256(clusterKey.encode('utf-8')).hexdigest()[0:16]
+
+
+def __cachePath(context, method, url, endpoint):
+    keyhash = hashlib.sha256(('%s %s' % (method, url)).encode('utf-8')).hexdigest()[0:32]
+    return os.path.join(APICACHE['DIR'], '%s-%s-%s.json' % (__cacheCluster(context), endpoint.split('/')[0], keyhash))
+
+
+def __cacheGet(context, url, endpoint):
+    ttl = __cacheTtl(endpoint)
+    if ttl <= 0:
+        return None
+    cachefile = __cachePath(context, 'get', url, endpoint)
+    try:
+        if os.path.getmtime(cachefile) + ttl < time.time():
+            return None
+        f = open(cachefile, 'r')
+        entry = json.load(f)
+        f.close()
+        if entry['time'] + ttl < time.time():
+            return None
+        os.utime(cachefile, (time.time(), entry['time']))  # atime = last used, for LRU eviction
+        return entry['response']
+    except Exception:
+        return None
+
+
+def __cachePut(context, url, endpoint, responsejson):
+    if __cacheTtl(endpoint) <= 0:
+        return
+    cachefile = __cachePath(context, 'get', url, endpoint)
+    try:
+        if os.path.isdir(APICACHE['DIR']) is False:
+            os.makedirs(APICACHE['DIR'], 0o700)
+        now = time.time()
+        tmpfile = '%s.%s.%s.tmp' % (cachefile, os.getpid(), threading.current_thread().ident)
+        f = open(tmpfile, 'w')
+        json.dump({'time': now, 'url': url, 'response': responsejson}, f)
+        f.close()
+        os.chmod(tmpfile, 0o600)
+        getattr(os, 'replace', os.rename)(tmpfile, cachefile)
+        os.utime(cachefile, (now, now))
+        __cacheEvict()
+    except Exception as e:
+        __writelog('error writing api cache: %s' % e)
+
+
+def __cacheEvict():
+    """remove least recently used entries until the cache fits in MAXBYTES"""
+    with APICACHE['LOCK']:
+        entries = []
+        totalBytes = 0
+        for filename in os.listdir(APICACHE['DIR']):
+            if filename.endswith('.json'):
+                try:
+                    stat = os.stat(os.path.join(APICACHE['DIR'], filename))
+                    entries.append((stat.st_atime, stat.st_size, filename))
+                    totalBytes += stat.st_size
+                except Exception:
+                    pass
+        if totalBytes <= APICACHE['MAXBYTES']:
+            return
+        for (atime, size, filename) in sorted(entries):
+            try:
+                os.remove(os.path.join(APICACHE['DIR'], filename))
+                totalBytes -= size
+            except Exception:
+                pass
+            if totalBytes <= APICACHE['MAXBYTES']:
+                break
+
+
+def clearApiCache(endpoint=None, context=None):
+    """remove cached responses (all, or for one endpoint, e.g. 'protectionJobs', optionally for one cluster context)"""
+    if os.path.isdir(APICACHE['DIR']) is False:
+        return
+    prefix = ''
     if context is not None:
-        THISCONTEXT = context
+        prefix = __cacheCluster(context) + '-'
+    for filename in os.listdir(APICACHE['DIR']):
+        if not filename.startswith(prefix) or not filename.endswith('.json'):
+            continue
+        if endpoint is not None and '-'.join(filename[:-5].split('-')[1:-1]) != __cacheEndpoint(endpoint).split('/')[0]:
+            continue
+        try:
+            os.remove(os.path.join(APICACHE['DIR'], filename))
+        except Exception:
+            pass
+
+
+### api call telemetry - per endpoint call counts, latency histogram, bytes and retries
+APISTATS = {
+    'ENABLED': False,
+    'BUCKETS': [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300],
+    'ENDPOINTS': {},
+    'EXITREPORT': None,
+    'LOCK': threading.Lock()
+}
+
+
+def enableApiStats(enabled=True, summaryOnExit=True, exportFile=None, exportFormat='json'):
+    """record telemetry for every api, fileDownload and fileUpload call, optionally report on exit"""
+    APISTATS['ENABLED'] = enabled
+    if enabled is True and APISTATS['EXITREPORT'] is None:
+        atexit.register(__apiStatsOnExit)
+    APISTATS['EXITREPORT'] = {'summary': summaryOnExit, 'file': exportFile, 'format': exportFormat}
+
+
+def __apiStatsOnExit():
+    if APISTATS['ENABLED'] is not True or not APISTATS['ENDPOINTS']:
+        return
+    if APISTATS['EXITREPORT']['summary'] is True:
+        printApiStats()
+    if APISTATS['EXITREPORT']['file'] is not None:
+        exportApiStats(APISTATS['EXITREPORT']['file'], APISTATS['EXITREPORT']['format'])
+
+
+def __endpointTemplate(url):
+    """url path with ids replaced by {id}, e.g. /v2/data-protect/protection-groups/{id}/runs"""
+    segments = []
+    for segment in urlparse(url).path.split('/'):
+        if re.match(r'^[0-9:_-]*[0-9][0-9:_-]*$', segment) or re.match(r'^[0-9a-fA-F-]{16,}$', segment):
+            segment = '{id}'
+        segments.append(segment)
+    return '/'.join(segments)
+
+
+def __recordApiCall(method, url, status, seconds, requestBytes=0, responseBytes=0, retries=0, transferBytes=None):
+    if APISTATS['ENABLED'] is not True:
+        return
+    key = '%s %s' % (method.upper(), __endpointTemplate(url))
+    with APISTATS['LOCK']:
+        stats = APISTATS['ENDPOINTS'].get(key, None)
+        if stats is None:
+            stats = {'method': method.upper(), 'endpoint': __endpointTemplate(url), 'calls': 0, 'errors': 0, 'seconds': 0.0,
+                     'maxSeconds': 0.0, 'requestBytes': 0, 'responseBytes': 0, 'transferBytes': 0, 'retries': 0, 'status': {},
+                     'buckets': [0 for b in APISTATS['BUCKETS']] + [0]}
+            APISTATS['ENDPOINTS'][key] = stats
+        stats['calls'] += 1
+        if status == 0 or status >= 400:
+            stats['errors'] += 1
+        stats['seconds'] += seconds
+        stats['maxSeconds'] = max(stats['maxSeconds'], seconds)
+        stats['requestBytes'] += requestBytes
+        stats['responseBytes'] += responseBytes
+        stats['transferBytes'] += responseBytes if transferBytes is None else transferBytes
+        stats['retries'] += retries
+        stats['status'][str(status)] = stats['status'].get(str(status), 0) + 1
+        bucket = len(APISTATS['BUCKETS'])
+        for (i, limit) in enumerate(APISTATS['BUCKETS']):
+            if seconds <= limit:
+                bucket = i
+                break
+        stats['buckets'][bucket] += 1
+
+
+def __transferBytes(response):
+    """response bytes received over the wire (before decompression)"""
+    try:
+        return response.raw.tell() or len(response.content)
+    except Exception:
+        return len(response.content)
+
+
+def apiStats():
+    """return recorded telemetry, sorted by total time spent per endpoint"""
+    with APISTATS['LOCK']:
+        stats = [json.loads(json.dumps(s)) for s in APISTATS['ENDPOINTS'].values()]
+    return sorted(stats, key=lambda s: s['seconds'], reverse=True)
+
+
+def printApiStats():
+    """print telemetry summary table"""
+    stats = apiStats()
+    if not stats:
+        return
+    print('\njson codec: %s, accept-encoding: %s' % (JSONCODEC['NAME'], ACCEPTENCODING))
+    print('\n{0:>7} {1:>6} {2:>9} {3:>8} {4:>8} {5:>11} {6:>9} {7:>7}  {8}'.format('Calls', 'Errors', 'TotalSecs', 'AvgSecs', 'MaxSecs', 'ResponseMB', 'WireMB', 'Retries', 'Endpoint'))
+    print('{0:>7} {1:>6} {2:>9} {3:>8} {4:>8} {5:>11} {6:>9} {7:>7}  {8}'.format('-----', '------', '---------', '-------', '-------', '----------', '------', '-------', '--------'))
+    for s in stats:
+        print('{0:>7} {1:>6} {2:>9.1f} {3:>8.3f} {4:>8.3f} {5:>11.1f} {6:>9.1f} {7:>7}  {8} {9}'.format(s['calls'], s['errors'], s['seconds'], s['seconds'] / s['calls'], s['maxSeconds'],
+                                                                                                          s['responseBytes'] / 1048576.0, s['transferBytes'] / 1048576.0, s['retries'],
+                                                                                                          s['method'], s['endpoint']))
+
+
+def exportApiStats(fileName=None, exportFormat='json'):
+    """return telemetry as json or prometheus text (and write to fileName if specified)"""
+    stats = apiStats()
+    if exportFormat == 'prometheus':
+        lines = []
+        for (name, kind, helptext) in (('pyhesity_api_calls_total', 'counter', 'API calls'),
+                                       ('pyhesity_api_errors_total', 'counter', 'API calls that failed'),
+                                       ('pyhesity_api_retries_total', 'counter', 'API call retries'),
+                                       ('pyhesity_api_request_bytes_total', 'counter', 'API request bytes'),
+                                       ('pyhesity_api_response_bytes_total', 'counter', 'API response bytes'),
+                                       ('pyhesity_api_transfer_bytes_total', 'counter', 'API response bytes received (before decompression)'),
+                                       ('pyhesity_api_seconds', 'histogram', 'API call latency')):
+            lines.append('# HELP %s %s' % (name, helptext))
+            lines.append('# TYPE %s %s' % (name, kind))
+            for s in stats:
+                labels = 'method="%s",endpoint="%s"' % (s['method'], s['endpoint'])
+                if kind == 'histogram':
+                    cumulative = 0
+                    for (i, limit) in enumerate(APISTATS['BUCKETS'] + ['+Inf']):
+                        cumulative += s['buckets'][i]
+                        lines.append('%s_bucket{%s,le="%s"} %s' % (name, labels, limit, cumulative))
+                    lines.append('%s_sum{%s} %s' % (name, labels, s['seconds']))
+                    lines.append('%s_count{%s} %s' % (name, labels, s['calls']))
+                else:
+                    value = {'pyhesity_api_calls_total': s['calls'], 'pyhesity_api_errors_total': s['errors'],
+                             'pyhesity_api_retries_total': s['retries'], 'pyhesity_api_request_bytes_total': s['requestBytes'],
+                             'pyhesity_api_response_bytes_total': s['responseBytes'], 'pyhesity_api_transfer_bytes_total': s['transferBytes']}[name]
+                    lines.append('%s{%s} %s' % (name, labels, value))
+        output = '\n'.join(lines) + '\n'
     else:
-        THISCONTEXT = COHESITY_API
+        output = json.dumps({'buckets': APISTATS['BUCKETS'], 'codec': apiCodec(), 'endpoints': stats}, indent=2)
+    if fileName is not None:
+        f = open(fileName, 'w')
+        f.write(output)
+        f.close()
+    return output
+
+
+### retries with exponential backoff and per-node circuit breaker
+APIRETRY = {
+    'RETRIES': 3,
+    'BACKOFF': 2,
+    'MAXBACKOFF': 60,
+    'MAXRETRYAFTER': 300,
+    'STATUSCODES': [429, 502, 503, 504],
+    'METHODS': ['get', 'put', 'delete'],
+    'BREAKERTHRESHOLD': 5,
+    'BREAKERCOOLDOWN': 60,
+    'BREAKERS': {},
+    'LOCK': threading.Lock()
+}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    pass
+
+
+def setApiRetry(retries=None, backoff=None, maxBackoff=None, statusCodes=None, methods=None, breakerThreshold=None, breakerCooldown=None):
+    """configure retries (per call default), backoff seconds and circuit breaker (failures before opening, seconds open)"""
+    for (key, value) in (('RETRIES', retries), ('BACKOFF', backoff), ('MAXBACKOFF', maxBackoff), ('STATUSCODES', statusCodes),
+                         ('METHODS', methods), ('BREAKERTHRESHOLD', breakerThreshold), ('BREAKERCOOLDOWN', breakerCooldown)):
+        if value is not None:
+            APIRETRY[key] = value
+
+
+def __retryDelay(attempt, retryAfter=None):
+    if retryAfter is not None:
+        try:
+            if retryAfter.strip().isdigit():
+                delay = int(retryAfter)
+            else:
+                delay = mktime_tz(parsedate_tz(retryAfter)) - time.time()
+            return min(max(delay, 0), APIRETRY['MAXRETRYAFTER'])
+        except Exception:
+            pass
+    delay = min(APIRETRY['MAXBACKOFF'], APIRETRY['BACKOFF'] * (2 ** attempt))
+    return delay / 2.0 + random.uniform(0, delay / 2.0)
+
+
+def __breakerKey(context, url):
+    """breaker per node, and per cluster behind helios/mcm (one bad cluster doesn't open the circuit for the others)"""
+    host = urlparse(url).netloc
+    for header in ['accessClusterId', 'regionid']:
+        if context['HEADER'].get(header, None) is not None:
+            host = '%s/%s' % (host, context['HEADER'][header])
+    return host
+
+
+def __breakerCheck(host):
+    with APIRETRY['LOCK']:
+        breaker = APIRETRY['BREAKERS'].get(host, None)
+        if breaker is not None and breaker['failures'] >= APIRETRY['BREAKERTHRESHOLD']:
+            if time.time() < breaker['openUntil']:
+                raise CircuitOpenError('circuit open for %s (%s consecutive failures)' % (host, breaker['failures']))
+            # half open: let one call through, another failure re-opens the circuit
+            breaker['openUntil'] = time.time() + APIRETRY['BREAKERCOOLDOWN']
+
+
+def __breakerResult(host, success):
+    with APIRETRY['LOCK']:
+        if success is True:
+            APIRETRY['BREAKERS'].pop(host, None)
+        else:
+            breaker = APIRETRY['BREAKERS'].setdefault(host, {'failures': 0, 'openUntil': 0})
+            breaker['failures'] += 1
+            if breaker['failures'] >= APIRETRY['BREAKERTHRESHOLD']:
+                breaker['openUntil'] = time.time() + APIRETRY['BREAKERCOOLDOWN']
+
+
+def __apiRequest(context, method, url, data=None, timeout=300, retries=None, stream=False, headers=None):
+    """send request, retrying idempotent methods on throttling, gateway errors and connection resets
+
+    headers are added to the context headers for this request, with stream=True the body of a
+    successful response is left unread (the caller reads it, and records it with __recordApiCall)
+    """
+    if APICASSETTE['MODE'] == 'replay':
+        return __cassetteReplay(context, method, url, data, headers)
+    if retries is None:
+        retries = APIRETRY['RETRIES'] if method in APIRETRY['METHODS'] else 0
+    host = __breakerKey(context, url)
+    attempt = 0
+    startTime = time.time()
+    while True:
+        __breakerCheck(host)
+        header = context['HEADER']
+        if headers is not None:
+            header = dict(header)
+            header.update(headers)
+        try:
+            if method == 'get':
+                response = context['SESSION'].get(url, headers=header, verify=False, timeout=timeout, stream=stream)
+            else:
+                body = None if data is None else __jsonDumps(data)
+                response = context['SESSION'].request(method, url, headers=header, data=body, verify=False, timeout=timeout)
+        except requests.exceptions.ConnectionError as e:
+            __breakerResult(host, False)
+            if attempt >= retries:
+                __recordApiCall(method, url, 0, time.time() - startTime, retries=attempt)
+                raise
+            delay = __retryDelay(attempt)
+            __writelog('%s %s failed (%s), retry %s of %s in %0.1f seconds' % (method, url, e, attempt + 1, retries, delay))
+        else:
+            if response.status_code not in APIRETRY['STATUSCODES'] or attempt >= retries:
+                if response.status_code not in APIRETRY['STATUSCODES']:
+                    __breakerResult(host, True)
+                elif response.status_code != 429:
+                    __breakerResult(host, False)
+                if stream is True and response.status_code < 400:
+                    if APICASSETTE['MODE'] == 'record':
+                        __cassetteRecord(context, method, url, data, response, headers)  # reads the body into memory
+                    return response
+                __recordApiCall(method, url, response.status_code, time.time() - startTime, len(response.request.body or ''),
+                                len(response.content), attempt, __transferBytes(response))
+                if APICASSETTE['MODE'] == 'record':
+                    __cassetteRecord(context, method, url, data, response, headers)
+                return response
+            if response.status_code != 429:
+                __breakerResult(host, False)
+            response.close()
+            delay = __retryDelay(attempt, response.headers.get('Retry-After', None))
+            __writelog('%s %s returned %s, retry %s of %s in %0.1f seconds' % (method, url, response.status_code, attempt + 1, retries, delay))
+        time.sleep(delay)
+        attempt += 1
+
+
+### record/replay of api calls - responses are stored in a zip file (one deflated member per response, plus an index)
+APICASSETTE = {
+    'MODE': None,
+    'FILE': None,
+    'ZIP': None,
+    'INDEX': {'sessions': {}, 'requests': {}},
+    'PLAYED': {},
+    'IGNOREPARAMS': [],
+    'LOCK': threading.Lock()
+}
+
+CASSETTEHEADERS = ['accept', 'content-type', 'accessclusterid', 'regionid', 'x-impersonate-tenant-id']
+
+
+def startCassette(cassetteFile, mode='record', ignoreParams=None):
+    """record api calls to cassetteFile, or replay them from it (mode='replay') with no network.
+       ignoreParams: query parameters left out when matching requests (e.g. time stamps based on now)"""
+    if mode not in ['record', 'replay']:
+        print('invalid cassette mode: %s' % mode)
+        return
+    stopCassette()
+    with APICASSETTE['LOCK']:
+        APICASSETTE['IGNOREPARAMS'] = ignoreParams or []
+        APICASSETTE['PLAYED'] = {}
+        if mode == 'record':
+            APICASSETTE['ZIP'] = zipfile.ZipFile(cassetteFile, 'w', zipfile.ZIP_DEFLATED, allowZip64=True)
+            APICASSETTE['INDEX'] = {'version': api_version, 'ignoreParams': APICASSETTE['IGNOREPARAMS'], 'sessions': {}, 'requests': {}}
+        else:
+            APICASSETTE['ZIP'] = zipfile.ZipFile(cassetteFile, 'r')
+            APICASSETTE['INDEX'] = json.loads(APICASSETTE['ZIP'].read('index.json').decode('utf-8'))
+            if ignoreParams is None:
+                APICASSETTE['IGNOREPARAMS'] = APICASSETTE['INDEX'].get('ignoreParams', [])
+        APICASSETTE['FILE'] = cassetteFile
+        APICASSETTE['MODE'] = mode
+
+
+def stopCassette():
+    """stop recording (writes the index) or replaying"""
+    with APICASSETTE['LOCK']:
+        if APICASSETTE['ZIP'] is None:
+            return
+        if APICASSETTE['MODE'] == 'record':
+            APICASSETTE['ZIP'].writestr('index.json', json.dumps(APICASSETTE['INDEX']).encode('utf-8'))
+        APICASSETTE['ZIP'].close()
+        APICASSETTE['ZIP'] = None
+        APICASSETTE['MODE'] = None
+
+
+atexit.register(stopCassette)
+
+
+def __cassetteKey(context, method, url, data, headers=None):
+    parsed = urlparse(url)
+    params = sorted([p for p in parsed.query.split('&') if p != '' and p.split('=')[0] not in APICASSETTE['IGNOREPARAMS']])
+    header = context['HEADER']
+    body = '' if data is None else json.dumps(data, sort_keys=True)
+    key = '%s %s%s?%s %s:%s:%s:%s' % (method, parsed.netloc, parsed.path, '&'.join(params), header.get('accessClusterId', ''),
+                                      header.get('x-impersonate-tenant-id', ''), header.get('regionid', ''),
+                                      hashlib.sha256(body.encode('utf-8')).hexdigest()[0:16])
+    if headers is not None and 'Range' in headers:
+        key = '%s %s' % (key, headers['Range'])  # byte ranges of a download
+    return key
+
+
+def __cassetteRecord(context, method, url, data, response, headers=None):
+    key = __cassetteKey(context, method, url, data, headers)
+    meta = {'key': key, 'status': response.status_code, 'reason': response.reason,
+            'headers': dict([(k, v) for (k, v) in response.headers.items() if k.lower() in ['content-type', 'retry-after', 'content-range']])}
+    with APICASSETTE['LOCK']:
+        if APICASSETTE['MODE'] != 'record':
+            return
+        members = APICASSETTE['INDEX']['requests'].setdefault(key, [])
+        member = '%s-%s' % (hashlib.sha256(key.encode('utf-8')).hexdigest()[0:32], len(members))
+        APICASSETTE['ZIP'].writestr(member, json.dumps(meta).encode('utf-8') + b'\n' + response.content)
+        members.append(member)
+
+
+def __cassetteReplay(context, method, url, data, headers=None):
+    """serve a recorded response (repeated requests are played back in recorded order, the last one repeats)"""
+    key = __cassetteKey(context, method, url, data, headers)
+    with APICASSETTE['LOCK']:
+        members = APICASSETTE['INDEX']['requests'].get(key, None)
+        if not members:
+            raise requests.exceptions.ConnectionError('no recorded response for %s %s' % (method, url))
+        played = APICASSETTE['PLAYED'].get(key, 0)
+        APICASSETTE['PLAYED'][key] = played + 1
+        content = APICASSETTE['ZIP'].read(members[min(played, len(members) - 1)])
+    (meta, content) = content.split(b'\n', 1)
+    meta = json.loads(meta.decode('utf-8'))
+    response = requests.models.Response()
+    response.status_code = meta['status']
+    response.reason = meta['reason']
+    response.headers = requests.structures.CaseInsensitiveDict(meta['headers'])
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response._content = content
+    response._content_consumed = True  # iter_content serves the recorded body
+    response.url = url
+    response.request = requests.Request(method.upper(), url, json=data).prepare()
+    __recordApiCall(method, url, response.status_code, 0, len(response.request.body or ''), len(content))
+    return response
+
+
+def __cassetteSaveSession(context):
+    if APICASSETTE['MODE'] != 'record' or context['AUTHENTICATED'] is not True:
+        return
+    with APICASSETTE['LOCK']:
+        APICASSETTE['INDEX']['sessions'][context['AUTHKEY']] = {
+            'APIROOT': context['APIROOT'],
+            'APIROOTv2': context['APIROOTv2'],
+            'HEADER': dict([(k, v) for (k, v) in context['HEADER'].items() if k.lower() in CASSETTEHEADERS]),
+            'HELIOSCLUSTERS': context.get('HELIOSCLUSTERS', []),
+            'CONNECTEDHELIOSCLUSTERS': context.get('CONNECTEDHELIOSCLUSTERS', [])
+        }
+
+
+def __cassetteLoadSession(context):
+    entry = APICASSETTE['INDEX']['sessions'].get(context['AUTHKEY'], None)
+    if entry is None:
+        return False
+    for key in ['APIROOT', 'APIROOTv2', 'HELIOSCLUSTERS', 'CONNECTEDHELIOSCLUSTERS']:
+        context[key] = entry[key]
+    context['HEADER'] = dict(entry['HEADER'])
+    context['COOKIES'] = {}
+    context['AUTHENTICATED'] = True
+    context['LAST_ERROR'] = 'OK'
+    return True
+
+
+### in-process memoization of GETs (identical concurrent GETs share one request)
+APIMEMO = {
+    'ENABLED': False,
+    'MAXENTRIES': 10000,
+    'ENTRIES': OrderedDict(),
+    'INFLIGHT': {},
+    'HITS': 0,
+    'MISSES': 0,
+    'LOCK': threading.Lock()
+}
+
+
+def enableApiMemo(enabled=True, maxEntries=None):
+    """remember GET responses for the life of the process (least recently used beyond maxEntries are dropped)"""
+    APIMEMO['ENABLED'] = enabled
+    if maxEntries is not None:
+        APIMEMO['MAXENTRIES'] = maxEntries
+    if enabled is False:
+        clearApiMemo()
+
+
+def clearApiMemo(endpoint=None, context=None):
+    """forget memoized responses (all, or for one endpoint, e.g. 'protectionSources', optionally for one cluster context)"""
+    with APIMEMO['LOCK']:
+        if endpoint is None and context is None:
+            APIMEMO['ENTRIES'].clear()
+            return
+        clusterKey = None if context is None else __cacheCluster(context)
+        endpoint = None if endpoint is None else __cacheEndpoint(endpoint).split('/')[0]
+        for key in list(APIMEMO['ENTRIES'].keys()):
+            if (clusterKey is None or key[0] == clusterKey) and (endpoint is None or key[1] == endpoint):
+                del APIMEMO['ENTRIES'][key]
+
+
+### api call function
+def api(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reportingv2=None, context=None, timeout=300, nocache=None, retries=None):
+    """api call function"""
+    context = __currentContext(context)
+    if APIMEMO['ENABLED'] is not True or nocache is True or context['AUTHENTICATED'] is False:
+        return __api(method, uri, data, quiet, mcm, mcmv2, v, reportingv2, context, timeout, nocache, retries)
+    if method != 'get':
+        result = __api(method, uri, data, quiet, mcm, mcmv2, v, reportingv2, context, timeout, nocache, retries)
+        clearApiMemo(uri, context=context)
+        return result
+    key = (__cacheCluster(context), __cacheEndpoint(uri).split('/')[0], mcm, mcmv2, reportingv2, v, uri)
+    with APIMEMO['LOCK']:
+        if key in APIMEMO['ENTRIES']:
+            APIMEMO['ENTRIES'][key] = APIMEMO['ENTRIES'].pop(key)  # most recently used
+            APIMEMO['HITS'] += 1
+            return copy.deepcopy(APIMEMO['ENTRIES'][key])
+        inflight = APIMEMO['INFLIGHT'].get(key, None)
+        if inflight is None:
+            inflight = {'event': threading.Event(), 'result': None}
+            APIMEMO['INFLIGHT'][key] = inflight
+            leader = True
+            APIMEMO['MISSES'] += 1
+        else:
+            leader = False
+            APIMEMO['HITS'] += 1
+    if leader is False:
+        inflight['event'].wait()
+        return copy.deepcopy(inflight['result'])
+    try:
+        result = __api(method, uri, data, quiet, mcm, mcmv2, v, reportingv2, context, timeout, nocache, retries)
+        inflight['result'] = result
+        if isinstance(result, (dict, list)) and not (isinstance(result, dict) and 'error' in result):
+            with APIMEMO['LOCK']:
+                APIMEMO['ENTRIES'][key] = result
+                while len(APIMEMO['ENTRIES']) > APIMEMO['MAXENTRIES']:
+                    APIMEMO['ENTRIES'].popitem(last=False)
+            return copy.deepcopy(result)
+        return result
+    finally:
+        with APIMEMO['LOCK']:
+            APIMEMO['INFLIGHT'].pop(key, None)
+        inflight['event'].set()
+
+
+def __api(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reportingv2=None, context=None, timeout=300, nocache=None, retries=None):
+    THISCONTEXT = __currentContext(context)
     if THISCONTEXT['AUTHENTICATED'] is False:
         print('Not Connected')
         return None
+    cacheEndpoint = None
+    if APICACHE['ENABLED'] is True and nocache is not True:
+        cacheEndpoint = __cacheEndpoint(uri)
     response = ''
     if mcm is not None:
         url = THISCONTEXT['APIROOTMCM'] + uri
@@ -543,20 +1641,24 @@ def api(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reporting
                 uri = '/public/' + uri
             url = THISCONTEXT['APIROOT'] + uri
 
+    if cacheEndpoint is not None and method == 'get':
+        cached = __cacheGet(THISCONTEXT, url, cacheEndpoint)
+        if cached is not None:
+            THISCONTEXT['LAST_ERROR'] = 'OK'
+            return cached
+
     if method in APIMETHODS:
         try:
-            if method == 'get':
-                response = COHESITY_API['SESSION'].get(url, headers=THISCONTEXT['HEADER'], verify=False, timeout=timeout)
-            if method == 'post':
-                response = COHESITY_API['SESSION'].post(url, headers=THISCONTEXT['HEADER'], json=data, verify=False, timeout=timeout)
-            if method == 'put':
-                response = COHESITY_API['SESSION'].put(url, headers=THISCONTEXT['HEADER'], json=data, verify=False, timeout=timeout)
-            if method == 'delete':
-                response = COHESITY_API['SESSION'].delete(url, headers=THISCONTEXT['HEADER'], json=data, verify=False, timeout=timeout)
-            COHESITY_API['LAST_ERROR'] = 'OK'
+            header = THISCONTEXT['HEADER']
+            response = __apiRequest(THISCONTEXT, method, url, data=data, timeout=timeout, retries=retries)
+            if response.status_code == 401 and __reauthenticate(THISCONTEXT, header) is True:
+                response = __apiRequest(THISCONTEXT, method, url, data=data, timeout=timeout, retries=retries)
+            THISCONTEXT['LAST_ERROR'] = 'OK'
+            if cacheEndpoint is not None and method != 'get':
+                clearApiCache(cacheEndpoint, context=THISCONTEXT)
         except requests.exceptions.RequestException as e:
             __writelog(e)
-            COHESITY_API['LAST_ERROR'] = '%s' % e
+            THISCONTEXT['LAST_ERROR'] = '%s' % e
             if quiet is None:
                 print(e)
 
@@ -564,18 +1666,18 @@ def api(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reporting
             return ''
         if response != '':
             if response.status_code == 204:
-                COHESITY_API['LAST_ERROR'] = response.reason
+                THISCONTEXT['LAST_ERROR'] = response.reason
                 return ''  # return None
             if response.status_code == 404:
-                COHESITY_API['LAST_ERROR'] = response.reason
+                THISCONTEXT['LAST_ERROR'] = response.reason
                 if quiet is None:
                     print('Invalid api call: ' + uri)
                 return None
             responsejson = None
             try:
-                responsejson = response.json()
+                responsejson = __jsonLoads(response)
             except Exception:  # ValueError as ve:
-                COHESITY_API['LAST_ERROR'] = response.reason
+                THISCONTEXT['LAST_ERROR'] = response.reason
                 if response.reason != 'OK':
                     print('*** %s ***' % response.reason)
                     return None
@@ -584,7 +1686,7 @@ def api(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reporting
             if responsejson is not None:
                 if 'errorCode' in responsejson:
                     if 'message' in responsejson:
-                        COHESITY_API['LAST_ERROR'] = responsejson['errorCode'][1:] + ': ' + responsejson['message']
+                        THISCONTEXT['LAST_ERROR'] = responsejson['errorCode'][1:] + ': ' + responsejson['message']
                         if quiet is None:
                             print(responsejson['errorCode'][1:] + ': ' + responsejson['message'])
                             return {'error': responsejson['errorCode'][1:] + ': ' + responsejson['message']}
@@ -597,6 +1699,8 @@ def api(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reporting
                         else:
                             return None
                 else:
+                    if cacheEndpoint is not None and method == 'get':
+                        __cachePut(THISCONTEXT, url, cacheEndpoint, responsejson)
                     return responsejson
             else:
                 try:
@@ -610,6 +1714,555 @@ def api(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reporting
             print("invalid api method")
 
 
+### asyncio api calls - each cluster gets its own worker pool, sized to the in-flight limit
+AAPI = {
+    'MAXCONCURRENT': 8,
+    'EXECUTORS': {},
+    'LOCK': threading.Lock()
+}
+
+
+def setAsyncLimit(maxConcurrent=8):
+    """set the maximum number of in-flight aapi calls per cluster"""
+    with AAPI['LOCK']:
+        AAPI['MAXCONCURRENT'] = max(1, int(maxConcurrent))
+        for executor in AAPI['EXECUTORS'].values():
+            executor.shutdown(wait=False)
+        AAPI['EXECUTORS'] = {}
+
+
+def __asyncExecutor(context):
+    clusterKey = '%s:%s' % (context.get('APIROOT', ''), context['HEADER'].get('accessClusterId', ''))
+    with AAPI['LOCK']:
+        if clusterKey not in AAPI['EXECUTORS']:
+            AAPI['EXECUTORS'][clusterKey] = ThreadPoolExecutor(max_workers=AAPI['MAXCONCURRENT'])
+        return AAPI['EXECUTORS'][clusterKey]
+
+
+def aapi(method, uri, data=None, quiet=None, mcm=None, mcmv2=None, v=1, reportingv2=None, context=None, timeout=300, nocache=None, retries=None):
+    """asynchronous api call (awaitable), same parameters and return values as api()
+
+    results = await asyncio.gather(*[aapi('get', 'protectionRuns?jobId=%s' % job['id']) for job in jobs])
+    """
+    if asyncio is None:
+        print('aapi requires python 3')
+        return None
+    context = __currentContext(context)
+    future = __asyncExecutor(context).submit(api, method, uri, data=data, quiet=quiet, mcm=mcm, mcmv2=mcmv2, v=v,
+                                             reportingv2=reportingv2, context=context, timeout=timeout, nocache=nocache, retries=retries)
+    return asyncio.wrap_future(future)
+
+
+def aapiauth(*args, **kwargs):
+    """asynchronous authentication (awaitable), same parameters as apiauth()"""
+    if asyncio is None:
+        print('aapiauth requires python 3')
+        return None
+    kwargs['context'] = __currentContext(kwargs.get('context', None))
+    future = __asyncExecutor(kwargs['context']).submit(apiauth, *args, **kwargs)
+    return asyncio.wrap_future(future)
+
+
+### paginated api calls - generators that yield items as each page arrives
+def __backgroundCall(func, *args):
+    result = {}
+
+    def run():
+        try:
+            result['value'] = func(*args)
+        except BaseException as e:
+            result['error'] = e
+
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    return (thread, result)
+
+
+def __pageIterator(fetchPage, nextCursor, cursor, listKey, prefetch):
+    page = fetchPage(cursor)
+    while page is not None:
+        cursor = nextCursor(page, cursor)
+        pending = None
+        if cursor is not None and prefetch is True:
+            pending = __backgroundCall(fetchPage, cursor)
+        if listKey is None:
+            items = page if isinstance(page, list) else []
+        else:
+            items = page.get(listKey, None) if isinstance(page, dict) else None
+        for item in items or []:
+            yield item
+        if cursor is None:
+            break
+        if pending is not None:
+            pending[0].join()
+            if 'error' in pending[1]:
+                raise pending[1]['error']
+            page = pending[1].get('value', None)
+        else:
+            page = fetchPage(cursor)
+
+
+def __pageUri(uri, params):
+    sep = '&' if '?' in uri else '?'
+    return uri + sep + '&'.join(['%s=%s' % (k, v) for (k, v) in params])
+
+
+def cookiePager(uri, listKey, cookieKey='cookie', cookieParam=None, firstCookie='', prefetch=False, **kwargs):
+    """yield items from a cookie paged endpoint (e.g. stats/consumers, data-protect/search/objects)
+
+    for stat in cookiePager('stats/consumers?consumerType=kProtectionRuns', 'statsList'):
+    """
+    if cookieParam is None:
+        cookieParam = cookieKey
+    kwargs['context'] = __currentContext(kwargs.get('context', None))  # prefetch threads don't see THREADCONTEXT
+
+    def fetchPage(cookie):
+        return api('get', __pageUri(uri, [(cookieParam, cookie)]), **kwargs)
+
+    def nextCursor(page, cookie):
+        if not isinstance(page, dict) or page.get(cookieKey, None) in (None, '') or str(page[cookieKey]) == str(cookie):
+            return None
+        if 'count' in page and str(page['count']) == str(page[cookieKey]):
+            return None
+        return page[cookieKey]
+
+    return __pageIterator(fetchPage, nextCursor, firstCookie, listKey, prefetch)
+
+
+def offsetPager(uri, listKey, pageSize=100, sizeParam='size', fromParam='from', countKey='count', prefetch=False, **kwargs):
+    """yield items from a size/from paged endpoint (e.g. /searchvms)
+
+    for vm in offsetPager('/searchvms?jobIds=%s' % job['id'], 'vms', pageSize=500):
+    """
+    kwargs['context'] = __currentContext(kwargs.get('context', None))  # prefetch threads don't see THREADCONTEXT
+    def fetchPage(startFrom):
+        return api('get', __pageUri(uri, [(sizeParam, pageSize), (fromParam, startFrom)]), **kwargs)
+
+    def nextCursor(page, startFrom):
+        if not isinstance(page, dict) or not page.get(listKey, None):
+            return None
+        if countKey in page and page[countKey] <= startFrom + pageSize:
+            return None
+        return startFrom + pageSize
+
+    return __pageIterator(fetchPage, nextCursor, 0, listKey, prefetch)
+
+
+def timePager(uri, listKey=None, pageSize=100, sizeParam='numRuns', timeParam='endTimeUsecs', endUsecs=None, timeOf=None, prefetch=False, **kwargs):
+    """yield items walking backwards in time (e.g. protectionRuns by endTimeUsecs)
+
+    for run in timePager('protectionRuns?jobId=%s&excludeTasks=true' % job['id'], pageSize=1000):
+
+    timeOf(item) returns the time of an item (default is v1 protectionRun start time),
+    the next page ends 1 usec before the last item of the current page
+    """
+    if timeOf is None:
+        def timeOf(item):
+            return item['backupRun']['stats']['startTimeUsecs']
+    if endUsecs is None:
+        endUsecs = dateToUsecs(datetime.now()) + 86400000000
+    kwargs['context'] = __currentContext(kwargs.get('context', None))  # prefetch threads don't see THREADCONTEXT
+
+    def fetchPage(endTime):
+        return api('get', __pageUri(uri, [(sizeParam, pageSize), (timeParam, endTime)]), **kwargs)
+
+    def nextCursor(page, endTime):
+        items = page if listKey is None else (page.get(listKey, None) if isinstance(page, dict) else None)
+        if not isinstance(items, list) or len(items) == 0:
+            return None
+        nextEnd = timeOf(items[-1]) - 1
+        if nextEnd >= endTime:
+            return None
+        return nextEnd
+
+    return __pageIterator(fetchPage, nextCursor, endUsecs, listKey, prefetch)
+
+
+### streaming JSON - yield the values at a path without holding the whole document
+JSONSKIP = re.compile(r'[\s,:]*')
+JSONSTRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.S)
+JSONSCALAR = re.compile(r'[^\s,\]}]+')
+
+
+def jsonStream(chunks, path='item'):
+    """yield the values at path from an iterable of JSON text (or utf-8 bytes) chunks
+
+    path is a dot separated list of keys, with 'item' for the elements of an array, e.g.
+    'item' (elements of a top level array), 'vms.item', 'item.nodes.item'
+    """
+    target = [p for p in path.split('.') if p != '']
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buf = ''
+    pos = 0
+    eof = False
+    want = 1  # buffer length needed to make progress
+    stack = []  # [container '{' or '[', current key or 'item', expecting a key]
+    while True:
+        if want > len(buf) - pos and eof is False:
+            buf = buf[pos:]
+            pos = 0
+            while len(buf) < want:
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    eof = True
+                    break
+                if isinstance(chunk, bytes):
+                    chunk = utf8.decode(chunk)
+                buf += chunk
+            want = 1
+            continue
+        pos = JSONSKIP.match(buf, pos).end()
+        if pos >= len(buf):
+            if eof is True:
+                if stack:
+                    raise ValueError('truncated JSON document')
+                return
+            want = len(buf) - pos + 1
+            continue
+        c = buf[pos]
+        if c in '}]':
+            stack.pop()
+            pos += 1
+        elif stack and stack[-1][2] is True:
+            m = JSONSTRING.match(buf, pos)
+            if m is None:
+                if eof is True:
+                    raise ValueError('invalid JSON at %s' % pos)
+                want = len(buf) - pos + 1
+                continue
+            key = m.group(0)
+            stack[-1][1] = key[1:-1] if '\\' not in key else json.loads(key)
+            stack[-1][2] = False
+            pos = m.end()
+            continue
+        elif c in '{[' and [s[1] for s in stack] != target[0:len(stack)] or len(stack) == len(target):
+            # the value at path (or a container off the path, decoded and dropped)
+            if c not in '{["' and JSONSCALAR.match(buf, pos).end() == len(buf) and eof is False:
+                want = len(buf) - pos + 1  # a number may continue in the next chunk
+                continue
+            try:
+                (value, end) = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if eof is True:
+                    raise
+                want = 2 * (len(buf) - pos)  # read ahead in doubling steps, so large values are decoded in linear time
+                continue
+            pos = end
+            if [s[1] for s in stack] == target:
+                yield value
+        elif c in '{[':
+            stack.append([c, 'item' if c == '[' else None, c == '{'])
+            pos += 1
+            continue
+        else:
+            m = JSONSTRING.match(buf, pos) if c == '"' else JSONSCALAR.match(buf, pos)
+            if m is None or (m.end() == len(buf) and eof is False):
+                if eof is True:
+                    raise ValueError('invalid JSON at %s' % pos)
+                want = len(buf) - pos + 1
+                continue
+            pos = m.end()
+        if stack and stack[-1][0] == '{':
+            stack[-1][2] = True
+
+
+def apiStream(uri, path='item', quiet=None, mcm=None, mcmv2=None, v=1, reportingv2=None, context=None, timeout=300, chunkSize=1048576):
+    """GET uri and yield the values at path as the response arrives (see jsonStream), e.g.
+
+    for vm in apiStream('/searchvms?vmName=x', path='vms.item'): ...
+    """
+    context = __currentContext(context)
+    if context['AUTHENTICATED'] is False:
+        print('Not Connected')
+        return
+    if mcm is not None:
+        url = context['APIROOTMCM'] + uri
+    elif mcmv2 is not None:
+        url = context['APIROOTMCMv2'] + uri
+    elif reportingv2 is not None:
+        url = context['APIROOTREPORTINGv2'] + uri
+    elif v == 2:
+        url = context['APIROOTv2'] + uri
+    else:
+        if uri[0] != '/':
+            uri = '/public/' + uri
+        url = context['APIROOT'] + uri
+    startTime = time.time()
+    try:
+        header = context['HEADER']
+        response = __apiRequest(context, 'get', url, timeout=timeout, stream=True)
+        if response.status_code == 401 and __reauthenticate(context, header) is True:
+            response = __apiRequest(context, 'get', url, timeout=timeout, stream=True)
+    except requests.exceptions.RequestException as e:
+        __writelog(e)
+        context['LAST_ERROR'] = '%s' % e
+        if quiet is None:
+            print(e)
+        return
+    if response.status_code >= 400:
+        context['LAST_ERROR'] = response.reason
+        try:
+            responsejson = response.json()
+            if 'errorCode' in responsejson and 'message' in responsejson:
+                context['LAST_ERROR'] = responsejson['errorCode'][1:] + ': ' + responsejson['message']
+        except Exception:
+            pass
+        if quiet is None:
+            print(context['LAST_ERROR'])
+        return
+    context['LAST_ERROR'] = 'OK'
+    counted = {'bytes': 0}
+
+    def chunks():
+        for chunk in response.iter_content(chunk_size=chunkSize):
+            counted['bytes'] += len(chunk)
+            yield chunk
+
+    try:
+        for value in jsonStream(chunks(), path):
+            yield value
+    finally:
+        response.close()
+        __recordApiCall('get', url, response.status_code, time.time() - startTime, 0, counted['bytes'])
+
+
+### task waiters - poll until tasks finish, quickly at first, backing off while nothing changes
+FINISHEDSTATES = ['kCanceled', 'kSuccess', 'kFailure', 'kWarning', '3', '4', '5', '6',
+                  'Canceled', 'Succeeded', 'Failed', 'SucceededWithWarning', 'Skipped']
+
+
+def waitForTasks(ids, poll, isFinished, batch=False, interval=2, maxInterval=60, backoff=1.5, deadline=None, progress=None, pollErrors=10):
+    """wait for tasks to finish
+
+    ids: task ids (or run ids, progress paths...)
+    poll: poll(id) returns the status of one task, or if batch=True, poll(list of ids) returns {id: status}
+    isFinished: isFinished(status) returns True when the task is done
+    interval: first wait (seconds), multiplied by backoff after each poll where nothing changed, up to maxInterval
+    deadline: give up after this many seconds
+    progress: progress(id, status) is called when the status of a task changes
+    returns {id: {'result': last status, 'finished': True/False, 'error': last error or None}}
+    """
+    if not isinstance(ids, (list, tuple)):
+        ids = [ids]
+    results = OrderedDict([(i, {'result': None, 'finished': False, 'error': None}) for i in ids])
+    startTime = time.time()
+    wait = interval
+    errors = 0
+    while True:
+        pending = [i for i in ids if results[i]['finished'] is False]
+        if not pending:
+            return results
+        changed = False
+        try:
+            if batch is True:
+                statuses = poll(pending)
+            else:
+                statuses = dict([(i, poll(i)) for i in pending])
+            errors = 0
+        except Exception as e:
+            __writelog('waitForTasks poll error: %s' % e)
+            errors += 1
+            for i in pending:
+                results[i]['error'] = e
+            if errors > pollErrors:
+                return results
+            statuses = {}
+        for i in pending:
+            if i not in statuses or statuses[i] is None:
+                continue
+            if statuses[i] != results[i]['result']:
+                changed = True
+                results[i]['result'] = statuses[i]
+                results[i]['error'] = None
+                if progress is not None:
+                    progress(i, statuses[i])
+            if isFinished(statuses[i]) is True:
+                results[i]['finished'] = True
+        if not [i for i in ids if results[i]['finished'] is False]:
+            return results
+        if changed is False:
+            wait = min(wait * backoff, maxInterval)
+        if deadline is not None:
+            remaining = startTime + deadline - time.time()
+            if remaining <= 0:
+                __writelog('waitForTasks timed out after %s seconds' % deadline)
+                return results
+            time.sleep(min(wait, remaining))
+        else:
+            time.sleep(wait)
+
+
+def waitForRestoreTasks(taskIds, interval=2, maxInterval=60, deadline=None, progress=None, pollErrors=10, context=None):
+    """wait for restore/clone tasks (/restoretasks) to finish, polling all tasks in one query"""
+    if not isinstance(taskIds, (list, tuple)):
+        taskIds = [taskIds]
+
+    def poll(pending):
+        tasks = api('get', '/restoretasks?%s' % '&'.join(['taskIds=%s' % t for t in pending]), context=context)
+        if not isinstance(tasks, list):
+            raise Exception('restoretasks query failed: %s' % LAST_API_ERROR(context=context))
+        return dict([(t['restoreTask']['performRestoreTaskState']['base']['taskId'], t) for t in tasks])
+
+    def isFinished(task):
+        return task['restoreTask']['performRestoreTaskState']['base']['publicStatus'] in FINISHEDSTATES
+
+    return waitForTasks([int(t) for t in taskIds], poll, isFinished, batch=True, interval=interval, maxInterval=maxInterval, deadline=deadline, progress=progress, pollErrors=pollErrors)
+
+
+def waitForRuns(runs, interval=5, maxInterval=120, deadline=None, progress=None, pollErrors=10, context=None):
+    """wait for protection runs to finish, runs is a list of (v2 protection group id, v2 run id)"""
+    def poll(run):
+        status = api('get', 'data-protect/protection-groups/%s/runs/%s?includeObjectDetails=false' % run, v=2, context=context)
+        if not isinstance(status, dict) or 'localBackupInfo' not in status:
+            raise Exception('run query failed: %s' % LAST_API_ERROR(context=context))
+        return status
+
+    def isFinished(run):
+        return run['localBackupInfo']['status'] in FINISHEDSTATES
+
+    return waitForTasks([tuple(run) for run in runs], poll, isFinished, interval=interval, maxInterval=maxInterval, deadline=deadline, progress=progress, pollErrors=pollErrors)
+
+
+def waitForProgress(taskPaths, interval=2, maxInterval=60, deadline=None, progress=None, pollErrors=10, context=None):
+    """wait for progress monitor task paths to finish, polling all paths in one query"""
+    def poll(pending):
+        monitors = api('get', '/progressMonitors?%s&includeFinishedTasks=true&excludeSubTasks=true' % '&'.join(['taskPathVec=%s' % p for p in pending]), context=context)
+        if not isinstance(monitors, dict) or 'resultGroupVec' not in monitors:
+            raise Exception('progressMonitors query failed: %s' % LAST_API_ERROR(context=context))
+        statuses = {}
+        for (taskPath, group) in zip(pending, monitors['resultGroupVec']):  # one result group per task path, in order
+            if group.get('taskVec', None):
+                statuses[taskPath] = group['taskVec'][0]['progress']
+        return statuses
+
+    def isFinished(status):
+        return 'endTimeSecs' in status or status.get('percentFinished', 0) >= 100
+
+    return waitForTasks(taskPaths, poll, isFinished, batch=True, interval=interval, maxInterval=maxInterval, deadline=deadline, progress=progress, pollErrors=pollErrors)
+
+
+### bulk mutations - rate limited, concurrent, checkpointed to disk so a rerun resumes
+def __tokenBucket(rate, burst=None):
+    """returns a function that blocks until a token is available (rate tokens per second)"""
+    bucket = {'tokens': float(burst or max(rate, 1)), 'capacity': float(burst or max(rate, 1)), 'time': time.time(), 'lock': threading.Lock()}
+
+    def take():
+        while True:
+            with bucket['lock']:
+                now = time.time()
+                bucket['tokens'] = min(bucket['capacity'], bucket['tokens'] + (now - bucket['time']) * rate)
+                bucket['time'] = now
+                if bucket['tokens'] >= 1:
+                    bucket['tokens'] -= 1
+                    return
+                delay = (1 - bucket['tokens']) / rate
+            time.sleep(delay)
+    return take
+
+
+def __bulkId(mutation):
+    if 'id' in mutation:
+        return str(mutation['id'])
+    key = json.dumps([mutation['method'], mutation['uri'], mutation.get('data', None), mutation.get('v', 1)], sort_keys=True)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[0:32]
+
+
+def __readJsonLines(fileName):
+    entries = []
+    f = open(fileName, 'r')
+    for line in f:
+        line = line.strip()
+        if line != '':
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                pass  # partial last line after a crash
+    f.close()
+    return entries
+
+
+def apiBulk(plan, checkpointFile=None, dryRun=False, planFile=None, maxConcurrent=4, rate=None, burst=None, progress=None, context=None):
+    """apply a list of mutations, e.g. [{'method': 'put', 'uri': 'protectionRuns', 'data': {...}}, ...]
+
+    mutations may also specify v (api version), description, and id (default is a hash of the mutation),
+    plan may be the name of a plan file (one json mutation per line, as written by dryRun)
+    checkpointFile: completed mutations are recorded here, and skipped when run again
+    dryRun: only write the plan to planFile (or print it), nothing is changed
+    maxConcurrent: mutations in flight at once, rate: maximum mutations per second, None or 0 for no limit (burst: bucket size)
+    progress: progress(mutation, result, error) is called after each mutation
+    returns {'total': n, 'applied': n, 'skipped': n, 'failed': n, 'errors': [{'id', 'description', 'error'}]}
+    """
+    context = __currentContext(context)
+    if isinstance(plan, str):
+        plan = __readJsonLines(plan)
+    plan = [dict(mutation, id=__bulkId(mutation)) for mutation in plan]
+    summary = {'total': len(plan), 'applied': 0, 'skipped': 0, 'failed': 0, 'errors': []}
+
+    if dryRun is True:
+        if planFile is not None:
+            f = open(planFile, 'w')
+            for mutation in plan:
+                f.write(json.dumps(mutation, sort_keys=True) + '\n')
+            f.close()
+        else:
+            for mutation in plan:
+                print('%s %s %s' % (mutation['method'].upper(), mutation['uri'], mutation.get('description', json.dumps(mutation.get('data', None)))))
+        summary['skipped'] = len(plan)
+        return summary
+
+    done = set()
+    if checkpointFile is not None and os.path.exists(checkpointFile):
+        done = set([entry['id'] for entry in __readJsonLines(checkpointFile) if entry.get('status', None) == 'applied'])
+    pending = [mutation for mutation in plan if mutation['id'] not in done]
+    summary['skipped'] = len(plan) - len(pending)
+    lock = threading.Lock()
+    checkpoint = None
+    if checkpointFile is not None:
+        checkpoint = open(checkpointFile, 'a')
+    take = __tokenBucket(rate, burst) if rate is not None and rate > 0 else None  # 0 (or less) is no limit
+
+    def apply(mutation):
+        if take is not None:
+            take()
+        error = None
+        try:
+            result = api(mutation['method'], mutation['uri'], mutation.get('data', None), quiet=True, v=mutation.get('v', 1), context=context)
+            if result is None or result == 'error' or (isinstance(result, dict) and 'error' in result):
+                error = result['error'] if isinstance(result, dict) else LAST_API_ERROR(context=context)
+        except Exception as e:
+            result = None
+            error = '%s' % e
+        with lock:
+            if error is None:
+                summary['applied'] += 1
+            else:
+                summary['failed'] += 1
+                summary['errors'].append({'id': mutation['id'], 'description': mutation.get('description', ''), 'error': error})
+                __writelog('apiBulk %s %s failed: %s' % (mutation['method'], mutation['uri'], error))
+            if checkpoint is not None:
+                checkpoint.write(json.dumps({'id': mutation['id'], 'status': 'applied' if error is None else 'failed',
+                                             'time': int(time.time()), 'error': error}) + '\n')
+                checkpoint.flush()
+        if progress is not None:
+            progress(mutation, result, error)
+
+    try:
+        if asyncio is None or maxConcurrent <= 1:
+            for mutation in pending:
+                apply(mutation)
+        else:
+            with ThreadPoolExecutor(max_workers=maxConcurrent) as executor:
+                list(executor.map(apply, pending))
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+    return summary
+
+
 ### convert usecs to date string
 def usecsToDate(uedate, fmt='%Y-%m-%d %H:%M:%S'):
     """Convert Unix Epoc Microseconds to Date String"""
@@ -665,6 +2318,117 @@ def dayDiff(newdate, olddate):
 
 
 ### get/store password for future runs
+### credential store - one indexed file of stored passwords (locked, atomic updates, cached in memory)
+CREDSTORE = {
+    'FILE': os.path.join(CONFIGDIR, 'credentials'),
+    'ENTRIES': None,
+    'STAT': None,
+    'LOCK': threading.Lock()
+}
+
+
+def __credentialKey(vip, domain, username, useApiKey):
+    return '%s:%s:%s:%s' % (vip.lower(), domain.lower(), username.lower(), useApiKey)
+
+
+def __credentials():
+    """stored credentials, re-read only when the file has changed"""
+    try:
+        stat = os.stat(CREDSTORE['FILE'])
+        stat = (stat.st_mtime, stat.st_size, stat.st_ino)
+    except OSError:
+        return {}
+    if CREDSTORE['ENTRIES'] is None or CREDSTORE['STAT'] != stat:
+        try:
+            f = open(CREDSTORE['FILE'], 'r')
+            entries = json.loads(base64.b64decode(f.read().encode('utf-8')).decode('utf-8'))
+            f.close()
+        except Exception:
+            entries = __lockedJsonFile(CREDSTORE['FILE'], CREDSTORE['LOCK'])  # wait for a writer to finish
+        (CREDSTORE['ENTRIES'], CREDSTORE['STAT']) = (entries, stat)
+    return CREDSTORE['ENTRIES']
+
+
+def __credentialGet(key):
+    entry = __credentials().get(key, None)
+    if entry is None:
+        return None
+    return base64.b64decode(entry['pwd'].encode('utf-8')).decode('utf-8')
+
+
+def __credentialSet(key, pwd):
+    entry = {'pwd': base64.b64encode(pwd.encode('utf-8')).decode('utf-8'), 'updated': int(time.time())}
+    __lockedJsonFile(CREDSTORE['FILE'], CREDSTORE['LOCK'], lambda entries: entries.update({key: entry}), raiseOnError=True)
+    CREDSTORE['ENTRIES'] = None
+
+
+def __credentialDelete(key):
+    __lockedJsonFile(CREDSTORE['FILE'], CREDSTORE['LOCK'], lambda entries: entries.pop(key, None), raiseOnError=True)
+    CREDSTORE['ENTRIES'] = None
+
+
+def __pwfilePassword(vip, domain, username, useApiKey):
+    """password from the shared password file (PWFILE)"""
+    if os.path.exists(PWFILE):
+        f = open(PWFILE, 'r')
+        pwdlist = [e.strip() for e in f.readlines() if e.strip() != '']
+        f.close()
+        for pwditem in pwdlist:
+            try:
+                v, d, u, k, opwd = pwditem.split(":", 5)
+                if v.lower() == vip.lower() and d.lower() == domain.lower() and u.lower() == username.lower() and k == str(useApiKey):
+                    return base64.b64decode(opwd.encode('utf-8')).decode('utf-8')
+            except Exception:
+                pass
+    return None
+
+
+def __legacyPassword(vip, domain, username, useApiKey):
+    """password from the old per user file in CONFIGDIR, moved to the credential store"""
+    pwd = None
+    try:
+        pwdfile = open(os.path.join(CONFIGDIR, vip + '-' + domain + '-' + username + '-' + str(useApiKey)), 'r')
+        pwd = base64.b64decode(pwdfile.read().encode('utf-8')).decode('utf-8')
+        pwdfile.close()
+    except Exception:
+        pass
+    if pwd is not None:
+        try:
+            __credentialSet(__credentialKey(vip, domain, username, useApiKey), pwd)
+        except Exception:
+            __writelog('error moving password to the credential store')
+    return pwd
+
+
+def migrateCredentials(removeLegacy=False):
+    """copy passwords from the per user files in CONFIGDIR into the credential store (PWFILE is left in place)"""
+    found = []
+    for fileName in os.listdir(CONFIGDIR):
+        parts = fileName.split('-')
+        if fileName.startswith('---'):
+            parts = ['--'] + fileName[3:].split('-')  # wildcard vip
+        # names with extra dashes can't be split reliably, those migrate when first used
+        if len(parts) != 4 or parts[3] not in ['True', 'False', 'directoryId', 'clientId']:
+            continue
+        try:
+            pwdfile = open(os.path.join(CONFIGDIR, fileName), 'r')
+            found.append((__credentialKey(*parts), base64.b64decode(pwdfile.read().encode('utf-8')).decode('utf-8'), os.path.join(CONFIGDIR, fileName)))
+            pwdfile.close()
+        except Exception:
+            pass
+
+    def addMissing(entries):
+        for (key, pwd, source) in found:
+            if key not in entries:
+                entries[key] = {'pwd': base64.b64encode(pwd.encode('utf-8')).decode('utf-8'), 'updated': int(time.time())}
+    __lockedJsonFile(CREDSTORE['FILE'], CREDSTORE['LOCK'], addMissing, raiseOnError=True)
+    CREDSTORE['ENTRIES'] = None
+    if removeLegacy is True:
+        for source in set([source for (key, pwd, source) in found]):
+            os.remove(source)
+    return len(found)
+
+
 def __getpassword(vip, username, password, domain, useApiKey=False, helios=False, updatepw=False, prompt=True, directoryId=False, clientId=False):
     """get/set stored password"""
     if directoryId is True:
@@ -678,71 +2442,61 @@ def __getpassword(vip, username, password, domain, useApiKey=False, helios=False
     if domain.lower() != 'local' and helios is False and vip.lower() not in HELIOSENDPOINTS and useApiKey is False:
         originalUsername = "%s\\%s" % (domain, username)
         vip = '--'  # wildcard vip
-    if os.path.exists(PWFILE):
-        f = open(PWFILE, 'r')
-        pwdlist = [e.strip() for e in f.readlines() if e.strip() != '']
-        f.close()
-        for pwditem in pwdlist:
+    if __pwfilePassword(vip, domain, username, useApiKey) is not None:
+        # the shared password file is checked first (it can be updated by other accounts and older scripts)
+        if password is not None:
             try:
-                v, d, u, k, opwd = pwditem.split(":", 5)
-                if v.lower() == vip.lower() and d.lower() == domain.lower() and u.lower() == username.lower() and k == str(useApiKey):
-                    if password is not None:
-                        setpwd(v=vip, u=username, d=domain, helios=helios, useApiKey=useApiKey, password=password)
-                        return password
-                    if updatepw is not None:
-                        setpwd(v=vip, u=username, d=domain, helios=helios, useApiKey=useApiKey)
-                        return pw(vip, username, domain)
-                    else:
-                        return base64.b64decode(opwd.encode('utf-8')).decode('utf-8')
+                setpwd(v=vip, u=username, d=domain, helios=helios, useApiKey=useApiKey, password=password)
             except Exception:
-                pass
-    pwpath = os.path.join(CONFIGDIR, vip + '-' + domain + '-' + username + '-' + str(useApiKey))
+                __writelog('error storing password')
+                print('error storing password')
+            return password
+        if updatepw is not None:
+            setpwd(v=vip, u=username, d=domain, helios=helios, useApiKey=useApiKey)
+        return __pwfilePassword(vip, domain, username, useApiKey)
+    key = __credentialKey(vip, domain, username, useApiKey)
     if password is not None:
-        pwd = password
         try:
-            pwdfile = open(pwpath, 'w')
-            opwd = base64.b64encode(pwd.encode('utf-8')).decode('utf-8')
-            pwdfile.write(opwd)
-            pwdfile.close()
-            return pwd
+            if __credentialGet(key) != password:
+                __credentialSet(key, password)
         except Exception:
             __writelog('error storing password')
             print('error storing password')
-            return pwd
+        return password
     if updatepw is not None:
+        try:
+            __credentialDelete(key)
+        except Exception:
+            __writelog('error removing stored password')
+        pwpath = os.path.join(CONFIGDIR, vip + '-' + domain + '-' + username + '-' + str(useApiKey))
         if os.path.isfile(pwpath) is True:
             os.remove(pwpath)
-    try:
-        pwdfile = open(pwpath, 'r')
-        opwd = pwdfile.read()
-        pwd = base64.b64decode(opwd.encode('utf-8')).decode('utf-8')
-        pwdfile.close()
-        return pwd
-    except Exception:
-        if prompt is not False:
-            __writelog('prompting for password...')
-            if directoryId is True:
-                pwd = getpass.getpass("Enter Directory ID for %s at %s: " % (originalUsername, originalVip))
-            elif clientId is True:
-                pwd = getpass.getpass("Enter Client ID for %s at %s: " % (originalUsername, originalVip))
-            elif useApiKey is True:
-                pwd = getpass.getpass("Enter API Key for %s at %s: " % (originalUsername, originalVip))
-            else:
-                pwd = getpass.getpass("Enter password for %s at %s: " % (originalUsername, originalVip))
-            try:
-                pwdfile = open(pwpath, 'w')
-                opwd = base64.b64encode(pwd.encode('utf-8')).decode('utf-8')
-                pwdfile.write(opwd)
-                pwdfile.close()
-                return pwd
-            except Exception:
-                print('error storing password')
-                return pwd
+    else:
+        pwd = __credentialGet(key)
+        if pwd is None:
+            pwd = __legacyPassword(vip, domain, username, useApiKey)
+        if pwd is not None:
+            return pwd
+    if prompt is not False:
+        __writelog('prompting for password...')
+        if directoryId is True:
+            pwd = getpass.getpass("Enter Directory ID for %s at %s: " % (originalUsername, originalVip))
+        elif clientId is True:
+            pwd = getpass.getpass("Enter Client ID for %s at %s: " % (originalUsername, originalVip))
+        elif useApiKey is True:
+            pwd = getpass.getpass("Enter API Key for %s at %s: " % (originalUsername, originalVip))
         else:
-            return None
+            pwd = getpass.getpass("Enter password for %s at %s: " % (originalUsername, originalVip))
+        try:
+            __credentialSet(key, pwd)
+        except Exception:
+            print('error storing password')
+        return pwd
+    else:
+        return None
 
 
-# store password in PWFILE
+# store password in PWFILE (and the credential store)
 def setpwd(v='helios.cohesity.com', u='helios', d='local', useApiKey=False, helios=False, password=None, entraId=False, directoryId=False, clientId=False):
     originalUsername = u
     originalVip = v
@@ -788,6 +2542,7 @@ def setpwd(v='helios.cohesity.com', u='helios', d='local', useApiKey=False, heli
     if foundPwd is False:
         f.write('%s:%s:%s:%s:%s\n' % (v, d, u, useApiKey, opwd))
     f.close()
+    __credentialSet(__credentialKey(v, d, u, useApiKey), pwd)
 
 
 ### pwstore for alternate infrastructure
@@ -799,51 +2554,106 @@ def pw(vip, username, domain='local', password=None, updatepw=None, useApiKey=Fa
 def storePasswordFromInput(vip, username, password, domain='local', useApiKey=False, helios=False):
     if domain.lower() != 'local' and helios is False and vip.lower() not in HELIOSENDPOINTS and useApiKey is False:
         vip = '--'  # wildcard vip
-    pwpath = os.path.join(CONFIGDIR, vip + '-' + domain + '-' + username + '-' + str(useApiKey))
     try:
-        pwdfile = open(pwpath, 'w')
-        opwd = base64.b64encode(password.encode('utf-8')).decode('utf-8')
-        pwdfile.write(opwd)
-        pwdfile.close()
+        __credentialSet(__credentialKey(vip, domain, username, useApiKey), password)
     except Exception:
         print('error trying to store password')
 
 
-lastapierrorusecs = dateToUsecs()
-lastapierror = ''
-
+### debug log - messages are queued and written (as JSON lines) by a background thread
+LOGSETTINGS = {
+    'MAXBYTES': 200000,
+    'REPEATSECS': 5,
+    'QUEUE': queue.Queue(),
+    'WRITER': None,
+    'WRITERPID': None,
+    'LAST': None,
+    'LOCK': threading.Lock()
+}
 
-### debug log
-def __writelog(logmessage):
-    global lastapierrorusecs
-    global lastapierror
-    apidate = datetime.now()
-    apierrordatestring = apidate.strftime("%Y-%m-%d-%H-%M-%S")
-    apierrorusecs = dateToUsecs(apidate)
 
+def __logCaller():
+    """outermost caller (the script line that started the call)"""
     try:
-        # rotate log
-        if os.path.exists(LOGFILE):
-            logsize = os.path.getsize(LOGFILE)
-            if logsize > 200000:
-                os.rename(LOGFILE, '%s-%s.txt' % (LOGFILE, apierrordatestring))
+        frame = sys._getframe(2)
+        while frame.f_back is not None:
+            frame = frame.f_back
+        return '%s:%s' % (os.path.basename(frame.f_code.co_filename), frame.f_lineno)
     except Exception:
-        pass
+        return ''
+
+
+def __logWriter():
+    while True:
+        records = [LOGSETTINGS['QUEUE'].get()]
+        while True:
+            try:
+                records.append(LOGSETTINGS['QUEUE'].get_nowait())
+            except queue.Empty:
+                break
+        stop = None in records
+        records = [r for r in records if r is not None]
+        try:
+            if records:
+                # rotate log
+                if os.path.exists(LOGFILE) and os.path.getsize(LOGFILE) > LOGSETTINGS['MAXBYTES']:
+                    os.rename(LOGFILE, '%s-%s.txt' % (LOGFILE, datetime.now().strftime("%Y-%m-%d-%H-%M-%S")))
+                debuglog = open(LOGFILE, 'a')
+                for record in records:
+                    debuglog.write(json.dumps(record, default=str) + '\n')
+                debuglog.close()
+        except Exception:
+            pass
+        for record in records + ([None] if stop else []):
+            LOGSETTINGS['QUEUE'].task_done()
+        if stop:
+            return
+
+
+def __flushlog():
+    """write queued log messages (called at exit)"""
+    with LOGSETTINGS['LOCK']:
+        last = LOGSETTINGS['LAST']
+        if last is not None and last['repeats'] > 0:
+            LOGSETTINGS['QUEUE'].put(__logRecord(last['caller'], last['message'], last['repeats']))
+            last['repeats'] = 0
+    writer = LOGSETTINGS['WRITER']
+    if writer is not None and writer.is_alive() and LOGSETTINGS['WRITERPID'] == os.getpid():
+        LOGSETTINGS['QUEUE'].put(None)
+        writer.join(5)
 
-    # avoid race condition
-    callstack = traceback.format_stack()[0].replace('\n', ' ').strip()
-    apierror = '%s :: %s' % (callstack, logmessage)
-    if apierror == lastapierror and apierrorusecs < (lastapierrorusecs + 5000000):
-        time.sleep(5)
-    try:
-        # output log message
-        debuglog = open(LOGFILE, 'a')
-        debuglog.write('%s: %s\n' % (apierrordatestring, apierror))
-        debuglog.close()
-    except Exception:
-        pass
-    lastapierrorusecs = apierrorusecs
-    lastapierror = apierror
+
+def __logRecord(caller, message, repeats=0):
+    record = {'time': datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"), 'pid': os.getpid(),
+              'thread': threading.current_thread().name, 'caller': caller, 'message': message}
+    if repeats > 0:
+        record['repeats'] = repeats
+    return record
+
+
+### debug log
+def __writelog(logmessage):
+    caller = __logCaller()
+    logmessage = '%s' % logmessage
+    now = time.time()
+    with LOGSETTINGS['LOCK']:
+        # suppress repeats of the same message, counting them instead
+        last = LOGSETTINGS['LAST']
+        if last is not None and last['caller'] == caller and last['message'] == logmessage and now < last['time'] + LOGSETTINGS['REPEATSECS']:
+            last['repeats'] += 1
+            return
+        if last is not None and last['repeats'] > 0:
+            LOGSETTINGS['QUEUE'].put(__logRecord(last['caller'], last['message'], last['repeats']))
+        LOGSETTINGS['LAST'] = {'caller': caller, 'message': logmessage, 'time': now, 'repeats': 0}
+        LOGSETTINGS['QUEUE'].put(__logRecord(caller, logmessage))
+        if LOGSETTINGS['WRITER'] is None or LOGSETTINGS['WRITERPID'] != os.getpid() or not LOGSETTINGS['WRITER'].is_alive():
+            LOGSETTINGS['WRITER'] = threading.Thread(target=__logWriter, name='pyhesity-log')
+            LOGSETTINGS['WRITER'].daemon = True
+            LOGSETTINGS['WRITERPID'] = os.getpid()
+            LOGSETTINGS['WRITER'].start()
+
+
+atexit.register(__flushlog)
 
 
 ### display json/dictionary as formatted text
@@ -858,47 +2668,284 @@ def display(myjson):
         print(json.dumps(myjson, sort_keys=True, indent=4, separators=(', ', ': ')))
 
 
-def fileDownload(uri, fileName, v=1, timeout=300):
-    """download file"""
-    if COHESITY_API['AUTHENTICATED'] is False:
+### file downloads - parallel byte ranges into a preallocated file, with a checkpoint to resume interrupted downloads
+FILEDOWNLOAD = {
+    'STREAMS': 4,
+    'RANGEBYTES': 64 * 1024 * 1024,
+    'CHUNKBYTES': 1024 * 1024,
+    'RETRIES': 3
+}
+
+
+def setFileDownload(streams=None, rangeBytes=None, chunkBytes=None, retries=None):
+    """set default parallel streams, range size, read chunk size and per range retries for fileDownload"""
+    for (key, value) in [('STREAMS', streams), ('RANGEBYTES', rangeBytes), ('CHUNKBYTES', chunkBytes), ('RETRIES', retries)]:
+        if value is not None:
+            FILEDOWNLOAD[key] = value
+
+
+def __downloadCheckpoint(checkpointFile, checkpoint=None):
+    """read (or atomically write) the list of completed ranges of a download"""
+    if checkpoint is None:
+        try:
+            f = open(checkpointFile, 'r')
+            checkpoint = json.load(f)
+            f.close()
+            return checkpoint
+        except Exception:
+            return None
+    tmpfile = '%s.tmp' % checkpointFile
+    f = open(tmpfile, 'w')
+    json.dump(checkpoint, f)
+    f.close()
+    getattr(os, 'replace', os.rename)(tmpfile, checkpointFile)
+
+
+def __downloadRange(context, url, partFile, start, end, timeout):
+    """download bytes start-end (inclusive) into partFile, picking up where a dropped connection left off"""
+    position = start
+    attempt = 0
+    while True:
+        startTime = time.time()
+        try:
+            response = __apiRequest(context, 'get', url, timeout=timeout, retries=0, stream=True, headers={'Range': 'bytes=%s-%s' % (position, end)})
+            if response.status_code != 206:
+                raise requests.exceptions.HTTPError('range request returned %s' % response.status_code)
+            f = open(partFile, 'r+b')
+            try:
+                f.seek(position)
+                for chunk in response.iter_content(chunk_size=FILEDOWNLOAD['CHUNKBYTES']):
+                    if chunk:
+                        f.write(chunk)
+                        position += len(chunk)
+            finally:
+                f.close()
+                __recordApiCall('get', url, response.status_code, time.time() - startTime, 0, position - start)
+            if position > end:
+                return
+            raise requests.exceptions.ConnectionError('connection closed at byte %s of range %s-%s' % (position, start, end))
+        except requests.exceptions.RequestException as e:
+            if attempt >= FILEDOWNLOAD['RETRIES']:
+                raise
+            delay = __retryDelay(attempt)
+            __writelog('download range %s-%s of %s failed (%s), retry %s of %s in %0.1f seconds' % (position, end, url, e, attempt + 1, FILEDOWNLOAD['RETRIES'], delay))
+            time.sleep(delay)
+            attempt += 1
+
+
+def __downloadVerify(fileName, size=None, checksum=None, checksumType='sha256'):
+    """returns an error message, or None if the file has the expected size and checksum"""
+    if size is not None and os.path.getsize(fileName) != size:
+        return 'expected %s bytes, got %s' % (size, os.path.getsize(fileName))
+    if checksum is not None:
+        h = hashlib.new(checksumType)
+        f = open(fileName, 'rb')
+        for chunk in iter(lambda: f.read(FILEDOWNLOAD['CHUNKBYTES']), b''):
+            h.update(chunk)
+        f.close()
+        if h.hexdigest().lower() != checksum.lower():
+            return '%s checksum mismatch (expected %s, got %s)' % (checksumType, checksum, h.hexdigest())
+    return None
+
+
+def fileDownload(uri, fileName, v=1, timeout=300, context=None, streams=None, size=None, checksum=None, checksumType='sha256', resume=True):
+    """download file (in parallel byte ranges when the server supports them)
+
+    interrupted downloads are resumed from fileName.part (resume=False to start over),
+    optionally verifies the size in bytes and a hex checksum (checksumType is any hashlib algorithm),
+    returns True if the file was downloaded, False if not (the error is in LAST_API_ERROR)
+    """
+    context = __currentContext(context)
+    if context['AUTHENTICATED'] is False:
         print('Not Connected')
-        return None
+        return False
     if 'https://' in uri.lower():
         url = uri
     else:
         if v == 2:
-            url = COHESITY_API['APIROOTv2'] + uri
+            url = context['APIROOTv2'] + uri
         else:
             if uri[0] != '/':
                 uri = '/public/' + uri
-            url = COHESITY_API['APIROOT'] + uri
-    response = COHESITY_API['SESSION'].get(url, headers=COHESITY_API['HEADER'], verify=False, timeout=timeout, stream=True)
-    f = open(fileName, 'wb')
-    for chunk in response.iter_content(chunk_size=1048576):
-        if chunk:
-            f.write(chunk)
-    f.close()
-
-
-def fileUpload(uri, fileName, v=1, timeout=300):
-    """upload file"""
-    if COHESITY_API['AUTHENTICATED'] is False:
+            url = context['APIROOT'] + uri
+    if streams is None:
+        streams = FILEDOWNLOAD['STREAMS']
+    partFile = fileName + '.part'
+    checkpointFile = fileName + '.part.json'
+    context['LAST_ERROR'] = 'OK'
+    startTime = time.time()
+
+    # probe for range support
+    try:
+        header = context['HEADER']
+        response = __apiRequest(context, 'get', url, timeout=timeout, stream=True, headers={'Range': 'bytes=0-0'})
+        if response.status_code == 401 and __reauthenticate(context, header) is True:
+            response = __apiRequest(context, 'get', url, timeout=timeout, stream=True, headers={'Range': 'bytes=0-0'})
+        totalBytes = None
+        contentRange = response.headers.get('Content-Range', '').split('/')[-1].strip()
+        if response.status_code in [206, 416]:
+            # 416 with bytes */0 is an empty file, 206 with an unknown total (bytes 0-0/*) is downloaded in one stream
+            if contentRange.isdigit() and (response.status_code == 206 or contentRange == '0'):
+                totalBytes = int(contentRange)
+            response.close()
+            __recordApiCall('get', url, response.status_code, time.time() - startTime, 0, 1 if response.status_code == 206 else 0)
+            if totalBytes is None or 0 < totalBytes <= FILEDOWNLOAD['CHUNKBYTES']:
+                response = __apiRequest(context, 'get', url, timeout=timeout, stream=True)
+    except requests.exceptions.RequestException as e:
+        context['LAST_ERROR'] = 'fileDownload error: %s' % e
+        __writelog(context['LAST_ERROR'])
+        print(context['LAST_ERROR'])
+        return False
+
+    if totalBytes == 0:
+        open(fileName, 'wb').close()
+    elif totalBytes is None or totalBytes <= FILEDOWNLOAD['CHUNKBYTES']:
+        # single stream
+        if response.status_code >= 400:
+            context['LAST_ERROR'] = 'fileDownload error: %s %s' % (response.status_code, response.reason)
+            __writelog(context['LAST_ERROR'])
+            print(context['LAST_ERROR'])
+            return False
+        responseBytes = 0
+        f = open(fileName, 'wb')
+        for chunk in response.iter_content(chunk_size=FILEDOWNLOAD['CHUNKBYTES']):
+            if chunk:
+                f.write(chunk)
+                responseBytes += len(chunk)
+        f.close()
+        __recordApiCall('get', url, response.status_code, time.time() - startTime, 0, responseBytes)
+    else:
+        # parallel ranges
+        ranges = [(start, min(start + FILEDOWNLOAD['RANGEBYTES'], totalBytes) - 1) for start in range(0, totalBytes, FILEDOWNLOAD['RANGEBYTES'])]
+        checkpoint = None
+        if resume is True and os.path.exists(partFile):
+            checkpoint = __downloadCheckpoint(checkpointFile)
+        if checkpoint is None or checkpoint['url'] != url or checkpoint['size'] != totalBytes or checkpoint['rangeBytes'] != FILEDOWNLOAD['RANGEBYTES']:
+            checkpoint = {'url': url, 'size': totalBytes, 'rangeBytes': FILEDOWNLOAD['RANGEBYTES'], 'done': []}
+            f = open(partFile, 'wb')
+            f.truncate(totalBytes)
+            f.close()
+            __downloadCheckpoint(checkpointFile, checkpoint)
+        elif checkpoint['done']:
+            __writelog('resuming download of %s (%s of %s ranges done)' % (url, len(checkpoint['done']), len(ranges)))
+        lock = threading.Lock()
+        errors = []
+
+        def getRange(index):
+            if errors:
+                return
+            try:
+                __downloadRange(context, url, partFile, ranges[index][0], ranges[index][1], timeout)
+                with lock:
+                    checkpoint['done'].append(index)
+                    __downloadCheckpoint(checkpointFile, checkpoint)
+            except Exception as e:
+                errors.append(e)
+
+        remaining = [index for index in range(len(ranges)) if index not in checkpoint['done']]
+        if asyncio is None or streams <= 1:
+            for index in remaining:
+                getRange(index)
+        else:
+            with ThreadPoolExecutor(max_workers=streams) as executor:
+                list(executor.map(getRange, remaining))
+        if errors:
+            context['LAST_ERROR'] = 'fileDownload error: %s' % errors[0]
+            __writelog(context['LAST_ERROR'])
+            print('%s (run again to resume)' % context['LAST_ERROR'])
+            return False
+        getattr(os, 'replace', os.rename)(partFile, fileName)
+        os.remove(checkpointFile)
+
+    if size is not None or checksum is not None:
+        error = __downloadVerify(fileName, size, checksum, checksumType)
+        if error is not None:
+            context['LAST_ERROR'] = 'fileDownload error: %s' % error
+            __writelog(context['LAST_ERROR'])
+            print(context['LAST_ERROR'])
+            return False
+    return True
+
+
+### file uploads - multipart body streamed from the file (constant memory)
+class __MultipartStream(object):
+    """multipart/form-data body for one file, read in chunks as it is sent"""
+
+    def __init__(self, fileName, fieldName='file', chunkSize=1048576, progress=None):
+        self.boundary = hashlib.sha256(os.urandom(32)).hexdigest()[0:32]
+        self.contentType = 'multipart/form-data; boundary=%s' % self.boundary
+        self.head = ('--%s\r\nContent-Disposition: form-data; name="%s"; filename="%s"\r\nContent-Type: application/octet-stream\r\n\r\n' % (
+            self.boundary, fieldName, os.path.basename(fileName))).encode('utf-8')
+        self.tail = ('\r\n--%s--\r\n' % self.boundary).encode('utf-8')
+        self.fileName = fileName
+        self.fileSize = os.path.getsize(fileName)
+        self.chunkSize = chunkSize
+        self.progress = progress
+        self.sentBytes = 0
+
+    def __len__(self):
+        return len(self.head) + self.fileSize + len(self.tail)
+
+    def __iter__(self):
+        yield self.head
+        f = open(self.fileName, 'rb')
+        try:
+            for chunk in iter(lambda: f.read(self.chunkSize), b''):
+                yield chunk
+                self.sentBytes += len(chunk)
+                if self.progress is not None:
+                    self.progress(self.sentBytes, self.fileSize)
+        finally:
+            f.close()
+        yield self.tail
+
+
+def fileUpload(uri, fileName, v=1, timeout=300, context=None, chunkSize=1048576, progress=None, fieldName='file'):
+    """upload file (streamed in chunks of chunkSize bytes)
+
+    progress(sentBytes, totalBytes) is called after each chunk is sent,
+    timeout (seconds) applies to sending each chunk and to waiting for the response,
+    returns True if the cluster accepted the file, False if not (the error is in LAST_API_ERROR)
+    """
+    context = __currentContext(context)
+    if context['AUTHENTICATED'] is False:
         print('Not Connected')
-        return None
+        return False
     if 'https://' in uri.lower():
         url = uri
     else:
         if v == 2:
-            url = COHESITY_API['APIROOTv2'] + uri
+            url = context['APIROOTv2'] + uri
         else:
             if uri[0] != '/':
                 uri = '/public/' + uri
-            url = COHESITY_API['APIROOT'] + uri
+            url = context['APIROOT'] + uri
     try:
-        files = {'file': open(fileName, 'rb')}
-        response = COHESITY_API['SESSION'].post(url, files=files, headers=COHESITY_API['HEADER'], verify=False, timeout=timeout, cookies=COHESITY_API['COOKIES'])
+        startTime = time.time()
+        body = __MultipartStream(fileName, fieldName=fieldName, chunkSize=chunkSize, progress=progress)
+        header = dict([(k, v) for (k, v) in context['HEADER'].items() if k.lower() != 'content-type'])
+        header['Content-Type'] = body.contentType
+        header['Content-Length'] = str(len(body))
+        response = context['SESSION'].post(url, data=body, headers=header, verify=False, timeout=timeout, cookies=context.get('COOKIES', None))
+        __recordApiCall('post', url, response.status_code, time.time() - startTime, len(body), len(response.content))
     except Exception as e:
+        context['LAST_ERROR'] = 'fileUpload error: %s' % e
+        __writelog(context['LAST_ERROR'])
         print('fileUpload Error: %s' % e)
+        return False
+    if response.status_code >= 400:
+        context['LAST_ERROR'] = 'fileUpload error: %s %s' % (response.status_code, response.reason)
+        try:
+            responsejson = response.json()
+            if 'errorCode' in responsejson and 'message' in responsejson:
+                context['LAST_ERROR'] = 'fileUpload error: %s: %s' % (responsejson['errorCode'][1:], responsejson['message'])
+        except Exception:
+            pass
+        __writelog(context['LAST_ERROR'])
+        print(context['LAST_ERROR'])
+        return False
+    context['LAST_ERROR'] = 'OK'
+    return True
 
 
 def testProp(obj, path=None):
@@ -937,6 +2984,82 @@ def setContext(context):
         print('Invalid context')
 
 
+### api client object (one per cluster, safe to use from its own thread)
+class CohesityClient(object):
+    """API client with its own session, headers, authentication state and cluster context
+
+    client = CohesityClient()
+    client.apiauth('mycluster', 'admin')
+    jobs = client.api('get', 'protectionJobs')
+    """
+
+    def __init__(self, context=None):
+        if context is None:
+            context = newContext()
+        self.context = context
+
+    def apiauth(self, *args, **kwargs):
+        kwargs['context'] = self.context
+        return apiauth(*args, **kwargs)
+
+    def api(self, *args, **kwargs):
+        kwargs['context'] = self.context
+        return api(*args, **kwargs)
+
+    def aapi(self, *args, **kwargs):
+        kwargs['context'] = self.context
+        return aapi(*args, **kwargs)
+
+    def aapiauth(self, *args, **kwargs):
+        kwargs['context'] = self.context
+        return aapiauth(*args, **kwargs)
+
+    def fileDownload(self, *args, **kwargs):
+        kwargs['context'] = self.context
+        return fileDownload(*args, **kwargs)
+
+    def fileUpload(self, *args, **kwargs):
+        kwargs['context'] = self.context
+        return fileUpload(*args, **kwargs)
+
+    def apiconnected(self):
+        return apiconnected(context=self.context)
+
+    def apidrop(self):
+        return apidrop(context=self.context)
+
+    def lastError(self):
+        return LAST_API_ERROR(context=self.context)
+
+    def impersonate(self, tenantId):
+        return impersonate(tenantId, context=self.context)
+
+    def switchback(self):
+        return switchback(context=self.context)
+
+    def heliosCluster(self, clusterName=None, verbose=False):
+        return heliosCluster(clusterName, verbose=verbose, context=self.context)
+
+    def heliosClusters(self):
+        return heliosClusters(context=self.context)
+
+    def clusterClient(self, clusterName):
+        """return a new client scoped to one helios connected cluster (leaves this client untouched)"""
+        context = heliosClusterContext(clusterName, context=self.context, shareSession=False)
+        if context is None:
+            return None
+        return CohesityClient(context=context)
+
+    def heliosClusterMap(self, *args, **kwargs):
+        kwargs['context'] = self.context
+        return heliosClusterMap(*args, **kwargs)
+
+
+### client object for the module level functions
+def defaultClient():
+    return CohesityClient(context=COHESITY_API)
+
+
 ### create CONFIGDIR if it doesn't exist
 if os.path.isdir(CONFIGDIR) is False:
     try:
@@ -1,12 +1,11 @@
 #!/usr/bin/env python
 """restore files using python"""
 
-# version 2024.02.14
+# version 2026.10.18
 
 # import pyhesity wrapper module
 from pyhesity import *
 from datetime import datetime
-from time import sleep
 from sys import exit
 import sys
 import argparse
@@ -291,15 +290,13 @@ def restore(thesefiles, doc, version, targetEntity, singleFile):
     if restoreTask:
         taskId = restoreTask['restoreTask']['performRestoreTaskState']['base']['taskId']
         if wait:
-            finishedStates = ['kCanceled', 'kSuccess', 'kFailure', 'kWarning']
-            while True:
-                try:
-                    restoreTask = api('get', '/restoretasks/%s' % taskId)
-                    if restoreTask[0]['restoreTask']['performRestoreTaskState']['base']['publicStatus'] in finishedStates:
-                        break
-                except Exception:
-                    pass
-                sleep(sleeptimeseconds)
+            taskStatus = waitForRestoreTasks(taskId, maxInterval=int(sleeptimeseconds), pollErrors=30)[taskId]
+            if taskStatus['finished'] is False or taskStatus['result'] is None:
+                print('Unable to get the status of the restore (%s)' % taskStatus['error'])
+                if singleFile is False:
+                    exit(1)
+                return
+            restoreTask = [taskStatus['result']]
             if restoreTask[0]['restoreTask']['performRestoreTaskState']['base']['publicStatus'] == 'kSuccess':
                 print("Restore finished with status %s" % restoreTask[0]['restoreTask']['performRestoreTaskState']['base']['publicStatus'])
                 if newonly:
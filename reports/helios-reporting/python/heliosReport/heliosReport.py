@@ -31,6 +31,7 @@ parser.add_argument('-fl', '--filterlist', type=str, default=None)
 parser.add_argument('-fp', '--filterproperty', type=str, default=None)
 parser.add_argument('-o', '--outputpath', type=str, default='.')
 parser.add_argument('-of', '--outputfile', type=str, default=None)
+parser.add_argument('-th', '--threads', type=int, default=8)
 
 args = parser.parse_args()
 
@@ -54,6 +55,7 @@ filterproperty = args.filterproperty
 outputpath = args.outputpath
 outputfile = args.outputfile
 maxrecords = args.maxrecords
+threads = args.threads
 
 
 # gather server list
@@ -142,6 +144,55 @@ while gotAllRanges is False:
         ranges.append({'start': uStart, 'end': thisUend})
         gotAllRanges = True
 
+
+def getPreview(cluster, timeRange):
+    """preview the report for one cluster and time range (split in half and re-queried if it hits maxrecords)
+
+    returns {'error': message} if the preview could not be retrieved
+    """
+    reportParams = {
+        "filters": [
+            {
+                "attribute": "date",
+                "filterType": "TimeRange",
+                "timeRangeFilterParams": {
+                    "lowerBound": timeRange['start'],
+                    "upperBound": timeRange['end']
+                }
+            },
+            {
+                "attribute": "systemId",
+                "filterType": "Systems",
+                "systemsFilterParams": {
+                    "systemIds": [cluster['id']],
+                    "systemNames": [cluster['name']]
+                }
+            }
+        ],
+        "sort": None,
+        "timezone": timezone,
+        "limit": {
+            "size": maxrecords,
+        }
+    }
+    preview = api('post', 'components/%s/preview' % reportNumber, reportParams, reportingv2=True)
+    if preview is None or 'component' not in preview:
+        if preview is not None and 'error' in preview:
+            return {'error': preview['error']}
+        return {'error': 'no response'}
+    if len(preview['component']['data']) >= maxrecords:
+        if timeRange['end'] - timeRange['start'] > 1:
+            middle = timeRange['start'] + (timeRange['end'] - timeRange['start']) // 2
+            newer = getPreview(cluster, {'start': middle + 1, 'end': timeRange['end']})
+            older = getPreview(cluster, {'start': timeRange['start'], 'end': middle})
+            if 'error' in newer or 'error' in older:
+                return newer if 'error' in newer else older
+            preview['component']['data'] = newer['component']['data'] + older['component']['data']
+        else:
+            print('Hit limit of records for %s at %s (results may be incomplete)' % (cluster['name'], usecsToDate(timeRange['start'])))
+    return preview
+
+
 # get list of available reports
 reports = api('get', 'reports', reportingv2=True)
 report = [r for r in reports['reports'] if r['title'].lower() == reportname.lower()]
@@ -312,40 +363,20 @@ html += '''</span>
 gotHeadings = False
 headings = []
 
-for cluster in sorted(selectedClusters, key=lambda c: c['name'].lower()):
+selectedClusters = sorted(selectedClusters, key=lambda c: c['name'].lower())
+
+# get cluster/range previews concurrently (processed below in order)
+previews = mapInOrder(lambda item: getPreview(*item), [(cluster, timeRange) for cluster in selectedClusters for timeRange in ranges], threads)
+
+for cluster in selectedClusters:
     print(cluster['name'])
     for range in ranges:
         csvLines = []
         tsvLines = []
-        reportParams = {
-            "filters": [
-                {
-                    "attribute": "date",
-                    "filterType": "TimeRange",
-                    "timeRangeFilterParams": {
-                        "lowerBound": range['start'],
-                        "upperBound": range['end']
-                    }
-                },
-                {
-                    "attribute": "systemId",
-                    "filterType": "Systems",
-                    "systemsFilterParams": {
-                        "systemIds": [cluster['id']],
-                        "systemNames": [cluster['name']]
-                    }
-                }
-            ],
-            "sort": None,
-            "timezone": timezone,
-            "limit": {
-                "size": maxrecords,
-            }
-        }
-        preview = api('post', 'components/%s/preview' % reportNumber, reportParams, reportingv2=True)
-        if len(preview['component']['data']) == maxrecords:
-            print('Hit limit of records. Try reducing --dayrange (e.g. --dayrange 1)')
-            exit()
+        preview = next(previews)
+        if 'error' in preview:
+            print('    - failed to get %s from %s to %s: %s' % (cluster['name'], usecsToDate(range['start']), usecsToDate(range['end']), preview['error']))
+            continue
         print('    -')
         attributes = preview['component']['config']['xlsxParams']['attributeConfig']
         # headings
@@ -433,6 +464,7 @@ for cluster in sorted(selectedClusters, key=lambda c: c['name'].lower()):
         for rec in previewData:
             if showrecord:
                 display(rec)
+                previews.close()
                 exit()
             csvColumns = []
 
@@ -1,10 +1,12 @@
 #!/usr/bin/env python
-"""Storage Per Object Report version 2024.10.23 for Python"""
+"""Storage Per Object Report version 2026.10.18 for Python"""
 
 # import pyhesity wrapper module
 from pyhesity import *
 from datetime import datetime
 import codecs
+import json
+import os
 
 # command line arguments
 import argparse
@@ -24,6 +26,9 @@ parser.add_argument('-y', '--growthdays', type=int, default=7)
 parser.add_argument('-x', '--units', type=str, choices=['MiB', 'GiB', 'mib', 'gib'], default='GiB')
 parser.add_argument('-s', '--skipdeleted', action='store_true')
 parser.add_argument('-a', '--includearchives', action='store_true')
+parser.add_argument('-t', '--threads', type=int, default=4)
+parser.add_argument('-ct', '--clusterthreads', type=int, default=8)
+parser.add_argument('-inc', '--incremental', action='store_true')
 parser.add_argument('-debug', '--debug', action='store_true')
 args = parser.parse_args()
 
@@ -43,8 +48,11 @@ units = args.units
 skipdeleted = args.skipdeleted
 debug = args.debug
 includearchives = args.includearchives
+threads = args.threads
+clusterthreads = args.clusterthreads
+incremental = args.incremental
 
-scriptVersion = '2024-10-23 (Python)'
+scriptVersion = '2026-10-18 (Python)'
 
 if vips is None or len(vips) == 0:
     vips = ['helios.cohesity.com']
@@ -73,8 +81,8 @@ csv.write('"Cluster Name","Origin","Stats Age (Days)","Protection Group","Tenant
 clusterStats.write('"Cluster Name","Total Used %s","BookKeeper Used %s","Total Unaccounted Usage %s","Total Unaccounted Percent","Garbage %s","Garbage Percent","Other Unaccounted Usage %s","Other Unaccounted Percent","Reduction Ratio","All Objects Front End Size %s","All Objects Stored (After Reduction) %s","All Objects Stored (After Reduction and Resiliency) %s","Storage Variance Factor","Script Version","Cluster Software Version"\n' % (units, units, units, units, units, units, units, units))
 
 
-def getCloudStats(cluster):
-    vaults = api('get', 'vaults?includeFortKnoxVault=true')
+def getCloudStats(client, cluster):
+    vaults = client.api('get', 'vaults?includeFortKnoxVault=true')
     cloudStats = None
     if vaults is not None and len(vaults) > 0 and includearchives is True:
         nowMsecs = int((dateToUsecs()) / 1000)
@@ -82,15 +90,57 @@ def getCloudStats(cluster):
         cloudStatURL = 'reports/dataTransferToVaults?endTimeMsecs=%s&startTimeMsecs=%s' % (nowMsecs, cloudStart)
         for vault in vaults:
             cloudStatURL += '&vaultIds=%s' % vault['id']
-        cloudStats = api('get', cloudStatURL)
+        cloudStats = client.api('get', cloudStatURL)
     return cloudStats
 
 
-def getConsumerStats(consumerType, msecsBeforeCurrentTimeToCompare):
+def indexBy(items, key):
+    """items by key (the first item with each key wins, like the list searches this replaces)"""
+    index = {}
+    if items is not None:
+        for item in items:
+            index.setdefault(key(item), item)
+    return index
+
+
+def indexStats(stats):
+    """consumer stats by job id and by lower case job name (with their position in the list)"""
+    byId = {}
+    byName = {}
+    if 'statsList' in stats and stats['statsList'] is not None:
+        for (position, stat) in enumerate(stats['statsList']):
+            byId.setdefault(stat['id'], (position, stat))
+            byName.setdefault(stat['name'].lower(), (position, stat))
+    return (byId, byName)
+
+
+def findStat(statsIndex, jobId, jobName=None):
+    """first stat in the list that matches the job id (or name), as a list of zero or one stats"""
+    matches = [statsIndex[0].get(jobId, None)]
+    if jobName is not None:
+        matches.append(statsIndex[1].get(jobName.lower(), None))
+    matches = [m for m in matches if m is not None]
+    if len(matches) == 0:
+        return []
+    return [min(matches, key=lambda m: m[0])[1]]
+
+
+def indexCloudStats(cloudStats):
+    """(vault name, storage consumed) per archive target, by protection group name"""
+    byJobName = {}
+    if cloudStats is not None and 'dataTransferSummary' in cloudStats and len(cloudStats['dataTransferSummary']) > 0:
+        for vaultSummary in cloudStats['dataTransferSummary']:
+            if vaultSummary is not None and 'dataTransferPerProtectionJob' in vaultSummary and len(vaultSummary['dataTransferPerProtectionJob']) > 0:
+                for cloudJob in vaultSummary['dataTransferPerProtectionJob']:
+                    byJobName.setdefault(cloudJob['protectionJobName'], []).append((vaultSummary['vaultName'], cloudJob['storageConsumed']))
+    return byJobName
+
+
+def getConsumerStats(client, consumerType, msecsBeforeCurrentTimeToCompare):
     cookie = ''
     consumerStats = {'statsList': []}
     while True:
-        theseStats = api('get', 'stats/consumers?consumerType=%s&msecsBeforeCurrentTimeToCompare=%s&cookie=%s' % (consumerType, msecsBeforeCurrentTimeToCompare, cookie))
+        theseStats = client.api('get', 'stats/consumers?consumerType=%s&msecsBeforeCurrentTimeToCompare=%s&cookie=%s' % (consumerType, msecsBeforeCurrentTimeToCompare, cookie))
         if 'statsList' in theseStats:
             consumerStats['statsList'] = consumerStats['statsList'] + theseStats['statsList']
         if 'cookie' in theseStats:
@@ -102,12 +152,118 @@ def getConsumerStats(consumerType, msecsBeforeCurrentTimeToCompare):
     return consumerStats
 
 
-def reportStorage():
+def protectionRuns(client, job, includeObjectDetails=True):
+    """restorable runs of a protection group, newest first (paged back through history)"""
+    endUsecs = nowUsecs
+    lastRunId = '0'
+    while 1:
+        if debug is True:
+            print('    getting protection runs')
+        runs = client.api('get', 'data-protect/protection-groups/%s/runs?numRuns=%s&endTimeUsecs=%s&includeTenants=true&includeObjectDetails=%s&excludeNonRestorableRuns=true&useCachedData=true' % (job['id'], numruns, endUsecs, str(includeObjectDetails).lower()), v=2)
+        if lastRunId != '0':
+            runs['runs'] = [r for r in runs['runs'] if r['id'] < lastRunId]
+        for run in runs['runs']:
+            yield run
+        if len(runs['runs']) == 0 or runs['runs'][-1]['id'] == lastRunId:
+            break
+        else:
+            lastRunId = runs['runs'][-1]['id']
+            if 'localBackupInfo' in runs['runs'][-1]:
+                endUsecs = runs['runs'][-1]['localBackupInfo']['endTimeUsecs']
+            elif 'originalBackupInfo' in runs['runs'][-1]:
+                endUsecs = runs['runs'][-1]['originalBackupInfo']['endTimeUsecs']
+            else:
+                endUsecs = runs['runs'][-1]['archivalInfo']['archivalTargetResults'][0]['endTimeUsecs']
+
+
+def runUsecs(run):
+    return int(run['id'].split(':')[-1])
+
+
+def succeededArchives(run):
+    archives = 0
+    if 'archivalInfo' in run and run['archivalInfo'] is not None and 'archivalTargetResults' in run['archivalInfo'] and run['archivalInfo']['archivalTargetResults'] is not None and len(run['archivalInfo']['archivalTargetResults']) > 0:
+        for archiveResult in run['archivalInfo']['archivalTargetResults']:
+            if 'status' in archiveResult and archiveResult['status'] == 'Succeeded':
+                archives += 1
+    return archives
+
+
+### incremental state - per object totals (and the snapshots that make them up) from previous reports
+def stateFileName(cluster):
+    return os.path.join(folder, 'storagePerObjectReport-%s-state.json' % cluster['id'])
+
+
+def loadState(cluster):
+    try:
+        f = open(stateFileName(cluster), 'r')
+        state = json.load(f)
+        f.close()
+    except Exception:
+        return {}
+    if state.get('version', None) != 1:
+        return {}
+    # json object keys are strings, object and source IDs are numbers
+    for group in state['groups'].values():
+        group['objects'] = dict([(int(k), o) for (k, o) in group['objects'].items()])
+        group['sourceNames'] = dict([(int(k), n) for (k, n) in group['sourceNames'].items()])
+    return state['groups']
+
+
+def saveState(cluster, groups):
+    tmpFileName = '%s.tmp' % stateFileName(cluster)
+    f = open(tmpFileName, 'w')
+    f.write(json.dumps({'version': 1, 'clusterName': cluster['name'], 'groups': groups}, separators=(',', ':')))
+    f.close()
+    getattr(os, 'replace', os.rename)(tmpFileName, stateFileName(cluster))
+
+
+def mergeObjects(job, objects, previous, restorableRuns):
+    """add objects from previous reports (less snapshots that have since expired) to objects collected from new runs"""
+    restorable = set([runUsecs(r) for r in restorableRuns if 'isLocalSnapshotsDeleted' not in r])
+    for (objId, oldObject) in previous.items():
+        expired = [snapshot for snapshot in oldObject['snaps'] if snapshot[0] not in restorable]
+        if len(expired) > 0:
+            oldObject['snaps'] = [snapshot for snapshot in oldObject['snaps'] if snapshot[0] in restorable]
+            if len(oldObject['snaps']) == 0:
+                continue
+            for (runStartUsecs, startTimeUsecs, bytesRead, isLog, isArchive) in expired:
+                if isArchive is True:
+                    oldObject['archiveBytesRead'] -= bytesRead
+                else:
+                    oldObject['bytesRead'] -= bytesRead
+                if isLog is True:
+                    oldObject['numLogs'] -= 1
+                else:
+                    oldObject['numSnaps'] -= 1
+            oldObject['oldestBackup'] = oldObject['snaps'][-1][1]
+        if objId not in objects:
+            objects[objId] = oldObject
+            continue
+        thisObject = objects[objId]
+        for counter in ['bytesRead', 'archiveBytesRead', 'numSnaps', 'numLogs']:
+            thisObject[counter] += oldObject[counter]
+        thisObject['archiveLogical'] = max(thisObject['archiveLogical'], oldObject['archiveLogical'])
+        if job['environment'] == 'kVMware':
+            if oldObject['logical'] > 0 and (thisObject['logical'] == 0 or oldObject['logical'] < thisObject['logical']):
+                thisObject['logical'] = oldObject['logical']
+        elif thisObject['logical'] == 0:
+            thisObject['logical'] = oldObject['logical']
+        if 'oldestBackup' in oldObject:
+            thisObject['oldestBackup'] = oldObject['oldestBackup']
+        thisObject['snaps'] = thisObject['snaps'] + oldObject['snaps']
+    # growth is over the last growthdays, so is summed again each time
+    for thisObject in objects.values():
+        thisObject['growth'] = sum([snapshot[2] for snapshot in thisObject['snaps'] if snapshot[4] is False and snapshot[1] > growthdaysusecs])
+    return objects
+
+
+def reportStorage(client, csv, clusterStats):
     sumObjectsUsed = 0
     sumObjectsWritten = 0
     sumObjectsWrittenWithResiliency = 0
     viewHistory = {}
-    cluster = api('get', 'cluster?fetchStats=true')
+    cluster = client.api('get', 'cluster?fetchStats=true')
     print('\n%s' % cluster['name'])
     try:
         clusterReduction = round(cluster['stats']['usagePerfStats']['dataInBytes'] / cluster['stats']['usagePerfStats']['dataInBytesAfterReduction'], 1)
@@ -115,25 +271,37 @@ def reportStorage():
     except Exception:
         clusterReduction = 1
         clusterUsed = 0
-    vaults = api('get', 'vaults?includeFortKnoxVault=true')
+    vaults = client.api('get', 'vaults?includeFortKnoxVault=true')
     cloudStats = None
     if includearchives is True:
-        cloudStats = getCloudStats(cluster)
+        cloudStats = getCloudStats(client, cluster)
     if skipdeleted:
-        jobs = api('get', 'data-protect/protection-groups?isDeleted=false&includeTenants=true&useCachedData=true&onlyReturnBasicSummary=true', v=2)
+        jobs = client.api('get', 'data-protect/protection-groups?isDeleted=false&includeTenants=true&useCachedData=true&onlyReturnBasicSummary=true', v=2)
     else:
-        jobs = api('get', 'data-protect/protection-groups?includeTenants=true&useCachedData=true&onlyReturnBasicSummary=true', v=2)
+        jobs = client.api('get', 'data-protect/protection-groups?includeTenants=true&useCachedData=true&onlyReturnBasicSummary=true', v=2)
 
-    storageDomains = api('get', 'viewBoxes')
+    storageDomains = indexBy(client.api('get', 'viewBoxes'), lambda sd: sd['id'])
+    jobsByName = indexBy(jobs['protectionGroups'], lambda j: j['name'].lower())
+    cloudStatsByJobName = indexCloudStats(cloudStats)
 
     sourceNames = {}
-    localStats = getConsumerStats('kProtectionRuns', growthdays)
-    replicaStats = getConsumerStats('kReplicationRuns', growthdays)
-    viewRunStats = getConsumerStats('kViewProtectionRuns', growthdays)
+    localStats = indexStats(getConsumerStats(client, 'kProtectionRuns', growthdays))
+    replicaStats = indexStats(getConsumerStats(client, 'kReplicationRuns', growthdays))
+    viewRunStats = indexStats(getConsumerStats(client, 'kViewProtectionRuns', growthdays))
 
     viewJobAltStats = {}
-
-    for job in sorted(jobs['protectionGroups'], key=lambda job: job['name'].lower()):
+    previousState = {}
+    if incremental is True:
+        previousState = loadState(cluster)
+    newState = {}
+
+    def collectGroup(job):
+        """fetch and reduce the runs of one protection group (groups are collected concurrently)"""
+        group = {'job': job}
+        if job['environment'] in ['kView']:
+            # a view can be protected by more than one group, so view runs are reduced in order, below
+            group['runs'] = list(protectionRuns(client, job))
+            return group
         v1JobId = job['id'].split(':')[2]
         statsAge = '-'
         jobDescription = ''
@@ -142,206 +310,269 @@ def reportStorage():
         origin = 'local'
         if job['isActive'] is not True:
             origin = 'replica'
-        if job['environment'] not in ['kView']:
-            tenant = ''
-            if 'permissions' in job and len(job['permissions']) > 0 and 'name' in job['permissions'][0]:
-                tenant = job['permissions'][0]['name']
-            # get resiliency factor
-            resiliencyFactor = 1
-            sdname = 'DirectArchive'
-            if 'storageDomainId' in job:
-                sdid = job['storageDomainId']
-                sd = [v for v in storageDomains if v['id'] == job['storageDomainId']]
-                if sd is not None and len(sd) > 0:
-                    sdname = sd[0]['name']
-                    if 'erasureCodingInfo' in sd[0]['storagePolicy']:
-                        r = sd[0]['storagePolicy']['erasureCodingInfo']
-                        resiliencyFactor = float(r['numDataStripes'] + r['numCodedStripes']) / r['numDataStripes']
+        tenant = ''
+        if 'permissions' in job and len(job['permissions']) > 0 and 'name' in job['permissions'][0]:
+            tenant = job['permissions'][0]['name']
+        # get resiliency factor
+        resiliencyFactor = 1
+        sdid = '-'
+        sdname = 'DirectArchive'
+        if 'storageDomainId' in job:
+            sdid = job['storageDomainId']
+            sd = storageDomains.get(job['storageDomainId'], None)
+            if sd is not None:
+                sdname = sd['name']
+                if 'erasureCodingInfo' in sd['storagePolicy']:
+                    r = sd['storagePolicy']['erasureCodingInfo']
+                    resiliencyFactor = float(r['numDataStripes'] + r['numCodedStripes']) / r['numDataStripes']
+                else:
+                    if sd['storagePolicy']['numFailuresTolerated'] == 0:
+                        resiliencyFactor = 1
                     else:
-                        if sd[0]['storagePolicy']['numFailuresTolerated'] == 0:
-                            resiliencyFactor = 1
-                        else:
-                            resiliencyFactor = 2
-            objects = {}
-            print('  %s' % job['name'])
-
-            jobObjGrowth = 0
-            jobGrowth = 0
-            # get jobReduction factor
-            if job['isActive'] is True:
-                stats = localStats
+                        resiliencyFactor = 2
+        objects = {}
+        sourceNames = {}
+
+        jobObjGrowth = 0
+        jobGrowth = 0
+        # get jobReduction factor
+        if job['isActive'] is True:
+            stats = localStats
+        else:
+            stats = replicaStats
+        thisStat = findStat(stats, int(v1JobId), job['name'])
+        if len(thisStat) > 0:
+            statsTimeUsecs = thisStat[0]['stats'].get('dataWrittenBytesTimestampUsec', 0)
+            if statsTimeUsecs > 0:
+                statsAge = round((nowUsecs - statsTimeUsecs) / 86400000000, 0)
             else:
-                stats = replicaStats
-            if 'statsList' in stats and stats['statsList'] is not None:
-                thisStat = [s for s in stats['statsList'] if s['id'] == int(v1JobId) or s['name'].lower() == job['name'].lower()]
-            if 'statsList' in stats and stats['statsList'] is not None and thisStat is not None and len(thisStat) > 0:
-                statsTimeUsecs = thisStat[0]['stats'].get('dataWrittenBytesTimestampUsec', 0)
-                if statsTimeUsecs > 0:
-                    statsAge = round((nowUsecs - statsTimeUsecs) / 86400000000, 0)
-                else:
-                    statsAge = '-'
-                dataIn = thisStat[0]['stats'].get('dataInBytes', 0)
-                dataInAfterDedup = thisStat[0]['stats'].get('dataInBytesAfterDedup', 0)
-                jobWritten = thisStat[0]['stats'].get('dataWrittenBytes', 0)
-                storageConsumedBytes = thisStat[0]['stats'].get('storageConsumedBytes', 0)
-                storageConsumedBytesPrev = thisStat[0]['stats'].get('storageConsumedBytesPrev', 0)
-                if storageConsumedBytes > 0 and storageConsumedBytesPrev > 0 and resiliencyFactor > 0:
-                    jobGrowth = (storageConsumedBytes - storageConsumedBytesPrev) / resiliencyFactor
-                if dataInAfterDedup > 0 and jobWritten > 0:
-                    dedup = round(float(dataIn) / dataInAfterDedup, 1)
-                    compression = round(float(dataInAfterDedup) / jobWritten, 1)
-                    jobReduction = round((float(dataIn) / dataInAfterDedup) * (float(dataInAfterDedup) / jobWritten), 1)
-                else:
-                    jobReduction = 1
+                statsAge = '-'
+            dataIn = thisStat[0]['stats'].get('dataInBytes', 0)
+            dataInAfterDedup = thisStat[0]['stats'].get('dataInBytesAfterDedup', 0)
+            jobWritten = thisStat[0]['stats'].get('dataWrittenBytes', 0)
+            storageConsumedBytes = thisStat[0]['stats'].get('storageConsumedBytes', 0)
+            storageConsumedBytesPrev = thisStat[0]['stats'].get('storageConsumedBytesPrev', 0)
+            if storageConsumedBytes > 0 and storageConsumedBytesPrev > 0 and resiliencyFactor > 0:
+                jobGrowth = (storageConsumedBytes - storageConsumedBytesPrev) / resiliencyFactor
+            if dataInAfterDedup > 0 and jobWritten > 0:
+                jobReduction = round((float(dataIn) / dataInAfterDedup) * (float(dataInAfterDedup) / jobWritten), 1)
             else:
-                jobWritten = 0
-                dataIn = 0
-                jobReduction = clusterReduction
-            if jobReduction == 0:
                 jobReduction = 1
-
-            if job['environment'] in ['kVMware', 'kAD'] or (job['environment'] == 'kPhysical' and job['physicalParams']['protectionType'] == 'kVolume'):
-                if job['environment'] == 'kAD':
-                    entityType = 'kPhysical'
-                else:
-                    entityType = job['environment']
-                vmsearch = api('get', '/searchvms?allUnderHierarchy=true&entityTypes=%s&jobIds=%s' % (entityType, v1JobId))
-            archiveCount = 0
-            oldestArchive = '-'
-            lastDataLock = '-'
-            endUsecs = nowUsecs
-            lastRunId = '0'
-            while 1:
-                if debug is True:
-                    print('    getting protection runs')
-                runs = api('get', 'data-protect/protection-groups/%s/runs?numRuns=%s&endTimeUsecs=%s&includeTenants=true&includeObjectDetails=true&excludeNonRestorableRuns=true&useCachedData=true' % (job['id'], numruns, endUsecs), v=2)
-                if lastRunId != '0':
-                    runs['runs'] = [r for r in runs['runs'] if r['id'] < lastRunId]
-                for run in runs['runs']:
-                    if 'isLocalSnapshotsDeleted' not in run:
-                        # per object stats
-                        if 'objects' in run and run['objects'] is not None and len(run['objects']) > 0:
-                            for object in [o for o in run['objects'] if o['object']['environment'] != job['environment']]:
-                                sourceNames[object['object']['id']] = object['object']['name']
-                            for object in [o for o in run['objects']]:
-                                objId = object['object']['id']
-                                archivalInfo = None
-                                runInfo = None
-                                if 'localSnapshotInfo' in object:
-                                    snap = object['localSnapshotInfo']
-                                    runType = run['localBackupInfo']['runType']
-                                    runInfo = run['localBackupInfo']
-                                elif 'originalBackupInfo' in object:
-                                    snap = object['originalBackupInfo']
-                                    runType = run['originalBackupInfo']['runType']
-                                    runInfo = run['originalBackupInfo']
-                                else:
-                                    # CAD
-                                    snap = None
-                                    if 'archivalInfo' in object:
-                                        try:
-                                            archivalInfo = object['archivalInfo']['archivalTargetResults'][0]
-                                            runInfo = run['archivalInfo']['archivalTargetResults'][0]
-                                        except Exception:
-                                            archivalInfo = None
-                                if runInfo is not None and lastDataLock == '-' and 'dataLockConstraints' in runInfo and 'expiryTimeUsecs' in runInfo['dataLockConstraints'] and runInfo['dataLockConstraints']['expiryTimeUsecs'] > 0:
-                                    if runInfo['dataLockConstraints']['expiryTimeUsecs'] > nowUsecs:
-                                        lastDataLock = usecsToDate(runInfo['dataLockConstraints']['expiryTimeUsecs'])
+        else:
+            jobWritten = 0
+            dataIn = 0
+            jobReduction = clusterReduction
+        if jobReduction == 0:
+            jobReduction = 1
+
+        vms = {}
+        if job['environment'] in ['kVMware', 'kAD'] or (job['environment'] == 'kPhysical' and job['physicalParams']['protectionType'] == 'kVolume'):
+            if job['environment'] == 'kAD':
+                entityType = 'kPhysical'
+            else:
+                entityType = job['environment']
+            vmsearch = client.api('get', '/searchvms?allUnderHierarchy=true&entityTypes=%s&jobIds=%s' % (entityType, v1JobId))
+            if vmsearch is not None and 'vms' in vmsearch:
+                vms = indexBy(vmsearch['vms'], lambda vm: vm['vmDocument']['objectName'].lower())
+        archiveCount = 0
+        oldestArchive = '-'
+        lastDataLock = '-'
+        runs = protectionRuns(client, job)
+        highWaterUsecs = None
+        seenRuns = []
+        state = previousState.get(job['id'], None)
+        if state is not None:
+            # only collect runs newer than the last report (the rest of the restorable runs are listed without object details)
+            restorableRuns = list(protectionRuns(client, job, includeObjectDetails=False))
+            seenRuns = [runUsecs(r) for r in restorableRuns]
+            newRuns = set(seenRuns).difference(state['runs'])
+            if len(newRuns) > 0 and min(newRuns) < state['highWaterUsecs']:
+                # runs older than the last report have appeared (for example, replicated late), so collect the whole group
+                state = None
+                seenRuns = []
+            else:
+                runs = []
+                if len(newRuns) > 0:
+                    for run in protectionRuns(client, job):
+                        if runUsecs(run) <= state['highWaterUsecs']:
+                            break
+                        runs.append(run)
+        for run in runs:
+            if highWaterUsecs is None:
+                highWaterUsecs = runUsecs(run)
+            if state is None:
+                seenRuns.append(runUsecs(run))
+            if 'isLocalSnapshotsDeleted' not in run:
+                # per object stats
+                if 'objects' in run and run['objects'] is not None and len(run['objects']) > 0:
+                    for object in [o for o in run['objects'] if o['object']['environment'] != job['environment']]:
+                        sourceNames[object['object']['id']] = object['object']['name']
+                    for object in [o for o in run['objects']]:
+                        objId = object['object']['id']
+                        archivalInfo = None
+                        runInfo = None
+                        runType = None
+                        if 'localSnapshotInfo' in object:
+                            snap = object['localSnapshotInfo']
+                            runType = run['localBackupInfo']['runType']
+                            runInfo = run['localBackupInfo']
+                        elif 'originalBackupInfo' in object:
+                            snap = object['originalBackupInfo']
+                            runType = run['originalBackupInfo']['runType']
+                            runInfo = run['originalBackupInfo']
+                        else:
+                            # CAD
+                            snap = None
+                            if 'archivalInfo' in object:
                                 try:
-                                    if objId not in objects and not (job['environment'] == 'kAD' and object['object']['environment'] == 'kAD') and not (job['environment'] in ['kSQL', 'kOracle', 'kExchange'] and object['object']['objectType'] == 'kHost'):
-                                        objects[objId] = {}
-                                        objects[objId]['name'] = object['object']['name']
-                                        objects[objId]['logical'] = 0
-                                        objects[objId]['alloc'] = 0
-                                        objects[objId]['fetb'] = 0
-                                        objects[objId]['archiveLogical'] = 0
-                                        objects[objId]['bytesRead'] = 0
-                                        objects[objId]['archiveBytesRead'] = 0
-                                        objects[objId]['growth'] = 0
-                                        objects[objId]['numSnaps'] = 0
-                                        objects[objId]['numLogs'] = 0
-                                        objects[objId]['vmTags'] = ''
-                                        objects[objId]['lastDataLock'] = lastDataLock
-                                        if 'sourceId' in object['object']:
-                                            objects[objId]['sourceId'] = object['object']['sourceId']
-                                        if snap is not None:
-                                            objects[objId]['newestBackup'] = snap['snapshotInfo']['startTimeUsecs']
-                                            objects[objId]['oldestBackup'] = snap['snapshotInfo']['startTimeUsecs']
-                                            if 'logicalSizeBytes' not in snap['snapshotInfo']['stats']:
-                                                if debug is True:
-                                                    print('   looking up source ID')
-                                                csource = api('get', 'protectionSources?id=%s&useCachedData=true' % objId, quiet=True)
-                                                try:
-                                                    if type(csource) is list:
-                                                        objects[objId]['logical'] = csource[0]['protectedSourcesSummary'][0]['totalLogicalSize']
-                                                        objects[objId]['alloc'] = csource[0]['protectedSourcesSummary'][0]['totalLogicalSize']
-                                                    else:
-                                                        objects[objId]['logical'] = csource['protectedSourcesSummary'][0]['totalLogicalSize']
-                                                        objects[objId]['alloc'] = csource['protectedSourcesSummary'][0]['totalLogicalSize']
-                                                except Exception:
-                                                    pass
+                                    archivalInfo = object['archivalInfo']['archivalTargetResults'][0]
+                                    runInfo = run['archivalInfo']['archivalTargetResults'][0]
+                                except Exception:
+                                    archivalInfo = None
+                        if runInfo is not None and lastDataLock == '-' and 'dataLockConstraints' in runInfo and 'expiryTimeUsecs' in runInfo['dataLockConstraints'] and runInfo['dataLockConstraints']['expiryTimeUsecs'] > 0:
+                            if runInfo['dataLockConstraints']['expiryTimeUsecs'] > nowUsecs:
+                                lastDataLock = usecsToDate(runInfo['dataLockConstraints']['expiryTimeUsecs'])
+                        try:
+                            if objId not in objects and not (job['environment'] == 'kAD' and object['object']['environment'] == 'kAD') and not (job['environment'] in ['kSQL', 'kOracle', 'kExchange'] and object['object']['objectType'] == 'kHost'):
+                                objects[objId] = {}
+                                objects[objId]['name'] = object['object']['name']
+                                objects[objId]['logical'] = 0
+                                objects[objId]['alloc'] = 0
+                                objects[objId]['fetb'] = 0
+                                objects[objId]['archiveLogical'] = 0
+                                objects[objId]['bytesRead'] = 0
+                                objects[objId]['archiveBytesRead'] = 0
+                                objects[objId]['growth'] = 0
+                                objects[objId]['numSnaps'] = 0
+                                objects[objId]['numLogs'] = 0
+                                objects[objId]['vmTags'] = ''
+                                objects[objId]['snaps'] = []
+                                objects[objId]['lastDataLock'] = lastDataLock
+                                if 'sourceId' in object['object']:
+                                    objects[objId]['sourceId'] = object['object']['sourceId']
+                                if snap is not None:
+                                    objects[objId]['newestBackup'] = snap['snapshotInfo']['startTimeUsecs']
+                                    objects[objId]['oldestBackup'] = snap['snapshotInfo']['startTimeUsecs']
+                                    if 'logicalSizeBytes' not in snap['snapshotInfo']['stats']:
+                                        if debug is True:
+                                            print('   looking up source ID')
+                                        csource = client.api('get', 'protectionSources?id=%s&useCachedData=true' % objId, quiet=True)
+                                        try:
+                                            if type(csource) is list:
+                                                objects[objId]['logical'] = csource[0]['protectedSourcesSummary'][0]['totalLogicalSize']
+                                                objects[objId]['alloc'] = csource[0]['protectedSourcesSummary'][0]['totalLogicalSize']
                                             else:
-                                                objects[objId]['logical'] = snap['snapshotInfo']['stats']['logicalSizeBytes']
-                                                objects[objId]['alloc'] = snap['snapshotInfo']['stats']['logicalSizeBytes']
-
-                                        if archivalInfo is not None:
-                                            objects[objId]['newestBackup'] = archivalInfo['startTimeUsecs']
-                                            objects[objId]['oldestBackup'] = archivalInfo['startTimeUsecs']
-                                    if objId in objects:
-                                        if snap is None and 'logicalSizeBytes' in archivalInfo['stats'] and archivalInfo['stats']['logicalSizeBytes'] > objects[objId]['archiveLogical']:
-                                            objects[objId]['archiveLogical'] = archivalInfo['stats']['logicalSizeBytes']
-                                        if objects[objId]['fetb'] == 0 and (job['environment'] in ['kVMware', 'kAD'] or (job['environment'] == 'kPhysical' and job['physicalParams']['protectionType'] == 'kVolume')):
-                                            if vmsearch is not None and 'vms' in vmsearch and vmsearch['vms'] is not None and len(vmsearch['vms']) > 0:
-                                                vms = [vm for vm in vmsearch['vms'] if vm['vmDocument']['objectName'].lower() == object['object']['name'].lower()]
-                                                if len(vms) > 0:
-                                                    if job['environment'] == 'kVMware':
-                                                        vmbytes = vms[0]['vmDocument']['objectId']['entity']['vmwareEntity']['frontEndSizeInfo']['sizeBytes']
-                                                        tagAttrs = [a for a in vms[0]['vmDocument']['attributeMap'] if 'VMware_tag' in a['xKey']]
-                                                        if tagAttrs is not None and len(tagAttrs) > 0:
-                                                            objects[objId]['vmTags'] = ';'.join([a['xValue'] for a in tagAttrs])
-                                                    else:
-                                                        vmbytes = vms[0]['vmDocument']['objectId']['entity']['sizeInfo'][0]['value']['sourceDataSizeBytes']
-                                                    objects[objId]['logical'] = vmbytes
-                                                    objects[objId]['fetb'] = vmbytes
-
-                                        if snap is not None and 'logicalSizeBytes' in snap['snapshotInfo']['stats'] and snap['snapshotInfo']['stats']['logicalSizeBytes'] > objects[objId]['logical']:
-                                            if objects[objId]['logical'] == 0 or (job['environment'] not in ['kVMware', 'kAD'] and job['environment'] != 'kPhysical' and job['physicalParams']['protectionType'] != 'kVolume'):
-                                                objects[objId]['logical'] = snap['snapshotInfo']['stats']['logicalSizeBytes']
-                                        if snap is not None and job['environment'] == 'kVMware' and snap['snapshotInfo']['stats']['logicalSizeBytes'] < objects[objId]['logical'] and snap['snapshotInfo']['stats']['logicalSizeBytes'] > 0:
-                                            objects[objId]['logical'] = snap['snapshotInfo']['stats']['logicalSizeBytes']
-                                        if snap is not None:
-                                            objects[objId]['bytesRead'] += snap['snapshotInfo']['stats']['bytesRead']
-                                            objects[objId]['lastDataLock'] = lastDataLock
-                                        if snap is not None and snap['snapshotInfo']['startTimeUsecs'] > growthdaysusecs:
-                                            objects[objId]['growth'] += snap['snapshotInfo']['stats']['bytesRead']
-                                            jobObjGrowth += snap['snapshotInfo']['stats']['bytesRead']
-                                        if runType == 'kLog':
-                                            objects[objId]['numLogs'] += 1
+                                                objects[objId]['logical'] = csource['protectedSourcesSummary'][0]['totalLogicalSize']
+                                                objects[objId]['alloc'] = csource['protectedSourcesSummary'][0]['totalLogicalSize']
+                                        except Exception:
+                                            pass
+                                    else:
+                                        objects[objId]['logical'] = snap['snapshotInfo']['stats']['logicalSizeBytes']
+                                        objects[objId]['alloc'] = snap['snapshotInfo']['stats']['logicalSizeBytes']
+
+                                if archivalInfo is not None:
+                                    objects[objId]['newestBackup'] = archivalInfo['startTimeUsecs']
+                                    objects[objId]['oldestBackup'] = archivalInfo['startTimeUsecs']
+                            if objId in objects:
+                                if snap is None and 'logicalSizeBytes' in archivalInfo['stats'] and archivalInfo['stats']['logicalSizeBytes'] > objects[objId]['archiveLogical']:
+                                    objects[objId]['archiveLogical'] = archivalInfo['stats']['logicalSizeBytes']
+                                if objects[objId]['fetb'] == 0 and (job['environment'] in ['kVMware', 'kAD'] or (job['environment'] == 'kPhysical' and job['physicalParams']['protectionType'] == 'kVolume')):
+                                    vm = vms.get(object['object']['name'].lower(), None)
+                                    if vm is not None:
+                                        if job['environment'] == 'kVMware':
+                                            vmbytes = vm['vmDocument']['objectId']['entity']['vmwareEntity']['frontEndSizeInfo']['sizeBytes']
+                                            tagAttrs = [a for a in vm['vmDocument']['attributeMap'] if 'VMware_tag' in a['xKey']]
+                                            if tagAttrs is not None and len(tagAttrs) > 0:
+                                                objects[objId]['vmTags'] = ';'.join([a['xValue'] for a in tagAttrs])
                                         else:
-                                            objects[objId]['numSnaps'] += 1
-                                        if snap is not None:
-                                            objects[objId]['oldestBackup'] = snap['snapshotInfo']['startTimeUsecs']
-                                        if archivalInfo is not None:
-                                            objects[objId]['oldestBackup'] = archivalInfo['startTimeUsecs']
-                                            objects[objId]['archiveBytesRead'] += archivalInfo['stats']['bytesRead']
-
-                                except Exception as e:
-                                    pass
-                    if 'archivalInfo' in run and run['archivalInfo'] is not None and 'archivalTargetResults' in run['archivalInfo'] and run['archivalInfo']['archivalTargetResults'] is not None and len(run['archivalInfo']['archivalTargetResults']) > 0:
-                        for archiveResult in run['archivalInfo']['archivalTargetResults']:
-                            if 'status' in archiveResult and archiveResult['status'] == 'Succeeded':
-                                archiveCount += 1
-                                oldestArchive = usecsToDate(run['id'].split(':')[-1])
-                if len(runs['runs']) == 0 or runs['runs'][-1]['id'] == lastRunId:
-                    break
+                                            vmbytes = vm['vmDocument']['objectId']['entity']['sizeInfo'][0]['value']['sourceDataSizeBytes']
+                                        objects[objId]['logical'] = vmbytes
+                                        objects[objId]['fetb'] = vmbytes
+
+                                if snap is not None and 'logicalSizeBytes' in snap['snapshotInfo']['stats'] and objects[objId]['logical'] == 0:
+                                    objects[objId]['logical'] = snap['snapshotInfo']['stats']['logicalSizeBytes']
+                                if snap is not None and job['environment'] == 'kVMware' and snap['snapshotInfo']['stats']['logicalSizeBytes'] < objects[objId]['logical'] and snap['snapshotInfo']['stats']['logicalSizeBytes'] > 0:
+                                    objects[objId]['logical'] = snap['snapshotInfo']['stats']['logicalSizeBytes']
+                                if snap is not None:
+                                    objects[objId]['bytesRead'] += snap['snapshotInfo']['stats']['bytesRead']
+                                    objects[objId]['lastDataLock'] = lastDataLock
+                                if snap is not None and snap['snapshotInfo']['startTimeUsecs'] > growthdaysusecs:
+                                    objects[objId]['growth'] += snap['snapshotInfo']['stats']['bytesRead']
+                                    jobObjGrowth += snap['snapshotInfo']['stats']['bytesRead']
+                                if runType == 'kLog':
+                                    objects[objId]['numLogs'] += 1
+                                else:
+                                    objects[objId]['numSnaps'] += 1
+                                if snap is not None:
+                                    objects[objId]['oldestBackup'] = snap['snapshotInfo']['startTimeUsecs']
+                                if archivalInfo is not None:
+                                    objects[objId]['oldestBackup'] = archivalInfo['startTimeUsecs']
+                                    objects[objId]['archiveBytesRead'] += archivalInfo['stats']['bytesRead']
+                                if snap is not None:
+                                    objects[objId]['snaps'].append([runUsecs(run), snap['snapshotInfo']['startTimeUsecs'], snap['snapshotInfo']['stats']['bytesRead'], runType == 'kLog', False])
+                                elif archivalInfo is not None:
+                                    objects[objId]['snaps'].append([runUsecs(run), archivalInfo['startTimeUsecs'], archivalInfo['stats']['bytesRead'], runType == 'kLog', True])
+
+                        except Exception as e:
+                            pass
+            if state is None and succeededArchives(run) > 0:
+                archiveCount += succeededArchives(run)
+                oldestArchive = usecsToDate(run['id'].split(':')[-1])
+        if state is not None:
+            if highWaterUsecs is None:
+                highWaterUsecs = state['highWaterUsecs']
+            objects = mergeObjects(job, objects, state['objects'], restorableRuns)
+            jobObjGrowth = sum([o['growth'] for o in objects.values()])
+            sourceNames = dict(list(state['sourceNames'].items()) + list(sourceNames.items()))
+            lastDataLock = '-'
+            for run in restorableRuns:
+                if succeededArchives(run) > 0:
+                    archiveCount += succeededArchives(run)
+                    oldestArchive = usecsToDate(run['id'].split(':')[-1])
+                runInfo = run.get('localBackupInfo', run.get('originalBackupInfo', None))
+                if lastDataLock == '-' and 'isLocalSnapshotsDeleted' not in run and runInfo is not None and runInfo.get('dataLockConstraints', {}).get('expiryTimeUsecs', 0) > nowUsecs:
+                    lastDataLock = usecsToDate(runInfo['dataLockConstraints']['expiryTimeUsecs'])
+                    lockUsecs = runUsecs(run)
+            # objects only show the datalock if they have a snapshot from (or before) the locked run
+            for thisObject in objects.values():
+                if lastDataLock != '-' and len(thisObject['snaps']) > 0 and thisObject['snaps'][-1][0] <= lockUsecs:
+                    thisObject['lastDataLock'] = lastDataLock
                 else:
-                    lastRunId = runs['runs'][-1]['id']
-                    if 'localBackupInfo' in runs['runs'][-1]:
-                        endUsecs = runs['runs'][-1]['localBackupInfo']['endTimeUsecs']
-                    elif 'originalBackupInfo' in runs['runs'][-1]:
-                        endUsecs = runs['runs'][-1]['originalBackupInfo']['endTimeUsecs']
-                    else:
-                        endUsecs = runs['runs'][-1]['archivalInfo']['archivalTargetResults'][0]['endTimeUsecs']
+                    thisObject['lastDataLock'] = '-'
+        if incremental is True and highWaterUsecs is not None:
+            group['state'] = {'highWaterUsecs': highWaterUsecs, 'runs': seenRuns, 'objects': objects, 'sourceNames': sourceNames}
+        group.update({'origin': origin, 'statsAge': statsAge, 'tenant': tenant, 'sdid': sdid, 'sdname': sdname,
+                      'jobDescription': jobDescription, 'resiliencyFactor': resiliencyFactor, 'jobReduction': jobReduction,
+                      'jobWritten': jobWritten, 'dataIn': dataIn, 'jobGrowth': jobGrowth, 'jobObjGrowth': jobObjGrowth,
+                      'objects': objects, 'sourceNames': sourceNames, 'archiveCount': archiveCount, 'oldestArchive': oldestArchive})
+        return group
+
+    for group in mapInOrder(collectGroup, sorted(jobs['protectionGroups'], key=lambda job: job['name'].lower()), threads):
+        job = group['job']
+        v1JobId = job['id'].split(':')[2]
+        if job['environment'] not in ['kView']:
+            if showClusterName is True:
+                print('  %s: %s' % (cluster['name'], job['name']))
+            else:
+                print('  %s' % job['name'])
+            sourceNames.update(group['sourceNames'])
+            objects = group['objects']
+            origin = group['origin']
+            statsAge = group['statsAge']
+            tenant = group['tenant']
+            sdid = group['sdid']
+            sdname = group['sdname']
+            jobDescription = group['jobDescription']
+            resiliencyFactor = group['resiliencyFactor']
+            jobReduction = group['jobReduction']
+            jobWritten = group['jobWritten']
+            dataIn = group['dataIn']
+            jobGrowth = group['jobGrowth']
+            jobObjGrowth = group['jobObjGrowth']
+            archiveCount = group['archiveCount']
+            oldestArchive = group['oldestArchive']
+            if 'state' in group:
+                newState[job['id']] = group['state']
 
             # process output
             jobFESize = 0
@@ -392,7 +623,7 @@ def reportStorage():
                         else:
                             if debug is True:
                                 print('   looking up source ID (2)')
-                            source = api('get', 'protectionSources?id=%s&excludeTypes=kFolder,kDatacenter,kComputeResource,kClusterComputeResource,kResourcePool,kDatastore,kHostSystem,kVirtualMachine,kVirtualApp,kStandaloneHost,kStoragePod,kNetwork,kDistributedVirtualPortgroup,kTagCategory,kTag&useCachedData=true' % thisObject['sourceId'], quiet=True)
+                            source = client.api('get', 'protectionSources?id=%s&excludeTypes=kFolder,kDatacenter,kComputeResource,kClusterComputeResource,kResourcePool,kDatastore,kHostSystem,kVirtualMachine,kVirtualApp,kStandaloneHost,kStoragePod,kNetwork,kDistributedVirtualPortgroup,kTagCategory,kTag&useCachedData=true' % thisObject['sourceId'], quiet=True)
                             if source is not None and 'protectionSource' not in source and 'error' not in source and len(source) > 0:
                                 source = source[0]
                             if source is not None and 'protectionSource' in source:
@@ -403,16 +634,12 @@ def reportStorage():
                     # archive Stats
                     totalArchived = 0
                     vaultStats = ''
-                    if cloudStats is not None and 'dataTransferSummary' in cloudStats and len(cloudStats['dataTransferSummary']) > 0:
-                        for vaultSummary in cloudStats['dataTransferSummary']:
-                            if vaultSummary is not None and 'dataTransferPerProtectionJob' in vaultSummary and len(vaultSummary['dataTransferPerProtectionJob']) > 0:
-                                for cloudJob in vaultSummary['dataTransferPerProtectionJob']:
-                                    if cloudJob['protectionJobName'] == job['name']:
-                                        if cloudJob['storageConsumed'] > 0:
-                                            totalArchived += (objWeight * cloudJob['storageConsumed'])
-                                            vaultStats += '[%s]%s ' % (vaultSummary['vaultName'], round((objWeight * cloudJob['storageConsumed']) / multiplier, 1))
-                                            if isCad is True:
-                                                jobReduction = round(jobFESize / cloudJob['storageConsumed'], 1)
+                    for (vaultName, storageConsumed) in cloudStatsByJobName.get(job['name'], []):
+                        if storageConsumed > 0:
+                            totalArchived += (objWeight * storageConsumed)
+                            vaultStats += '[%s]%s ' % (vaultName, round((objWeight * storageConsumed) / multiplier, 1))
+                            if isCad is True:
+                                jobReduction = round(jobFESize / storageConsumed, 1)
                     totalArchived = round(totalArchived / multiplier, 1)
                     alloc = objFESize
                     if job['environment'] in ['kVMware', 'kAD'] or (job['environment'] == 'kPhysical' and job['physicalParams']['protectionType'] == 'kVolume'):
@@ -435,88 +662,71 @@ def reportStorage():
                         pass
                     csv.write('"%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s"\n' % (cluster['name'], origin, statsAge, job['name'], tenant, sdid, sdname, job['environment'][1:], sourceName, thisObject['name'], alloc, objFESize, objDataIn, objWritten, objWrittenWithResiliency, jobReduction, objGrowth, thisObject['numSnaps'], thisObject['numLogs'], oldestBackup, newestBackup, thisObject['lastDataLock'], archiveCount, oldestArchive, totalArchived, vaultStats, jobDescription, thisObject['vmTags']))
         else:
-            stats = viewRunStats
-            if 'statsList' in stats and stats['statsList'] is not None:
-                thisStat = [s for s in stats['statsList'] if s['id'] == int(v1JobId)]
-            endUsecs = nowUsecs
+            thisStat = findStat(viewRunStats, int(v1JobId))
             lastDataLock = '-'
-            lastRunId = '0'
-            while 1:
-                if debug is True:
-                    print('    getting protection runs')
-                runs = api('get', 'data-protect/protection-groups/%s/runs?numRuns=%s&endTimeUsecs=%s&includeTenants=true&includeObjectDetails=true&excludeNonRestorableRuns=true&useCachedData=true' % (job['id'], numruns, endUsecs), v=2)
-                if lastRunId != '0':
-                    runs['runs'] = [r for r in runs['runs'] if r['id'] < lastRunId]
-                for run in runs['runs']:
-                    if 'isLocalSnapshotsDeleted' not in run:
-                        # per object stats
-                        if 'objects' in run and run['objects'] is not None and len(run['objects']) > 0:
+            for run in group['runs']:
+                if 'isLocalSnapshotsDeleted' not in run:
+                    # per object stats
+                    if 'objects' in run and run['objects'] is not None and len(run['objects']) > 0:
+                        for object in [o for o in run['objects']]:
+                            runInfo = None
+                            if 'localSnapshotInfo' in object:
+                                snap = object['localSnapshotInfo']
+                                runInfo = run['localBackupInfo']
+                            elif 'orignialSnapshotInfo' in object:
+                                snap = object['originalBackupInfo']
+                                runInfo = run['originalBackupInfo']
+                            else:
+                                # CAD
+                                snap = None
+                                if 'archivalInfo' in object:
+                                    try:
+                                        archivalInfo = object['archivalInfo']['archivalTargetResults'][0]
+                                        runInfo = run['archivalInfo']['archivalTargetResults'][0]
+                                    except Exception:
+                                        archivalInfo = None
+                            if runInfo is not None and lastDataLock == '-' and 'dataLockConstraints' in runInfo and 'expiryTimeUsecs' in runInfo['dataLockConstraints'] and runInfo['dataLockConstraints']['expiryTimeUsecs'] > 0:
+                                if runInfo['dataLockConstraints']['expiryTimeUsecs'] > nowUsecs:
+                                    lastDataLock = usecsToDate(runInfo['dataLockConstraints']['expiryTimeUsecs'])
+                            if object['object']['name'] not in viewHistory:
+                                viewHistory[object['object']['name']] = {}
+                                viewHistory[object['object']['name']]['stats'] = thisStat
+                                viewHistory[object['object']['name']]['numSnaps'] = 0
+                                viewHistory[object['object']['name']]['numLogs'] = 0
+                                viewHistory[object['object']['name']]['archiveCount'] = 0
+                                viewHistory[object['object']['name']]['oldestArchive'] = '-'
+                                viewHistory[object['object']['name']]['newestBackup'] = ''
+                                viewHistory[object['object']['name']]['oldestBackup'] = ''
+                                if snap is not None:
+                                    viewHistory[object['object']['name']]['newestBackup'] = usecsToDate(snap['snapshotInfo']['startTimeUsecs'])
+                                    viewHistory[object['object']['name']]['oldestBackup'] = usecsToDate(snap['snapshotInfo']['startTimeUsecs'])
+                            if snap is not None:
+                                viewHistory[object['object']['name']]['oldestBackup'] = usecsToDate(snap['snapshotInfo']['startTimeUsecs'])
+                                viewHistory[object['object']['name']]['numSnaps'] += 1
+                            viewHistory[object['object']['name']]['lastDataLock'] = lastDataLock
+                if 'archivalInfo' in run and run['archivalInfo'] is not None and 'archivalTargetResults' in run['archivalInfo'] and run['archivalInfo']['archivalTargetResults'] is not None and len(run['archivalInfo']['archivalTargetResults']) > 0:
+                    for archiveResult in run['archivalInfo']['archivalTargetResults']:
+                        if 'status' in archiveResult and archiveResult['status'] == 'Succeeded':
                             for object in [o for o in run['objects']]:
-                                runInfo = None
-                                if 'localSnapshotInfo' in object:
-                                    snap = object['localSnapshotInfo']
-                                    runInfo = run['localBackupInfo']
-                                elif 'orignialSnapshotInfo' in object:
-                                    snap = object['originalBackupInfo']
-                                    runInfo = run['originalBackupInfo']
-                                else:
-                                    # CAD
-                                    snap = None
-                                    if 'archivalInfo' in object:
-                                        try:
-                                            archivalInfo = object['archivalInfo']['archivalTargetResults'][0]
-                                            runInfo = run['archivalInfo']['archivalTargetResults'][0]
-                                        except Exception:
-                                            archivalInfo = None
-                                if runInfo is not None and lastDataLock == '-' and 'dataLockConstraints' in runInfo and 'expiryTimeUsecs' in runInfo['dataLockConstraints'] and runInfo['dataLockConstraints']['expiryTimeUsecs'] > 0:
-                                    if runInfo['dataLockConstraints']['expiryTimeUsecs'] > nowUsecs:
-                                        lastDataLock = usecsToDate(runInfo['dataLockConstraints']['expiryTimeUsecs'])
                                 if object['object']['name'] not in viewHistory:
                                     viewHistory[object['object']['name']] = {}
+                                    viewHistory[object['object']['name']]['archiveCount'] = 0
+                                    viewHistory[object['object']['name']]['oldestArchive'] = '-'
                                     viewHistory[object['object']['name']]['stats'] = thisStat
                                     viewHistory[object['object']['name']]['numSnaps'] = 0
                                     viewHistory[object['object']['name']]['numLogs'] = 0
-                                    viewHistory[object['object']['name']]['archiveCount'] = 0
-                                    viewHistory[object['object']['name']]['oldestArchive'] = '-'
-                                    viewHistory[object['object']['name']]['newestBackup'] = ''
-                                    viewHistory[object['object']['name']]['oldestBackup'] = ''
-                                    if snap is not None:
-                                        viewHistory[object['object']['name']]['newestBackup'] = usecsToDate(snap['snapshotInfo']['startTimeUsecs'])
-                                        viewHistory[object['object']['name']]['oldestBackup'] = usecsToDate(snap['snapshotInfo']['startTimeUsecs'])
-                                if snap is not None:
-                                    viewHistory[object['object']['name']]['oldestBackup'] = usecsToDate(snap['snapshotInfo']['startTimeUsecs'])
-                                    viewHistory[object['object']['name']]['numSnaps'] += 1
-                                viewHistory[object['object']['name']]['lastDataLock'] = lastDataLock
-                    if 'archivalInfo' in run and run['archivalInfo'] is not None and 'archivalTargetResults' in run['archivalInfo'] and run['archivalInfo']['archivalTargetResults'] is not None and len(run['archivalInfo']['archivalTargetResults']) > 0:
-                        for archiveResult in run['archivalInfo']['archivalTargetResults']:
-                            if 'status' in archiveResult and archiveResult['status'] == 'Succeeded':
-                                for object in [o for o in run['objects']]:
-                                    if object['object']['name'] not in viewHistory:
-                                        viewHistory[object['object']['name']] = {}
-                                        viewHistory[object['object']['name']]['archiveCount'] = 0
-                                        viewHistory[object['object']['name']]['oldestArchive'] = '-'
-                                        viewHistory[object['object']['name']]['stats'] = thisStat
-                                        viewHistory[object['object']['name']]['numSnaps'] = 0
-                                        viewHistory[object['object']['name']]['numLogs'] = 0
-                                        viewHistory[object['object']['name']]['newestBackup'] = None
-                                        viewHistory[object['object']['name']]['oldestBackup'] = None
-                                    viewHistory[object['object']['name']]['archiveCount'] += 1
-                                    viewHistory[object['object']['name']]['oldestArchive'] = usecsToDate(run['id'].split(':')[-1])
-                if len(runs['runs']) == 0 or runs['runs'][-1]['id'] == lastRunId:
-                    break
-                else:
-                    lastRunId = runs['runs'][-1]['id']
-                    if 'localBackupInfo' in runs['runs'][-1]:
-                        endUsecs = runs['runs'][-1]['localBackupInfo']['endTimeUsecs']
-                    elif 'originalBackupInfo' in runs['runs'][-1]:
-                        endUsecs = runs['runs'][-1]['originalBackupInfo']['endTimeUsecs']
-                    else:
-                        endUsecs = runs['runs'][-1]['archivalInfo']['archivalTargetResults'][0]['endTimeUsecs']
+                                    viewHistory[object['object']['name']]['newestBackup'] = None
+                                    viewHistory[object['object']['name']]['oldestBackup'] = None
+                                viewHistory[object['object']['name']]['archiveCount'] += 1
+                                viewHistory[object['object']['name']]['oldestArchive'] = usecsToDate(run['id'].split(':')[-1])
+
+    if incremental is True:
+        saveState(cluster, newState)
 
     # views
-    views = api('get', 'file-services/views?maxCount=2000&includeTenants=true&includeStats=true&includeProtectionGroups=true&includeInactive=true', v=2)
+    views = client.api('get', 'file-services/views?maxCount=2000&includeTenants=true&includeStats=true&includeProtectionGroups=true&includeInactive=true', v=2)
     if 'views' in views and views['views'] is not None and len(views['views']) > 0:
-        stats = api('get', 'stats/consumers?msecsBeforeCurrentTimeToCompare=%s&consumerType=kViews' % (growthdays * 86400000))
+        stats = client.api('get', 'stats/consumers?msecsBeforeCurrentTimeToCompare=%s&consumerType=kViews' % (growthdays * 86400000))
         viewJobStats = {}
 
         # build total view job consumptions
@@ -524,11 +734,11 @@ def reportStorage():
             jobName = None
             try:
                 jobName = view['viewProtection']['protectionGroups'][-1]['groupName']
-                thisJob = [j for j in jobs['protectionGroups'] if j['name'].lower() == jobName.lower()]
-                if thisJob is not None and len(thisJob) > 0:
-                    if thisJob[0]['isActive'] is not True:
+                thisJob = jobsByName.get(jobName.lower(), None)
+                if thisJob is not None:
+                    if thisJob['isActive'] is not True:
                         origin = 'replica'
-                    if thisJob[0]['environment'] == 'kRemoteAdapter':
+                    if thisJob['environment'] == 'kRemoteAdapter':
                         continue
 
                 if 'stats' in view:
@@ -550,11 +760,11 @@ def reportStorage():
             origin = 'local'
             try:
                 jobName = view['viewProtection']['protectionGroups'][-1]['groupName']
-                thisJob = [j for j in jobs['protectionGroups'] if j['name'].lower() == jobName.lower()]
-                if thisJob is not None and len(thisJob) > 0:
-                    if thisJob[0]['isActive'] is not True:
+                thisJob = jobsByName.get(jobName.lower(), None)
+                if thisJob is not None:
+                    if thisJob['isActive'] is not True:
                         origin = 'replica'
-                    if thisJob[0]['environment'] == 'kRemoteAdapter':
+                    if thisJob['environment'] == 'kRemoteAdapter':
                         continue
             except Exception:
                 jobName = '-'
@@ -573,7 +783,10 @@ def reportStorage():
                     archiveCount = viewHistory[view['name']]['archiveCount']
             sourceName = view['storageDomainName']
             viewName = view['name']
-            print('  %s' % viewName)
+            if showClusterName is True:
+                print('  %s: %s' % (cluster['name'], viewName))
+            else:
+                print('  %s' % viewName)
             tenant = ''
             if 'tenantId' in view and view['tenantId'] is not None:
                 tenant = view['tenantId'][:-1]
@@ -628,14 +841,10 @@ def reportStorage():
             # archive Stats
             totalArchived = 0
             vaultStats = ''
-            if cloudStats is not None and 'dataTransferSummary' in cloudStats and len(cloudStats['dataTransferSummary']) > 0:
-                for vaultSummary in cloudStats['dataTransferSummary']:
-                    if vaultSummary is not None and 'dataTransferPerProtectionJob' in vaultSummary and len(vaultSummary['dataTransferPerProtectionJob']) > 0:
-                        for cloudJob in vaultSummary['dataTransferPerProtectionJob']:
-                            if cloudJob['protectionJobName'] == jobName:
-                                if cloudJob['storageConsumed'] > 0:
-                                    totalArchived += (objWeight * cloudJob['storageConsumed'])
-                                    vaultStats += '[%s]%s ' % (vaultSummary['vaultName'], round((objWeight * cloudJob['storageConsumed']) / multiplier, 1))
+            for (vaultName, storageConsumed) in cloudStatsByJobName.get(jobName, []):
+                if storageConsumed > 0:
+                    totalArchived += (objWeight * storageConsumed)
+                    vaultStats += '[%s]%s ' % (vaultName, round((objWeight * storageConsumed) / multiplier, 1))
             totalArchived = round(totalArchived / multiplier, 1)
             viewDescription = ''
             if 'description' in view:
@@ -649,7 +858,7 @@ def reportStorage():
     garbageStart = int(midnightusecs / 1000)
     bookKeeperStart = int(midnightusecs / 1000 - (29 * 86400000))
     bookKeeperEnd = int(midnightusecs / 1000 + 86400000)
-    bookKeeperStats = api('get', 'statistics/timeSeriesStats?startTimeMsecs=%s&schemaName=MRCounters&metricName=bytes_value&rollupIntervalSecs=180&rollupFunction=average&entityId=BookkeeperChunkBytesPhysical&endTimeMsecs=%s' % (bookKeeperStart, bookKeeperEnd))
+    bookKeeperStats = client.api('get', 'statistics/timeSeriesStats?startTimeMsecs=%s&schemaName=MRCounters&metricName=bytes_value&rollupIntervalSecs=180&rollupFunction=average&entityId=BookkeeperChunkBytesPhysical&endTimeMsecs=%s' % (bookKeeperStart, bookKeeperEnd))
     try:
         bookKeeperBytes = bookKeeperStats['dataPointVec'][-1]['data']['int64Value']
     except Exception:
@@ -658,7 +867,7 @@ def reportStorage():
     clusterUsedBytes = cluster['stats']['usagePerfStats']['totalPhysicalUsageBytes']
     unaccounted = clusterUsedBytes - bookKeeperBytes
     unaccountedPercent = 0
-    garbageStats = api('get', 'statistics/timeSeriesStats?endTimeMsecs=%s&entityId=%s&metricName=kMorphedGarbageBytes&metricUnitType=0&range=day&rollupFunction=average&rollupIntervalSecs=360&schemaName=kBridgeClusterStats&startTimeMsecs=%s' % (bookKeeperEnd, cluster['id'], garbageStart))
+    garbageStats = client.api('get', 'statistics/timeSeriesStats?endTimeMsecs=%s&entityId=%s&metricName=kMorphedGarbageBytes&metricUnitType=0&range=day&rollupFunction=average&rollupIntervalSecs=360&schemaName=kBridgeClusterStats&startTimeMsecs=%s' % (bookKeeperEnd, cluster['id'], garbageStart))
     garbagePercent = 0
     try:
         garbageBytes = garbageStats['dataPointVec'][-1]['data']['int64Value']
@@ -677,30 +886,72 @@ def reportStorage():
     clusterStats.write('"%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s","%s"\n' % (cluster['name'], clusterUsed, round(bookKeeperBytes / multiplier, 1), round(unaccounted / multiplier, 1), unaccountedPercent, round(garbageBytes / multiplier, 1), garbagePercent, round(otherUnaccountedBytes / multiplier, 1), otherUnaccountedPercent, clusterReduction, sumObjectsUsed, sumObjectsWritten, sumObjectsWrittenWithResiliency, storageVarianceFactor, scriptVersion, cluster['clusterSoftwareVersion']))
 
 
+# authenticate one cluster at a time (so any password prompts are not interleaved)
+targets = []
+failures = []
 for vip in vips:
 
     # authentication =========================================================
-    apiauth(vip=vip, username=username, domain=domain, password=password, useApiKey=useApiKey, helios=mcm, prompt=(not noprompt), mfaCode=mfacode, quiet=True)
+    client = CohesityClient()
+    client.apiauth(vip=vip, username=username, domain=domain, password=password, useApiKey=useApiKey, helios=mcm, prompt=(not noprompt), mfaCode=mfacode, quiet=True)
 
-    # exit if not authenticated
-    if apiconnected() is False:
+    # skip if not authenticated
+    if client.apiconnected() is False:
         print('authentication failed')
+        failures.append((vip, 'authentication failed'))
         continue
 
-    # if connected to helios or mcm, select access cluster
+    # if connected to helios or mcm, select access clusters
     if mcm or vip.lower() == 'helios.cohesity.com':
         if clusternames is None or len(clusternames) == 0:
-            clusternames = [c['name'] for c in heliosClusters()]
+            clusternames = [c['name'] for c in client.heliosClusters()]
         for clustername in clusternames:
-            heliosCluster(clustername)
-            if LAST_API_ERROR() != 'OK':
+            clusterClient = client.clusterClient(clustername)
+            if clusterClient is None:
+                print('Cluster %s not connected to Helios' % clustername)
+                failures.append((clustername, 'not connected to Helios'))
                 continue
-            reportStorage()
+            targets.append((clustername, clusterClient))
     else:
-        reportStorage()
+        targets.append((vip, client))
+
+showClusterName = clusterthreads > 1 and len(targets) > 1
+
+
+def reportCluster(target):
+    """report one cluster into its own shard files, returns (name, shard file names, error)"""
+    (index, (name, client)) = target
+    shardNames = ('%s.%s.part' % (csvfileName, index), '%s.%s.part' % (clusterStatsFileName, index))
+    shardCsv = codecs.open(shardNames[0], 'w', 'utf-8')
+    shardStats = codecs.open(shardNames[1], 'w', 'utf-8')
+    error = None
+    try:
+        reportStorage(client, shardCsv, shardStats)
+    except Exception as e:
+        error = e
+    shardCsv.close()
+    shardStats.close()
+    return (name, shardNames, error)
+
+
+# collect clusters concurrently, merging the shards in the original cluster order
+for (name, shardNames, error) in mapInOrder(reportCluster, enumerate(targets), clusterthreads):
+    if error is not None:
+        print('\n*** %s failed: %s ***' % (name, error))
+        failures.append((name, error))
+    for (shardName, outfile) in zip(shardNames, (csv, clusterStats)):
+        if error is None:
+            shard = codecs.open(shardName, 'r', 'utf-8')
+            for line in shard:
+                outfile.write(line)
+            shard.close()
+        os.remove(shardName)
 
 csv.close()
 clusterStats.close()
+if len(failures) > 0:
+    print('\nFailed clusters (not included in the report):\n')
+    for (name, error) in failures:
+        print('    %s: %s' % (name, error))
 print('\n       Output saved to: %s' % csvfileName)
 print('Cluster stats saved to: %s\n' % clusterStatsFileName)
-